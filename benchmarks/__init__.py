@@ -0,0 +1 @@
+# Benchmarki wydajności (uruchamiane ręcznie, nie przez pytest): python -m benchmarks.<nazwa>
@@ -0,0 +1,89 @@
+"""
+Benchmark: przepustowość read_log_lines dla plików skompresowanych vs nieskompresowanych.
+
+Uruchomienie:
+    python -m benchmarks.bench_compressed [--copies 40] [--parse]
+
+Dane: data/access_big.log powielony `--copies` razy do katalogu tymczasowego, zapisany
+jako zwykły plik oraz .gz/.bz2/.xz (i .zst, jeśli zainstalowano 'zstandard').
+Dla każdego wariantu mierzone jest:
+  - read_log_lines (dekompresja w wątku w tle, z wyprzedzeniem),
+  - dla gzip dodatkowo wariant "serial": gzip.open + iteracja linii w jednym wątku,
+    czyli dekompresja szeregowo z parsowaniem (punkt odniesienia dla read-ahead).
+MB/s liczone są względem rozmiaru danych PO dekompresji. Z `--parse` każda linia
+przechodzi też przez parse_line, co pokazuje nakładanie się dekompresji z parsowaniem.
+"""
+from __future__ import annotations
+
+import argparse
+import bz2
+import gzip
+import logging
+import lzma
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+from src.analyzer.io_reader import read_log_lines, zstandard
+from src.analyzer.parser import parse_line
+
+SAMPLE = Path(__file__).resolve().parents[1] / "data" / "access_big.log"
+
+
+def _write_inputs(tmp: Path, copies: int) -> tuple[int, dict[str, Path]]:
+    data = SAMPLE.read_bytes() * copies
+    files = {"plain": tmp / "access.log"}
+    files["plain"].write_bytes(data)
+    files["gzip"] = tmp / "access.log.gz"
+    files["gzip"].write_bytes(gzip.compress(data, compresslevel=6))
+    files["bz2"] = tmp / "access.log.bz2"
+    files["bz2"].write_bytes(bz2.compress(data))
+    files["xz"] = tmp / "access.log.xz"
+    files["xz"].write_bytes(lzma.compress(data))
+    if zstandard is not None:
+        files["zstd"] = tmp / "access.log.zst"
+        files["zstd"].write_bytes(zstandard.ZstdCompressor().compress(data))
+    return len(data), files
+
+
+def _gzip_serial(path: Path) -> Iterable[str]:
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            yield line.rstrip()
+
+
+def _measure(lines: Callable[[], Iterable[str]], parse: bool) -> tuple[float, int]:
+    start = time.perf_counter()
+    count = 0
+    for line in lines():
+        if parse:
+            parse_line(line)
+        count += 1
+    return time.perf_counter() - start, count
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--copies", type=int, default=40, help="ile razy powielić data/access_big.log")
+    ap.add_argument("--parse", action="store_true", help="mierz odczyt + parse_line")
+    args = ap.parse_args()
+
+    logging.disable(logging.WARNING)  # bez ostrzeżeń parse_line o błędnych liniach
+
+    with tempfile.TemporaryDirectory() as tmp:
+        size, files = _write_inputs(Path(tmp), args.copies)
+        cases: list[tuple[str, Callable[[], Iterable[str]]]] = [
+            (name, lambda p=path: read_log_lines(p)) for name, path in files.items()
+        ]
+        cases.append(("gzip (serial)", lambda p=files["gzip"]: _gzip_serial(p)))
+
+        print(f"dane: {size / 1e6:.1f} MB po dekompresji, parse={args.parse}")
+        print(f"{'wariant':<16}{'czas [s]':>10}{'linie/s':>14}{'MB/s':>10}")
+        for name, lines in cases:
+            elapsed, count = _measure(lines, args.parse)
+            print(f"{name:<16}{elapsed:>10.3f}{count / elapsed:>14,.0f}{size / 1e6 / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark pamięci: rekord jako dict (parse_line) vs LogRecord (parse_line(..., as_record=True)).
+
+Uruchomienie:
+    python -m benchmarks.bench_record_memory [--count 1000000]
+
+Linie z data/access_big.log powtarzane są do `--count` rekordów trzymanych naraz w liście.
+Pamięć mierzona przez tracemalloc (wszystko, co zaalokował parser: kontener rekordu,
+pola tekstowe, int-y, datetime), wynik przeliczany na milion rekordów.
+Czas parsowania mierzony osobno, bez tracemalloc (tworzenie LogRecord nie może być wolniejsze).
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.analyzer.parser import parse_line
+
+SAMPLE = Path(__file__).resolve().parents[1] / "data" / "access_big.log"
+
+
+def _measure(lines: list[str], as_record: bool) -> tuple[int, float]:
+    """(bajty zaalokowane przez trzymane rekordy, sekundy parsowania)."""
+    gc.collect()
+    start = time.perf_counter()
+    records = [parse_line(line, as_record=as_record) for line in lines]
+    elapsed = time.perf_counter() - start
+    del records
+
+    gc.collect()
+    tracemalloc.start()
+    records = [parse_line(line, as_record=as_record) for line in lines]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return current, elapsed
+
+
+def _is_valid(line: str) -> bool:
+    try:
+        return parse_line(line, fail_policy="strict") is not None
+    except ValueError:
+        return False
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--count", type=int, default=1_000_000, help="ile rekordów trzymać w pamięci")
+    args = ap.parse_args()
+
+    sample = [line for line in SAMPLE.read_text(encoding="utf-8").splitlines() if _is_valid(line)]
+    lines = (sample * (args.count // len(sample) + 1))[:args.count]
+    scale = 1_000_000 / len(lines)
+
+    results = {label: _measure(lines, as_record) for label, as_record in (("dict", False), ("LogRecord", True))}
+    base_bytes = results["dict"][0]
+
+    print(f"{'wariant':<11}{'MiB / 1M rekordów':>19}{'B / rekord':>12}{'oszczędność':>13}{'czas [s]':>10}")
+    for label, (size, elapsed) in results.items():
+        print(
+            f"{label:<11}{size * scale / 2**20:>19.1f}{size / len(lines):>12.0f}"
+            f"{(base_bytes - size) * scale / 2**20:>9.1f} MiB{elapsed:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark zapisu do SQLite: wiersz po wierszu (autocommit) vs SqliteSink (executemany, WAL).
+
+Uruchomienie:
+    python -m benchmarks.bench_sqlite [--rows 500000] [--naive-rows 5000] [--check]
+
+Dane: rekordy LogRecord z data/access_big.log powielone do `--rows` (parsowanie poza pomiarem).
+Mierzone: wiersze/s samego zapisu (z tworzeniem indeksów po załadowaniu w SqliteSink).
+Wariant "naiwny" (INSERT + COMMIT na wiersz, synchronous=FULL) tylko na `--naive-rows` wierszach -
+jest o rzędy wielkości wolniejszy. Z `--check` kod wyjścia 1, gdy SqliteSink nie osiąga
+TARGET_ROWS_PER_SECOND (próg dla CI / porównań między maszynami).
+"""
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from itertools import cycle, islice
+from pathlib import Path
+
+from src.analyzer.parser import parse_line
+from src.analyzer.sqlite_sink import SqliteSink
+
+SAMPLE = Path(__file__).resolve().parents[1] / "data" / "access_big.log"
+TARGET_ROWS_PER_SECOND = 100_000
+
+
+def _load_sample() -> list:
+    records = []
+    for line in SAMPLE.read_text(encoding="utf-8").splitlines():
+        try:
+            records.append(parse_line(line, fail_policy="strict", as_record=True))
+        except ValueError:
+            pass
+    return records
+
+
+def _naive(db: Path, records: list) -> float:
+    conn = sqlite3.connect(db)
+    conn.execute("PRAGMA synchronous=FULL")
+    conn.execute(
+        "CREATE TABLE requests (remote_host TEXT, ts INTEGER, method TEXT, path TEXT, status INTEGER,"
+        " size INTEGER, referrer TEXT, user_agent TEXT)"
+    )
+    conn.execute("CREATE INDEX requests_ts ON requests(ts)")
+    started = time.perf_counter()
+    for r in records:
+        conn.execute("INSERT INTO requests VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     (r.remote_host, r.epoch, r.method, r.path, r.status, r.size, r.referrer, r.user_agent))
+        conn.commit()
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return len(records) / elapsed
+
+
+def _sink(db: Path, records: list) -> float:
+    started = time.perf_counter()
+    with SqliteSink(db) as sink:
+        for rec in records:
+            sink.add(rec)
+    return len(records) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=500_000, help="ile wierszy zapisać przez SqliteSink")
+    ap.add_argument("--naive-rows", type=int, default=5_000, help="ile wierszy zapisać naiwnie (0 = pomiń)")
+    ap.add_argument("--check", action="store_true", help=f"kod 1, gdy SqliteSink < {TARGET_ROWS_PER_SECOND} wierszy/s")
+    args = ap.parse_args()
+
+    records = list(islice(cycle(_load_sample()), args.rows))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.naive_rows:
+            rate = _naive(Path(tmp) / "naive.db", records[: args.naive_rows])
+            print(f"naiwnie (INSERT + COMMIT na wiersz): {args.naive_rows:>9} wierszy  {rate:>12,.0f} wierszy/s")
+        rate = _sink(Path(tmp) / "sink.db", records)
+        print(f"SqliteSink (executemany, WAL):       {len(records):>9} wierszy  {rate:>12,.0f} wierszy/s")
+        print(f"cel: {TARGET_ROWS_PER_SECOND:,} wierszy/s")
+
+    if args.check and rate < TARGET_ROWS_PER_SECOND:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Benchmark przepustowości: read_log_lines, parse_timestamp, parse_line i całe CLI; wyniki w JSON
+i porównanie z wynikiem bazowym (kod 1 przy regresji ponad próg).
+
+Uruchomienie:
+    python -m benchmarks.bench_throughput run [--input plik.log | --generate 200MB] [--out wyniki.json]
+                                              [--stages reader,parse_timestamp,parse_line,cli]
+                                              [--repeat 3] [--sample-lines 200000]
+                                              [--corrupt 0.01] [--long 0.001] [--seed 0]
+    python -m benchmarks.bench_throughput compare bazowy.json nowy.json [--threshold 0.10]
+                                                  [--rss-threshold 0.20]
+
+Etapy (każdy w osobnym procesie - szczyt RSS dotyczy tylko jego):
+  - reader           - read_log_lines przez cały plik (dekodowanie, bez parsowania),
+  - parse_timestamp  - parse_timestamp dla timestampów z pierwszych `--sample-lines` linii (w pamięci),
+  - parse_line       - parse_line(as_record=True) dla pierwszych `--sample-lines` linii (w pamięci;
+                       ostrzeżenia loggera o błędnych liniach wyłączone),
+  - cli              - `main --input plik --quiet` w procesie (raport do katalogu tymczasowego).
+Dla każdego etapu: linie/s, MB/s (bajty wejścia etapu), czas (najlepszy z `--repeat`) i szczyt RSS [MB].
+Bez `--input` plik generowany jest przez benchmarks.synth (`--generate`, `--corrupt`, `--long`).
+compare: regresja = linie/s niższe o więcej niż `--threshold` albo szczyt RSS wyższy o więcej niż
+`--rss-threshold` (ułamki); porównuj wyniki z tej samej maszyny i tego samego wejścia.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Optional
+
+from benchmarks.synth import generate_log
+from src.analyzer.cli import parse_memory_size
+
+ROOT = Path(__file__).resolve().parents[1]
+STAGES = ("reader", "parse_timestamp", "parse_line", "cli")
+RESULTS_VERSION = 1
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Szczyt RSS bieżącego procesu [MB] (None, gdy moduł resource nie istnieje, np. Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024  # macOS: bajty, Linux: KiB
+
+
+def _best_of(repeat: int, func: Callable[[], None]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _count_lines(path: Path) -> int:
+    lines = 0
+    with open(path, "rb") as file:
+        while chunk := file.read(4 * 1024 * 1024):
+            lines += chunk.count(b"\n")
+    return lines
+
+
+def _sample(path: Path, sample_lines: int) -> list[str]:
+    with open(path, encoding="utf-8", errors="replace") as file:
+        return list(islice(file, sample_lines))
+
+
+def _stage_reader(path: Path, repeat: int, sample_lines: int) -> tuple[int, int, float]:
+    from src.analyzer.io_reader import ReadStats, read_log_lines
+
+    count = 0
+
+    def run() -> None:
+        nonlocal count
+        count = 0
+        for _ in read_log_lines(path, stats=ReadStats()):
+            count += 1
+
+    seconds = _best_of(repeat, run)
+    return count, path.stat().st_size, seconds
+
+
+def _stage_parse_timestamp(path: Path, repeat: int, sample_lines: int) -> tuple[int, int, float]:
+    from src.analyzer.parser import parse_timestamp
+
+    stamps = []
+    for line in _sample(path, sample_lines):
+        start, end = line.find("["), line.find("]")
+        if 0 <= start < end:
+            stamps.append(line[start + 1:end])
+
+    def run() -> None:
+        for raw in stamps:
+            try:
+                parse_timestamp(raw)
+            except (ValueError, OverflowError):
+                pass
+
+    seconds = _best_of(repeat, run)
+    return len(stamps), sum(len(raw.encode("utf-8")) for raw in stamps), seconds
+
+
+def _stage_parse_line(path: Path, repeat: int, sample_lines: int) -> tuple[int, int, float]:
+    from src.analyzer.parser import parse_line
+
+    lines = _sample(path, sample_lines)
+    logging.disable(logging.WARNING)
+
+    def run() -> None:
+        for line in lines:
+            parse_line(line, as_record=True)
+
+    seconds = _best_of(repeat, run)
+    return len(lines), sum(len(line.encode("utf-8")) for line in lines), seconds
+
+
+def _stage_cli(path: Path, repeat: int, sample_lines: int) -> tuple[int, int, float]:
+    from src.analyzer.cli import app
+
+    with tempfile.TemporaryDirectory() as outdir:
+        def run() -> None:
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                try:
+                    app(["main", "--input", str(path), "--quiet", "--outdir", outdir], standalone_mode=False)
+                except SystemExit:
+                    pass
+
+        seconds = _best_of(repeat, run)
+    return _count_lines(path), path.stat().st_size, seconds
+
+
+_STAGE_FUNCS = {
+    "reader": _stage_reader, "parse_timestamp": _stage_parse_timestamp,
+    "parse_line": _stage_parse_line, "cli": _stage_cli,
+}
+
+
+def run_stage(stage: str, path: Path, repeat: int, sample_lines: int) -> dict:
+    """Jeden etap w BIEŻĄCYM procesie (wywoływane w procesie potomnym przez `run`)."""
+    lines, size, seconds = _STAGE_FUNCS[stage](path, repeat, sample_lines)
+    seconds = max(seconds, 1e-9)
+    return {
+        "lines": lines,
+        "bytes": size,
+        "seconds": round(seconds, 6),
+        "lines_per_s": round(lines / seconds, 1),
+        "mb_per_s": round(size / seconds / 1e6, 3),
+        "peak_rss_mb": None if (rss := _peak_rss_mb()) is None else round(rss, 1),
+    }
+
+
+def run(args: argparse.Namespace) -> int:
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        sys.exit(f"Nieznane etapy: {', '.join(unknown)} (dozwolone: {', '.join(STAGES)})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.input
+        if path is None:
+            path = Path(tmp) / "synth.log"
+            lines, size = generate_log(
+                path, parse_memory_size(args.generate), args.corrupt, args.long, seed=args.seed
+            )
+            print(f"wygenerowano {path.name}: {lines:,} linii, {size / 1e6:,.1f} MB", file=sys.stderr)
+
+        results = {}
+        for stage in stages:
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_throughput", "_stage", stage, str(path),
+                 "--repeat", str(args.repeat), "--sample-lines", str(args.sample_lines)],
+                cwd=ROOT, capture_output=True, text=True, check=False,
+            )
+            if proc.returncode != 0:
+                sys.exit(f"etap {stage} zakończony kodem {proc.returncode}:\n{proc.stderr}")
+            results[stage] = json.loads(proc.stdout)
+            r = results[stage]
+            print(f"{stage:<16} {r['lines_per_s']:>14,.0f} linii/s {r['mb_per_s']:>10,.1f} MB/s "
+                  f"{r['seconds']:>9.3f} s  RSS {r['peak_rss_mb']} MB")
+
+        document = {
+            "version": RESULTS_VERSION,
+            "meta": {
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "input": str(args.input) if args.input is not None else f"synth:{args.generate}",
+                "input_bytes": path.stat().st_size,
+                "corrupt": None if args.input is not None else args.corrupt,
+                "long": None if args.input is not None else args.long,
+                "seed": None if args.input is not None else args.seed,
+                "repeat": args.repeat,
+                "sample_lines": args.sample_lines,
+            },
+            "results": results,
+        }
+    if args.out is not None:
+        args.out.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+        print(f"zapisano: {args.out}")
+    else:
+        print(json.dumps(document, indent=2))
+    return 0
+
+
+def compare(base: dict, new: dict, threshold: float, rss_threshold: float) -> list[str]:
+    """Lista regresji (pusta = brak): linie/s spadek > threshold, RSS wzrost > rss_threshold."""
+    regressions = []
+    for stage, old in base["results"].items():
+        cur = new["results"].get(stage)
+        if cur is None:
+            print(f"{stage:<16} brak w nowym wyniku - pominięty")
+            continue
+        speed = cur["lines_per_s"] / old["lines_per_s"] - 1 if old["lines_per_s"] else 0.0
+        line = f"{stage:<16} linii/s {old['lines_per_s']:>14,.0f} -> {cur['lines_per_s']:>14,.0f} ({speed:+.1%})"
+        if speed < -threshold:
+            regressions.append(f"{stage}: przepustowość {speed:+.1%} (próg -{threshold:.0%})")
+        if old.get("peak_rss_mb") and cur.get("peak_rss_mb"):
+            rss = cur["peak_rss_mb"] / old["peak_rss_mb"] - 1
+            line += f"  RSS {old['peak_rss_mb']} -> {cur['peak_rss_mb']} MB ({rss:+.1%})"
+            if rss > rss_threshold:
+                regressions.append(f"{stage}: szczyt RSS {rss:+.1%} (próg +{rss_threshold:.0%})")
+        print(line)
+    return regressions
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="zmierz etapy i zapisz wyniki w JSON")
+    p_run.add_argument("--input", type=Path, help="plik logów (domyślnie: wygenerowany, patrz --generate)")
+    p_run.add_argument("--generate", default="200MB", help="rozmiar pliku syntetycznego bez --input")
+    p_run.add_argument("--corrupt", type=float, default=0.01, help="ułamek linii uszkodzonych (synth)")
+    p_run.add_argument("--long", type=float, default=0.001, help="ułamek linii długich (synth)")
+    p_run.add_argument("--seed", type=int, default=0)
+    p_run.add_argument("--stages", default=",".join(STAGES), help="etapy po przecinku")
+    p_run.add_argument("--repeat", type=int, default=3, help="powtórzenia etapu (liczy się najlepszy czas)")
+    p_run.add_argument("--sample-lines", type=int, default=200_000, help="linie w pamięci dla parse_*")
+    p_run.add_argument("--out", type=Path, help="plik JSON z wynikami (domyślnie: stdout)")
+
+    p_cmp = sub.add_parser("compare", help="porównaj wyniki; kod 1 przy regresji")
+    p_cmp.add_argument("base", type=Path)
+    p_cmp.add_argument("new", type=Path)
+    p_cmp.add_argument("--threshold", type=float, default=0.10, help="dopuszczalny spadek linii/s (ułamek)")
+    p_cmp.add_argument("--rss-threshold", type=float, default=0.20, help="dopuszczalny wzrost szczytu RSS (ułamek)")
+
+    p_stage = sub.add_parser("_stage", help=argparse.SUPPRESS)
+    p_stage.add_argument("stage", choices=STAGES)
+    p_stage.add_argument("input", type=Path)
+    p_stage.add_argument("--repeat", type=int, default=3)
+    p_stage.add_argument("--sample-lines", type=int, default=200_000)
+
+    args = ap.parse_args()
+    if args.command == "_stage":
+        print(json.dumps(run_stage(args.stage, args.input, args.repeat, args.sample_lines)))
+    elif args.command == "run":
+        sys.exit(run(args))
+    else:
+        base = json.loads(args.base.read_text(encoding="utf-8"))
+        new = json.loads(args.new.read_text(encoding="utf-8"))
+        if base["meta"].get("input_bytes") != new["meta"].get("input_bytes"):
+            print("uwaga: wyniki dla różnych wejść - porównanie orientacyjne", file=sys.stderr)
+        regressions = compare(base, new, args.threshold, args.rss_threshold)
+        for regression in regressions:
+            print(f"REGRESJA {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
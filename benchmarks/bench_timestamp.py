@@ -0,0 +1,85 @@
+"""
+Mikro-benchmark: koszt parsowania timestampu na linię - przed i po memoizacji.
+
+Uruchomienie:
+    python -m benchmarks.bench_timestamp [--repeat 20]
+
+Wejście:
+  - "próbka": timestampy z data/access_big.log powtórzone `--repeat` razy (mało unikalnych),
+  - "sekwencja": kolejne sekundy (każdy timestamp unikalny; trafia tylko cache minut).
+Warianty:
+  - "przed": implementacja sprzed memoizacji (TS_RE + groupdict + timezone() + astimezone
+    dla każdej linii), skopiowana tu jako punkt odniesienia,
+  - "po (zimny)": parse_timestamp z wyczyszczonymi cache'ami przed pomiarem,
+  - "po (epoch)": parse_timestamp_epoch (bez tworzenia datetime).
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+
+from src.analyzer import parser
+from src.analyzer.parser import MONTH_INDEX, TS_RE, parse_timestamp, parse_timestamp_epoch
+
+SAMPLE = Path(__file__).resolve().parents[1] / "data" / "access_big.log"
+
+
+def reference_parse_timestamp(raw: str) -> datetime:
+    """parse_timestamp sprzed memoizacji (bez walidacji komunikatów - tylko ścieżka poprawna)."""
+    gd = TS_RE.fullmatch(raw.strip()).groupdict()
+    offset = int(gd["offhh"]) * 60 + int(gd["offmm"])
+    if gd["sign"] == "-":
+        offset = -offset
+    tz = timezone(timedelta(minutes=offset))
+    local_dt = datetime(
+        int(gd["year"]), MONTH_INDEX[gd["mon"].upper()], int(gd["day"]),
+        int(gd["hh"]), int(gd["mm"]), int(gd["ss"]), tzinfo=tz,
+    )
+    return local_dt.astimezone(timezone.utc)
+
+
+def _timestamps(repeat: int) -> list[str]:
+    out = []
+    for line in SAMPLE.read_text(encoding="utf-8").splitlines():
+        start, end = line.find("["), line.find("]")
+        if start != -1 and end > start:
+            out.append(line[start + 1:end])
+    return out * repeat
+
+
+def _sequence(count: int) -> list[str]:
+    start = datetime(2023, 10, 10, 13, 0, 0)
+    return [(start + timedelta(seconds=i)).strftime("%d/%b/%Y:%H:%M:%S +0200") for i in range(count)]
+
+
+def _per_call_ns(fn: Callable[[str], object], data: list[str]) -> float:
+    start = time.perf_counter_ns()
+    for raw in data:
+        fn(raw)
+    return (time.perf_counter_ns() - start) / len(data)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=20, help="ile razy powtórzyć timestampy z próbki")
+    args = ap.parse_args()
+
+    print(f"{'dane':<11}{'wariant':<14}{'ns/linię':>10}{'przyspieszenie':>16}")
+    for label, data in (("próbka", _timestamps(args.repeat)), ("sekwencja", _sequence(100_000))):
+        assert all(reference_parse_timestamp(raw) == parse_timestamp(raw) for raw in data[:1000])
+
+        before = _per_call_ns(reference_parse_timestamp, data)
+        parser._timestamp_utc.cache_clear()
+        parser._MINUTE_BASE.clear()
+        after = _per_call_ns(parse_timestamp, data)
+        epoch = _per_call_ns(parse_timestamp_epoch, data)
+
+        for name, ns in (("przed", before), ("po (zimny)", after), ("po (epoch)", epoch)):
+            print(f"{label:<11}{name:<14}{ns:>10.0f}{before / ns:>15.1f}x")
+
+
+if __name__ == "__main__":
+    main()
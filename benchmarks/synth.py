@@ -0,0 +1,159 @@
+"""
+Generator syntetycznych logów Apache Combined do benchmarków (realistyczne rozkłady, powtarzalny seed).
+
+Uruchomienie:
+    python -m benchmarks.synth --out /tmp/synth.log --size 1GB [--corrupt 0.01] [--long 0.001]
+                               [--long-bytes 16KB] [--seed 0]
+
+Zawartość:
+  - IP, ścieżki, user agenty i referrery z pul o rozkładzie zbliżonym do Zipfa (kilka bardzo
+    częstych wartości, długi ogon), metody i statusy z wagami jak w typowym ruchu www / API,
+  - czas rośnie o 0-3 s co linię (wiele linii w tej samej sekundzie - jak w prawdziwym logu),
+    strefa +0000,
+  - `--corrupt` - ułamek linii uszkodzonych (ucięte, zły IP / status / miesiąc, brak cudzysłowów,
+    śmieci bez struktury),
+  - `--long` - ułamek linii z bardzo długim query stringiem (`--long-bytes`, np. 16KB).
+Plik pisany jest partiami - pamięć nie zależy od `--size`.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+from datetime import datetime, timezone
+from itertools import accumulate
+from pathlib import Path
+from typing import Iterator
+
+from src.analyzer.cli import parse_memory_size
+
+START_EPOCH = 1_696_946_136  # 2023-10-10 13:55:36 UTC
+WRITE_BATCH_LINES = 10_000
+
+METHODS = (("GET", 80), ("POST", 12), ("PUT", 3), ("DELETE", 2), ("HEAD", 2), ("OPTIONS", 1))
+STATUSES = ((200, 70), (304, 8), (301, 3), (302, 4), (404, 8), (401, 2), (403, 1), (500, 2), (502, 1), (503, 1))
+PATHS = (
+    "/", "/index.html", "/favicon.ico", "/assets/style.css", "/assets/app.js", "/login", "/logout",
+    "/api/v1/users", "/api/v1/orders", "/api/v1/products", "/api/v1/search", "/api/v2/events",
+    "/static/img/logo.png", "/blog", "/blog/post-1", "/contact", "/robots.txt", "/sitemap.xml",
+)
+USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/118.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 Mobile/15E148",
+    "curl/8.4.0", "python-requests/2.31.0", "Googlebot/2.1 (+http://www.google.com/bot.html)", "-",
+)
+REFERRERS = ("-", "https://example.com/", "https://www.google.com/", "https://example.com/blog", "https://t.co/x")
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def _zipf_cum_weights(n: int) -> list[float]:
+    """Skumulowane wagi 1/rank (random.choices z cum_weights: bez sumowania przy każdym losowaniu)."""
+    return list(accumulate(1 / (rank + 1) for rank in range(n)))
+
+
+class LineGenerator:
+    """Nieskończony strumień linii (bez '\\n') o zadanych proporcjach linii uszkodzonych i długich."""
+
+    def __init__(self, corrupt: float = 0.01, long: float = 0.001, long_bytes: int = 16 * 1024, seed: int = 0):
+        if not (0 <= corrupt <= 1 and 0 <= long <= 1):
+            raise ValueError("Ułamki --corrupt / --long muszą być w [0, 1]")
+        self.rng = random.Random(seed)
+        self.corrupt = corrupt
+        self.long = long
+        self.long_bytes = long_bytes
+        self.epoch = START_EPOCH
+        rng = self.rng
+        self.ips = [f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+                    for _ in range(5000)]
+        self.ip_weights = _zipf_cum_weights(len(self.ips))
+        self.paths = list(PATHS) + [f"/api/v1/items/{i}" for i in range(2000)]
+        self.path_weights = _zipf_cum_weights(len(self.paths))
+        self.methods, method_weights = zip(*METHODS)
+        self.method_weights = list(accumulate(method_weights))
+        self.statuses, status_weights = zip(*STATUSES)
+        self.status_weights = list(accumulate(status_weights))
+        self._ts_epoch = -1
+        self._ts_text = ""
+
+    def _timestamp(self) -> str:
+        if self.epoch != self._ts_epoch:
+            self._ts_epoch = self.epoch
+            dt = datetime.fromtimestamp(self.epoch, timezone.utc)
+            self._ts_text = f"{dt.day:02d}/{MONTHS[dt.month - 1]}/{dt.year}:{dt:%H:%M:%S} +0000"
+        return self._ts_text
+
+    def _valid(self, rng: random.Random) -> str:
+        ip = rng.choices(self.ips, cum_weights=self.ip_weights)[0]
+        method = rng.choices(self.methods, cum_weights=self.method_weights)[0]
+        path = rng.choices(self.paths, cum_weights=self.path_weights)[0]
+        if rng.random() < self.long:
+            path += "?q=" + "x" * self.long_bytes
+        elif rng.random() < 0.2:
+            path += f"?page={rng.randint(1, 50)}"
+        status = rng.choices(self.statuses, cum_weights=self.status_weights)[0]
+        size = "-" if status in (304, 204) or rng.random() < 0.02 else str(rng.randint(0, 200_000))
+        user = "-" if rng.random() < 0.97 else "alice"
+        return (
+            f'{ip} - {user} [{self._timestamp()}] "{method} {path} HTTP/1.1" {status} {size} '
+            f'"{rng.choice(REFERRERS)}" "{rng.choice(USER_AGENTS)}"'
+        )
+
+    def _corrupted(self, rng: random.Random, line: str) -> str:
+        kind = rng.randrange(6)
+        if kind == 0:
+            return line[: rng.randint(1, len(line) - 1)]  # ucięta (np. przerwany zapis)
+        if kind == 1:
+            return "999." + line.split(".", 1)[1]  # IP spoza zakresu
+        if kind == 2:
+            return line.replace('HTTP/1.1" ', 'HTTP/1.1" abc ', 1)  # status nie-liczbowy
+        if kind == 3:
+            month = MONTHS[datetime.fromtimestamp(self.epoch, timezone.utc).month - 1]
+            return line.replace(f"/{month}/", "/Foo/", 1)  # zły miesiąc
+        if kind == 4:
+            return line.replace('"', "", 2)  # żądanie bez cudzysłowów
+        return "GARBAGE " + "".join(rng.choice("abcdef0123456789 ") for _ in range(rng.randint(5, 80)))
+
+    def __iter__(self) -> Iterator[str]:
+        rng = self.rng
+        while True:
+            self.epoch += rng.choice((0, 0, 0, 1, 1, 2, 3))
+            line = self._valid(rng)
+            if rng.random() < self.corrupt:
+                line = self._corrupted(rng, line)
+            yield line
+
+
+def generate_log(
+    path: Path, size_bytes: int, corrupt: float = 0.01, long: float = 0.001, long_bytes: int = 16 * 1024, seed: int = 0
+) -> tuple[int, int]:
+    """Zapisuje linie do `path`, aż plik osiągnie >= `size_bytes`; zwraca (linie, bajty)."""
+    lines = written = 0
+    source = iter(LineGenerator(corrupt, long, long_bytes, seed))
+    with open(path, "w", encoding="utf-8", newline="\n") as out:
+        while written < size_bytes:
+            batch = "".join(next(source) + "\n" for _ in range(WRITE_BATCH_LINES))
+            out.write(batch)
+            lines += WRITE_BATCH_LINES
+            written += len(batch.encode("utf-8"))
+    return lines, written
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--out", type=Path, required=True, help="plik wyjściowy")
+    ap.add_argument("--size", default="100MB", help="docelowy rozmiar, np. 100MB, 2GB")
+    ap.add_argument("--corrupt", type=float, default=0.01, help="ułamek linii uszkodzonych")
+    ap.add_argument("--long", type=float, default=0.001, help="ułamek linii z długim query stringiem")
+    ap.add_argument("--long-bytes", default="16KB", help="długość query stringu długich linii")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    lines, written = generate_log(
+        args.out, parse_memory_size(args.size), args.corrupt, args.long, parse_memory_size(args.long_bytes), args.seed
+    )
+    print(f"{args.out}: {lines:,} linii, {written / 1e6:,.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
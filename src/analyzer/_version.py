@@ -0,0 +1,10 @@
+"""
+Module: _version.py
+Cel: Wersja narzędzia wpisana na stałe (bez czytania pyproject.toml przy każdym starcie).
+Public API:
+  - __version__: str  - musi być równa tool.poetry.version z pyproject.toml (pilnuje tego
+                        tests/test_startup.py); przy podbiciu wersji zmień oba miejsca.
+Moduł nie importuje niczego - korzysta z niego szybka ścieżka `--version` w src/main.py.
+"""
+
+__version__ = "0.0.2"
@@ -0,0 +1,435 @@
+"""
+Module: aggregator.py
+Cel: Strumieniowa agregacja sparsowanych rekordów w jednym przebiegu, pamięć O(liczby różnych kluczy).
+Public API:
+  - TIME_BUCKETS: {"minute": 60, "hour": 3600, "day": 86400, "none": 0} - szerokość kubełka histogramu (UTC);
+      "none" - jeden kubełek na całe wejście ("całość"): czas rekordu nie jest potrzebny
+  - TOP_FIELDS: pola z listami top: remote_host, path, referrer, user_agent
+  - UNIQUE_FIELDS: pola, dla których można liczyć unikalne wartości (HyperLogLog) - jak TOP_FIELDS
+  - class Aggregator(time_bucket="hour", top_mode="exact", sketch_capacity=DEFAULT_SKETCH_CAPACITY,
+                     unique_fields=(), hll_precision=HLL_DEFAULT_PRECISION, size_quantiles=())
+      add(rec)            - jeden rekord (LogRecord albo dict z parse_line),
+      add_batch(batch)    - partia kolumn z parser.parse_batch (poprawne wiersze),
+      merge(other)        - dołącza stan innego agregatora (procesy robocze, kolejne pliki),
+      options()           - opcje wpływające na stan (porównywane np. przy wznowieniu --state-file),
+      top(field, n) / top_ips(n) / top_paths(n) / top_error(field)
+      status_classes() / method_counts() / histogram() / iter_histogram()
+      unique_per_bucket(field) / iter_unique_per_bucket(field) / unique_total(field)
+      size_stats(kind, group) / size_groups(kind)       - wyniki (iter_* - leniwie, per kubełek),
+      summary(top, lazy=False) - wszystko jako dict gotowy do JSON / raportu.
+Stan:
+  - requests                 - liczba zagregowanych rekordów,
+  - tops[pole]               - top_mode="exact": Counter[str] (pamięć O(liczby różnych kluczy)),
+                               top_mode="approx": sketches.SpaceSaving o `sketch_capacity` licznikach
+                               (stała pamięć; szacunek >= prawdy, błąd <= N / sketch_capacity),
+  - methods                  - Counter[str],
+  - statuses                 - Counter[int] (dokładne kody; klasy 2xx/4xx/... liczone przy odczycie),
+  - buckets                  - Counter[int]: początek kubełka (epoch UTC) -> liczba żądań,
+  - uniques[pole][kubełek]   - HyperLogLog dla każdego pola z `unique_fields` i kubełka czasu
+                               (stałe 2**hll_precision B na kubełek; błąd ~1.04 / sqrt(2**p)),
+  - sizes[(rodzaj, grupa)]   - DDSketch rozmiarów odpowiedzi (gdy podano `size_quantiles`), rodzaje:
+                               "all" (grupa ""), "status" ("2xx"...), "path", "bucket" (epoch kubełka);
+                               co najwyżej DD_MAX_BINS kubełków na grupę, błąd względny <= 1%;
+                               szkice "path" tylko dla SIZE_PATH_GROUPS ścieżek śledzonych przez
+                               SpaceSaving (size_paths) - pamięć nie rośnie z liczbą różnych ścieżek,
+  - size_missing[(rodzaj, grupa)] - Counter linii z size '-' (nie trafiają do szkiców).
+Ścieżka wyparta z size_paths traci szkic; wraca z nowym, liczonym od ponownego wejścia. Ścieżki
+częstsze niż N / SIZE_PATH_GROUPS (w tym w praktyce całe listy top) są śledzone przez cały przebieg.
+Brak referrera / UA ('-') nie jest liczony w ich listach top.
+Scalanie jest łączne i przemienne dla liczników dokładnych (sumy), a remisy w listach top
+rozstrzyga klucz, więc wynik nie zależy od podziału wejścia na fragmenty. Szkice approx
+po scaleniu zachowują gwarancje błędu, ale konkretne szacunki mogą zależeć od podziału.
+"""
+from __future__ import annotations
+
+import heapq
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import compress
+from typing import Final, Iterator, Mapping
+
+from .columns import SIZE_MISSING, ColumnBatch, ip_to_str
+from .record import LogRecord
+from .sketches import HLL_DEFAULT_PRECISION, DDSketch, HyperLogLog, SpaceSaving, capacity_for_memory
+
+TIME_BUCKETS: Final[dict[str, int]] = {"minute": 60, "hour": 3600, "day": 86400, "none": 0}
+NO_BUCKET_LABEL: Final[str] = "całość"
+TOP_FIELDS: Final[tuple[str, ...]] = ("remote_host", "path", "referrer", "user_agent")
+UNIQUE_FIELDS: Final[tuple[str, ...]] = TOP_FIELDS
+TOP_MODES: Final[tuple[str, ...]] = ("exact", "approx")
+DEFAULT_SKETCH_CAPACITY: Final[int] = capacity_for_memory(64 * 1024 * 1024, len(TOP_FIELDS))
+
+SIZE_GROUP_KINDS: Final[tuple[str, ...]] = ("all", "status", "path", "bucket")
+SIZE_PATH_GROUPS: Final[int] = 1024  # ile ścieżek ma własny DDSketch rozmiarów (reszta - tylko "all" itd.)
+
+
+@lru_cache(maxsize=4096)
+def _day_label(day: int) -> str:
+    """Dzień (epoch // 86400) -> 'YYYY-mm-dd'; raport per minuta formatuje datę raz na dzień, nie na wiersz."""
+    return datetime.fromtimestamp(day * 86400, timezone.utc).strftime("%Y-%m-%d")
+
+
+def quantile_label(q: float) -> str:
+    """0.5 -> 'p50', 0.999 -> 'p99.9'."""
+    return f"p{q * 100:g}"
+
+
+def _top(counter: Counter, n: int) -> list[tuple]:
+    """n największych pozycji; przy równej liczbie decyduje klucz (deterministycznie)."""
+    return heapq.nsmallest(n, counter.items(), key=lambda kv: (-kv[1], kv[0]))
+
+
+class Aggregator:
+    """
+    Liczniki top IP / top ścieżek / statusów / metod i histogram czasu.
+
+    Przykład:
+      >>> agg = Aggregator("hour")
+      >>> for rec in records: agg.add(rec)
+      >>> agg.merge(other_agg).top_ips(10)
+    """
+
+    def __init__(
+        self,
+        time_bucket: str = "hour",
+        top_mode: str = "exact",
+        sketch_capacity: int = DEFAULT_SKETCH_CAPACITY,
+        unique_fields: tuple[str, ...] = (),
+        hll_precision: int = HLL_DEFAULT_PRECISION,
+        size_quantiles: tuple[float, ...] = (),
+    ):
+        if time_bucket not in TIME_BUCKETS:
+            raise ValueError(f"Nieznany kubełek czasu: {time_bucket!r} (dozwolone: {', '.join(TIME_BUCKETS)})")
+        if top_mode not in TOP_MODES:
+            raise ValueError(f"Nieznany tryb top: {top_mode!r} (dozwolone: {', '.join(TOP_MODES)})")
+        for field in unique_fields:
+            if field not in UNIQUE_FIELDS:
+                raise ValueError(f"Nieznane pole unikalnych: {field!r} (dozwolone: {', '.join(UNIQUE_FIELDS)})")
+        self.time_bucket = time_bucket
+        self.bucket_seconds = TIME_BUCKETS[time_bucket]
+        self.top_mode = top_mode
+        self.requests = 0
+        self.tops: dict[str, Counter | SpaceSaving] = {
+            field: Counter() if top_mode == "exact" else SpaceSaving(sketch_capacity)
+            for field in TOP_FIELDS
+        }
+        self.methods: Counter[str] = Counter()
+        self.statuses: Counter[int] = Counter()
+        self.buckets: Counter[int] = Counter()
+        self.hll_precision = hll_precision
+        HyperLogLog(hll_precision)  # walidacja precyzji od razu, nie przy pierwszym rekordzie
+        self.uniques: dict[str, dict[int, HyperLogLog]] = {field: {} for field in unique_fields}
+        for q in size_quantiles:
+            if not (0 <= q <= 1):
+                raise ValueError(f"Kwantyl musi być w [0, 1], otrzymano: {q}")
+        self.size_quantiles = tuple(size_quantiles)
+        self.sizes: dict[tuple[str, object], DDSketch] = {}
+        self.size_missing: Counter[tuple[str, object]] = Counter()
+        self.size_paths = SpaceSaving(SIZE_PATH_GROUPS)  # ścieżki, które mają grupę "path"
+        self._size_keys = DDSketch()  # tylko do liczenia klucza kubełka (wspólny dla wszystkich grup)
+
+    # ----- zasilanie -----
+    def add(self, rec: LogRecord | Mapping) -> None:
+        """Dodaje jeden poprawny rekord (LogRecord; dict z parse_line też jest przyjmowany)."""
+        if type(rec) is LogRecord:
+            host, path, method, status, epoch = rec.remote_host, rec.path, rec.method, rec.status, rec.epoch
+            referrer, user_agent = rec.referrer, rec.user_agent
+        else:
+            host, path, method, status = rec["remote_host"], rec["path"], rec["method"], rec["status"]
+            referrer, user_agent = rec["referrer"], rec["user_agent"]
+            epoch = int(rec["ts"].timestamp())
+        self.requests += 1
+        tops = self.tops
+        if self.top_mode == "exact":
+            tops["remote_host"][host] += 1
+            tops["path"][path] += 1
+            if referrer is not None:
+                tops["referrer"][referrer] += 1
+            if user_agent is not None:
+                tops["user_agent"][user_agent] += 1
+        else:
+            tops["remote_host"].add(host)
+            tops["path"].add(path)
+            if referrer is not None:
+                tops["referrer"].add(referrer)
+            if user_agent is not None:
+                tops["user_agent"].add(user_agent)
+        self.methods[method] += 1
+        self.statuses[status] += 1
+        width = self.bucket_seconds
+        bucket = epoch - epoch % width if width else 0
+        self.buckets[bucket] += 1
+        if self.uniques:
+            for field, per_bucket in self.uniques.items():
+                value = getattr(rec, field) if type(rec) is LogRecord else rec[field]
+                if value is not None:
+                    self._hll(per_bucket, bucket).add(value)
+        if self.size_quantiles:
+            size = rec.size if type(rec) is LogRecord else rec["size"]
+            self._add_size(size, status, path, bucket)
+
+    def _add_size(self, size: int | None, status: int, path: str, bucket: int, weight: int = 1) -> None:
+        evicted = self.size_paths.add(path, weight)
+        if evicted is not None:
+            self._drop_size_path(evicted)
+        groups = (("all", ""), ("status", f"{status // 100}xx"), ("path", path), ("bucket", bucket))
+        if size is None:
+            for group in groups:
+                self.size_missing[group] += weight
+            return
+        key = self._size_keys.key(size)
+        sizes = self.sizes
+        for group in groups:
+            sketch = sizes.get(group)
+            if sketch is None:
+                sketch = sizes[group] = DDSketch()
+            sketch.add_key(key, weight)
+
+    def _drop_size_path(self, path: str) -> None:
+        self.sizes.pop(("path", path), None)
+        self.size_missing.pop(("path", path), None)
+
+    def _hll(self, per_bucket: dict[int, HyperLogLog], bucket: int) -> HyperLogLog:
+        hll = per_bucket.get(bucket)
+        if hll is None:
+            hll = per_bucket[bucket] = HyperLogLog(self.hll_precision)
+        return hll
+
+    def _add_top(self, field: str, key: str | None, count: int) -> None:
+        if key is None:
+            return
+        if self.top_mode == "exact":
+            self.tops[field][key] += count
+        else:
+            self.tops[field].add(key, count)
+
+    def add_batch(self, batch: ColumnBatch) -> None:
+        """
+        Dodaje poprawne wiersze partii kolumn. Liczone są kody (int), a na tekst
+        zamieniane tylko różne wartości - bez obiektu na wiersz.
+        """
+        if batch.rows == 0:
+            return
+        if batch.bad_count:
+            good = batch.good_mask()
+
+            def column(values):
+                return compress(values, good)
+        else:
+            def column(values):
+                return values
+
+        width = self.bucket_seconds
+        statuses = Counter(column(batch.status))
+        self.requests += sum(statuses.values())
+        self.statuses.update(statuses)
+        if width:
+            row_buckets = [ts - ts % width for ts in column(batch.ts)]
+        else:
+            row_buckets = [0] * sum(statuses.values())
+        self.buckets.update(Counter(row_buckets))
+        for field, per_bucket in self.uniques.items():
+            # różne pary (kubełek, wartość) - każda wartość hashowana raz na kubełek
+            if field == "remote_host":
+                pairs = {(b, ip_to_str(ip)) for b, ip in set(zip(row_buckets, column(batch.ip)))}
+            else:
+                decode = batch.dictionaries[field].decode
+                pairs = {(b, decode(code)) for b, code in set(zip(row_buckets, column(getattr(batch, field))))}
+            for bucket, value in pairs:
+                if value is not None:
+                    self._hll(per_bucket, bucket).add(value)
+        if self.size_quantiles:
+            decode_path = batch.dictionaries["path"].decode
+            rows = Counter(zip(column(batch.size), column(batch.status), column(batch.path), row_buckets))
+            for (size, status, code, bucket), count in rows.items():
+                self._add_size(None if size == SIZE_MISSING else size, status, decode_path(code), bucket, count)
+        for ip, count in Counter(column(batch.ip)).items():
+            self._add_top("remote_host", ip_to_str(ip), count)
+        for field in ("path", "referrer", "user_agent"):
+            decode = batch.dictionaries[field].decode
+            for code, count in Counter(column(getattr(batch, field))).items():
+                self._add_top(field, decode(code), count)
+        decode_method = batch.dictionaries["method"].decode
+        for code, count in Counter(column(batch.method)).items():
+            self.methods[decode_method(code)] += count
+
+    def options(self) -> dict:
+        """Opcje konstruktora, od których zależy stan (sketch_capacity tylko dla top_mode="approx")."""
+        sketch = self.tops[TOP_FIELDS[0]]
+        return {
+            "time_bucket": self.time_bucket,
+            "top_mode": self.top_mode,
+            "sketch_capacity": sketch.capacity if isinstance(sketch, SpaceSaving) else None,
+            "unique_fields": tuple(self.uniques),
+            "hll_precision": self.hll_precision,
+            "size_quantiles": self.size_quantiles,
+        }
+
+    def merge(self, other: "Aggregator") -> "Aggregator":
+        """
+        Dołącza stan `other` (ten sam time_bucket, top_mode, pola unikalnych, precyzja HLL i kwantyle
+        rozmiaru) i zwraca self. Szkice nieobecne w self są kopiowane - `other` można dalej zmieniać.
+        """
+        if (other.time_bucket, other.top_mode, other.uniques.keys(), other.hll_precision, other.size_quantiles) != (
+            self.time_bucket, self.top_mode, self.uniques.keys(), self.hll_precision, self.size_quantiles
+        ):
+            raise ValueError(
+                f"Nie można scalić agregatorów: {self.time_bucket!r}/{self.top_mode!r}/{list(self.uniques)}"
+                f"/p={self.hll_precision}/q={list(self.size_quantiles)} vs {other.time_bucket!r}"
+                f"/{other.top_mode!r}/{list(other.uniques)}/p={other.hll_precision}/q={list(other.size_quantiles)}"
+            )
+        self.requests += other.requests
+        for field, counter in self.tops.items():
+            if self.top_mode == "exact":
+                counter.update(other.tops[field])
+            else:
+                counter.merge(other.tops[field])
+        self.methods.update(other.methods)
+        self.statuses.update(other.statuses)
+        self.buckets.update(other.buckets)
+        for field, per_bucket in self.uniques.items():
+            for bucket, hll in other.uniques[field].items():
+                own = per_bucket.get(bucket)
+                if own is None:
+                    own = per_bucket[bucket] = HyperLogLog(self.hll_precision)
+                own.merge(hll)
+        for group, sketch in other.sizes.items():
+            own = self.sizes.get(group)
+            if own is None:
+                own = self.sizes[group] = DDSketch()
+            own.merge(sketch)
+        self.size_missing.update(other.size_missing)
+        tracked = self.size_paths.merge(other.size_paths).counts
+        for kind, group in [*self.sizes, *self.size_missing]:
+            if kind == "path" and group not in tracked:
+                self._drop_size_path(group)
+        return self
+
+    # ----- wyniki -----
+    def top(self, field: str, n: int) -> list[tuple[str, int]]:
+        """n najczęstszych wartości pola z TOP_FIELDS; w trybie approx liczby to szacunki (górne)."""
+        counter = self.tops[field]
+        if self.top_mode == "exact":
+            return _top(counter, n)
+        return [(key, count) for key, count, _ in counter.top(n)]
+
+    def top_error(self, field: str) -> int:
+        """Maksymalne zawyżenie liczb z `top(field, n)` (0 w trybie exact)."""
+        return 0 if self.top_mode == "exact" else self.tops[field].max_error()
+
+    def top_ips(self, n: int) -> list[tuple[str, int]]:
+        return self.top("remote_host", n)
+
+    def top_paths(self, n: int) -> list[tuple[str, int]]:
+        return self.top("path", n)
+
+    def status_classes(self) -> dict[str, int]:
+        """Liczba żądań wg klasy statusu ("1xx".."5xx"), rosnąco."""
+        classes: Counter[str] = Counter()
+        for status, count in self.statuses.items():
+            classes[f"{status // 100}xx"] += count
+        return dict(sorted(classes.items()))
+
+    def method_counts(self) -> list[tuple[str, int]]:
+        return _top(self.methods, len(self.methods))
+
+    def bucket_label(self, start: int) -> str:
+        """Początek kubełka (epoch) -> etykieta UTC, np. '2023-10-10 11:00'."""
+        if self.time_bucket == "none":
+            return NO_BUCKET_LABEL
+        day, seconds = divmod(start, 86400)
+        if self.time_bucket == "day":
+            return _day_label(day)
+        if self.time_bucket == "hour":
+            return f"{_day_label(day)} {seconds // 3600:02d}:00"
+        return f"{_day_label(day)} {seconds // 3600:02d}:{seconds // 60 % 60:02d}"
+
+    def histogram(self) -> list[tuple[str, int]]:
+        """Kubełki czasu rosnąco: (etykieta, liczba żądań)."""
+        return list(self.iter_histogram())
+
+    def iter_histogram(self) -> Iterator[tuple[str, int]]:
+        """Jak histogram(), ale leniwie - etykiety powstają dopiero przy odczycie wiersza."""
+        buckets = self.buckets
+        for start in sorted(buckets):
+            yield self.bucket_label(start), buckets[start]
+
+    def unique_per_bucket(self, field: str) -> list[tuple[str, int]]:
+        """Szacowana liczba różnych wartości pola w każdym kubełku czasu (rosnąco)."""
+        return list(self.iter_unique_per_bucket(field))
+
+    def iter_unique_per_bucket(self, field: str) -> Iterator[tuple[str, int]]:
+        per_bucket = self.uniques[field]
+        for start in sorted(per_bucket):
+            yield self.bucket_label(start), per_bucket[start].estimate()
+
+    def unique_relative_error(self) -> float:
+        """Typowy błąd względny szacunków unikalnych (zależy tylko od hll_precision)."""
+        return HyperLogLog(self.hll_precision).relative_error()
+
+    def unique_total(self, field: str) -> int:
+        """Szacowana liczba różnych wartości pola w całym wejściu (suma HLL wszystkich kubełków)."""
+        total = HyperLogLog(self.hll_precision)
+        for hll in self.uniques[field].values():
+            total.merge(hll)
+        return total.estimate()
+
+    def size_stats(self, kind: str, group: object = "") -> dict:
+        """{"count": z rozmiarem, "missing": size '-', "p50": ..., ...} dla grupy (kwantyle w bajtach)."""
+        sketch = self.sizes.get((kind, group))
+        stats = {"count": 0 if sketch is None else sketch.count, "missing": self.size_missing[(kind, group)]}
+        for q in self.size_quantiles:
+            value = None if sketch is None else sketch.quantile(q)
+            stats[quantile_label(q)] = None if value is None else round(value)
+        return stats
+
+    def size_groups(self, kind: str) -> list:
+        """Grupy danego rodzaju (posortowane), które mają rozmiary lub braki."""
+        groups = {group for k, group in self.sizes if k == kind}
+        groups.update(group for k, group in self.size_missing if k == kind)
+        return sorted(groups)
+
+    def summary(self, top: int, lazy: bool = False) -> dict:
+        """
+        Wszystkie wyniki jako dict (klucze i wartości zgodne z JSON).
+        lazy=True: listy per kubełek czasu (histogram, per_bucket) są generatorami - do zapisu
+        strumieniowego (reporter), bez budowania list o długości liczby kubełków.
+        """
+        rows = iter if lazy else list
+        out = {
+            "requests": self.requests,
+            "time_bucket": self.time_bucket,
+            "top_mode": self.top_mode,
+            "top_ips": [{"ip": ip, "count": count} for ip, count in self.top_ips(top)],
+            "top_paths": [{"path": path, "count": count} for path, count in self.top_paths(top)],
+            "top_referrers": [{"referrer": ref, "count": count} for ref, count in self.top("referrer", top)],
+            "top_user_agents": [{"user_agent": ua, "count": count} for ua, count in self.top("user_agent", top)],
+            "status_classes": self.status_classes(),
+            "methods": dict(self.method_counts()),
+            "histogram": rows({"bucket": label, "count": count} for label, count in self.iter_histogram()),
+        }
+        if self.top_mode == "approx":
+            out["top_max_error"] = {field: self.top_error(field) for field in TOP_FIELDS}
+        if self.uniques:
+            out["unique"] = {
+                field: {
+                    "total": self.unique_total(field),
+                    "per_bucket": rows(
+                        {"bucket": label, "count": n} for label, n in self.iter_unique_per_bucket(field)
+                    ),
+                }
+                for field in self.uniques
+            }
+        if self.size_quantiles:
+            out["size_quantiles"] = {
+                "quantiles": list(self.size_quantiles),
+                "all": self.size_stats("all"),
+                "status_classes": {group: self.size_stats("status", group) for group in self.size_groups("status")},
+                "top_paths": {path: self.size_stats("path", path) for path, _ in self.top_paths(top)},
+                "per_bucket": rows(
+                    {"bucket": self.bucket_label(start), **self.size_stats("bucket", start)}
+                    for start in self.size_groups("bucket")
+                ),
+            }
+        return out
@@ -0,0 +1,100 @@
+"""
+Module: checkpoint.py
+Cel: Przyrostowe przetwarzanie (--state-file): kolejne uruchomienie czyta tylko bajty dopisane do logu.
+Public API:
+  - class Checkpoint
+      Stan po uruchomieniu: ścieżka, inode/urządzenie, rozmiar, offset (koniec ostatniej PEŁNEJ
+      linii), liczniki narastające i zserializowany Aggregator.
+  - def load_checkpoint(path) -> Checkpoint | None
+      None, gdy pliku stanu nie ma; ValueError, gdy jest uszkodzony albo z innej wersji.
+  - def save_checkpoint(state, path) -> None
+      Zapis atomowy (plik tymczasowy + os.replace) - przerwany zapis nie psuje poprzedniego stanu.
+  - def resume_offset(state, log_path) -> (offset, reason)
+      reason: "new" (brak stanu / inny plik), "resume", "rotated" (inny inode), "truncated"
+      (plik krótszy niż zapisany offset); poza "resume" czytanie od bajtu 0.
+  - def complete_lines_end(path, size) -> int
+      Koniec ostatniej pełnej linii (po '\\n') w pierwszych `size` bajtach: niedopisana linia
+      zostaje na następne uruchomienie.
+Stan serializowany jest przez pickle (jak wyniki z procesów roboczych) - plik stanu jest
+zaufany, tak jak sam log; nie wczytuj stanu z niezaufanego źródła.
+"""
+from __future__ import annotations
+
+import os
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Final, Optional
+
+from .aggregator import Aggregator
+
+STATE_VERSION: Final[int] = 2  # 2: Aggregator.size_paths
+_TAIL_PROBE_BYTES: Final[int] = 64 * 1024
+
+
+@dataclass
+class Checkpoint:
+    """Stan przyrostowego przetwarzania jednego pliku logu."""
+
+    path: str
+    inode: int
+    device: int
+    size: int
+    offset: int
+    lines: int = 0
+    ok: int = 0
+    bad: int = 0
+    filtered: int = 0
+    aggregator: Optional[Aggregator] = None
+    version: int = STATE_VERSION
+
+
+def load_checkpoint(path: Path) -> Optional[Checkpoint]:
+    """Wczytuje stan; None, gdy plik nie istnieje."""
+    try:
+        with open(path, "rb") as file:
+            state = pickle.load(file)
+    except FileNotFoundError:
+        return None
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+        raise ValueError(f"Uszkodzony plik stanu {path}: {e}") from None
+    if not isinstance(state, Checkpoint) or state.version != STATE_VERSION:
+        raise ValueError(f"Nieobsługiwany plik stanu (oczekiwano wersji {STATE_VERSION}): {path}")
+    return state
+
+
+def save_checkpoint(state: Checkpoint, path: Path) -> None:
+    """Zapisuje stan atomowo; brakujący katalog docelowy jest tworzony."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as file:
+        pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp, path)
+
+
+def resume_offset(state: Optional[Checkpoint], log_path: Path) -> tuple[int, str]:
+    """Offset, od którego czytać `log_path`, i powód (patrz opis modułu)."""
+    if state is None or state.path != str(log_path.resolve()):
+        return 0, "new"
+    st = log_path.stat()
+    if (st.st_ino, st.st_dev) != (state.inode, state.device):
+        return 0, "rotated"
+    if st.st_size < state.offset:
+        return 0, "truncated"
+    return state.offset, "resume"
+
+
+def complete_lines_end(path: Path, size: int) -> int:
+    """Offset tuż za ostatnim '\\n' w [0, size) (0, gdy nie ma pełnej linii)."""
+    with open(path, "rb") as file:
+        end = size
+        while end > 0:
+            start = max(0, end - _TAIL_PROBE_BYTES)
+            file.seek(start)
+            pos = file.read(end - start).rfind(b"\n")
+            if pos >= 0:
+                return start + pos + 1
+            end = start
+    return 0
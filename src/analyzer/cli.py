@@ -18,37 +18,55 @@ Zmiana (lekcja 3): przygotowanie integracji parsera.
 # [ ] wersja narzędzia może być brana z pyproject (na razie wpisz placeholder)
 # [ ] zostaw TODO pod integrację z parserem/aggregatorem/reporterem w kolejnych lekcjach
 
+import re
+import sys
+import time
 import typer
 from typing_extensions import Annotated
 from pathlib import Path
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Optional
-from .io_reader import read_log_lines
-from .parser import parse_line
+from functools import partial
+from typing import TYPE_CHECKING, Iterator, Optional
+from ._version import __version__
+from .io_reader import (
+    STDIN_INPUT, STREAM_READ_BYTES, check_encoding, detect_compression, expand_inputs, is_stream_input,
+)
+from .parser import parse_timestamp_epoch
+from .errors import ERROR_SAMPLES_DEFAULT, ERRORS_LOG_NAME, ErrorSample, format_reasons, merge_reasons, write_errors_log
+
+# Moduły analizy (aggregator, sketches, pipeline, reporter, timeindex) i moduły potrzebne tylko przy
+# części opcji (--state-file, --stats-json/--profile, filtry linii, --workers, --cache-dir, --sqlite,
+# --follow) są importowane w funkcjach, które ich używają - `--help`, `--version` i błędy opcji nie
+# płacą za ich import, a zwykły przebieg tylko za to, czego używa (patrz tests/test_startup.py).
+if TYPE_CHECKING:
+    from .aggregator import Aggregator
+    from .checkpoint import Checkpoint
+    from .filters import LineFilter
+    from .pipeline import ChunkResult, Event
+    from .profiling import RunProfiler, StageTimings
+
+# Kopie stałych z aggregator / sketches / timeindex na potrzeby domyślnych wartości i pomocy opcji
+# (bez importu tych modułów przy budowie CLI); zgodność z oryginałami pilnuje tests/test_startup.py.
+_UNIQUE_FIELDS = ("remote_host", "path", "referrer", "user_agent")  # aggregator.UNIQUE_FIELDS
+_HLL_MIN_PRECISION = 4  # sketches.HLL_MIN_PRECISION
+_HLL_MAX_PRECISION = 16  # sketches.HLL_MAX_PRECISION
+_HLL_DEFAULT_PRECISION = 12  # sketches.HLL_DEFAULT_PRECISION
+_INDEX_EVERY_BYTES = 1024 * 1024  # timeindex.DEFAULT_EVERY_BYTES
 
 
 # ===== Aplikacja =====
 app = typer.Typer(no_args_is_help=True)
 
 
-# ===== Pomocnicze: pobieranie wersji z pyproject.toml =====
+# ===== Wersja narzędzia =====
 def get_version() -> str:
     """
-    Czyta wersję z pyproject.toml (tool.poetry.version).
-    Działa również w package-mode=false.
+    Wersja z _version.py (wpisana na stałe, zgodna z tool.poetry.version w pyproject.toml).
+    Wcześniej czytana z pyproject.toml przy każdym --version - wymagało to tomllib i pliku
+    pyproject obok pakietu (po instalacji go nie ma).
     """
-    try:
-        import tomllib  # python 3.11+
-
-        root = Path(__file__).resolve().parents[2]
-        pyproj = root / "pyproject.toml"
-
-        with pyproj.open("rb") as f:
-            data = tomllib.load(f)
-            return data["tool"]["poetry"]["version"]
-
-    except Exception:
-        return "Error has occured, version: 0.0.0"
+    return __version__
 
 
 # ===== Globalny callback: --version działa bez wymagania --input =====
@@ -66,7 +84,7 @@ def app_callback(
         typer.echo(f"python-log-analyzer {get_version()}")
         raise typer.Exit(code=0)
 
-# ===== Enum (placeholder) =====
+# ===== Enum =====
 class ReportFormat(str, Enum):
     TXT = "txt"
     CSV = "csv"
@@ -76,14 +94,346 @@ class FailPolicy(str, Enum):
     SKIP = "skip"
     STRICT = "strict"
 
+class ReaderBackend(str, Enum):
+    TEXT = "text"
+    MMAP = "mmap"
+
+class TimeBucket(str, Enum):
+    MINUTE = "minute"
+    HOUR = "hour"
+    DAY = "day"
+    NONE = "none"
+
+class TopMode(str, Enum):
+    EXACT = "exact"
+    APPROX = "approx"
+
+
+# ===== Rozmiary pamięci w opcjach (np. --sketch-memory 64MB) =====
+_MEMORY_UNITS = {"": 1, "B": 1, "K": 1024, "KB": 1024, "KIB": 1024, "M": 1024**2, "MB": 1024**2,
+                 "MIB": 1024**2, "G": 1024**3, "GB": 1024**3, "GIB": 1024**3}
+
+
+def parse_memory_size(text: str, param_hint: str = "'--sketch-memory'") -> int:
+    """'64MB' / '512k' / '1GiB' / '1048576' -> bajty (jednostki binarne: 1 MB = 1024**2 B)."""
+    m = re.fullmatch(r"\s*(\d+)\s*([A-Za-z]*)\s*", text)
+    if not m or m.group(2).upper() not in _MEMORY_UNITS or int(m.group(1)) == 0:
+        raise typer.BadParameter(
+            f"Niepoprawny rozmiar pamięci: {text!r} (np. 64MB, 512KB, 1GB)", param_hint=param_hint
+        )
+    return int(m.group(1)) * _MEMORY_UNITS[m.group(2).upper()]
+
+
+def parse_unique_fields(text: str) -> tuple[str, ...]:
+    """'remote_host,user_agent' -> krotka pól (pusty napis = brak liczenia unikalnych)."""
+    from .aggregator import UNIQUE_FIELDS
+
+    fields = tuple(dict.fromkeys(part.strip() for part in text.split(",") if part.strip()))
+    unknown = [field for field in fields if field not in UNIQUE_FIELDS]
+    if unknown:
+        raise typer.BadParameter(
+            f"Nieznane pola: {', '.join(unknown)} (dozwolone: {', '.join(UNIQUE_FIELDS)})", param_hint="'--unique'"
+        )
+    return fields
+
+
+def parse_line_filter(status: str, method: str, path_prefixes: Optional[list[str]]) -> Optional["LineFilter"]:
+    """--status / --method / --path-prefix -> LineFilter (None, gdy żaden filtr nie jest podany)."""
+    if not (status.strip() or method.strip() or path_prefixes):
+        return None
+    from .filters import LineFilter, parse_status_filter
+
+    try:
+        statuses = parse_status_filter(status)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="'--status'")
+    try:
+        line_filter = LineFilter(
+            statuses, (m.strip() for m in method.split(",") if m.strip()), path_prefixes or (),
+        )
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="'--method'")
+    return line_filter or None
+
+
+def parse_quantiles(text: str) -> tuple[float, ...]:
+    """'0.5,0.95,0.99' -> (0.5, 0.95, 0.99); pusty napis = bez kwantyli rozmiaru."""
+    try:
+        values = tuple(sorted({float(part) for part in text.split(",") if part.strip()}))
+    except ValueError:
+        values = (-1.0,)
+    if any(not (0 <= q <= 1) for q in values):
+        raise typer.BadParameter(
+            f"Niepoprawne kwantyle: {text!r} (liczby z [0, 1], np. 0.5,0.95,0.99)", param_hint="'--quantiles'"
+        )
+    return values
+
+def parse_time_bound(text: Optional[str], param_hint: str) -> Optional[int]:
+    """
+    Granica --since/--until -> epoch UTC. Format ISO 8601 ('2023-10-10T14:00:00', '2023-10-10 14:00+02:00';
+    bez strefy = UTC) albo jak w logu ('10/Oct/2023:13:55:36 +0200'). None/'' = bez ograniczenia.
+    """
+    if not text:
+        return None
+    try:
+        return parse_timestamp_epoch(text)
+    except ValueError:
+        pass
+    try:
+        moment = datetime.fromisoformat(text.strip())
+    except ValueError:
+        raise typer.BadParameter(
+            f"Niepoprawny czas: {text!r} (np. 2023-10-10T14:00:00 albo '10/Oct/2023:13:55:36 +0200')",
+            param_hint=param_hint,
+        ) from None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+# ===== Wypisywanie zdarzeń z pipeline (podgląd, błędy) =====
+class _Console:
+    """
+    Przelicza lokalne numery linii ze zdarzeń ChunkResult na globalne i wypisuje je.
+    Fragmenty muszą być podawane w kolejności wejścia (handle..., potem advance).
+    """
+
+    def __init__(self, preview_cap: int, error_samples: int = ERROR_SAMPLES_DEFAULT):
+        self.preview_cap = preview_cap
+        self.error_samples = error_samples
+        self.lines = 0  # liczniki fragmentów już scalonych
+        self.ok = 0
+        self.bad = 0
+        self.filtered = 0
+        self.fallback_lines = 0
+        self.parsed_preview_shown = 0  # licznik sparsowanych pokazanych w podglądzie
+        self.aggregator: Optional["Aggregator"] = None  # scalony stan agregatorów fragmentów
+        self.timings: Optional["StageTimings"] = None  # scalone czasy etapów (--stats-json / --profile)
+        self.bad_reasons: dict[str, int] = {}  # błędne linie wg przyczyny (errors.error_reason)
+        self.bad_samples: list[ErrorSample] = []  # pierwsze błędne linie, numery globalne
+
+    def handle(self, event: "Event") -> None:
+        kind, n, text = event
+        if kind == "line":
+            if self.lines + n <= self.preview_cap:
+                typer.echo(f"[{self.lines + n}] {text}")
+        elif kind == "parsed":
+            if self.parsed_preview_shown < self.preview_cap:
+                typer.echo(f"[parsed {self.ok + n}] {text}")
+                self.parsed_preview_shown += 1
+        elif kind == "fatal":
+            typer.echo(f"Błąd parsowania w linii {self.lines + n}: {text}", err=True)
+
+    def advance(self, chunk: "ChunkResult") -> None:
+        room = self.error_samples - len(self.bad_samples)
+        if room > 0:
+            self.bad_samples += [(self.lines + n, message, text) for n, message, text in chunk.bad_samples[:room]]
+        merge_reasons(self.bad_reasons, chunk.bad_reasons)
+        self.lines += chunk.lines
+        self.ok += chunk.ok
+        self.bad += chunk.bad
+        self.filtered += chunk.filtered
+        self.fallback_lines += chunk.fallback_lines
+        if chunk.aggregator is not None:
+            if self.aggregator is None:
+                self.aggregator = chunk.aggregator
+            else:
+                self.aggregator.merge(chunk.aggregator)
+        if chunk.timings is not None:
+            if self.timings is None:
+                self.timings = chunk.timings
+            else:
+                self.timings.merge(chunk.timings)
+
+
+def _print_report(aggregator: "Aggregator", top: int) -> None:
+    """Wyniki agregacji na stdout (ten sam renderer co report.txt)."""
+    from .reporter import render_txt
+
+    render_txt(aggregator, top, sys.stdout)
+    sys.stdout.flush()
+
+
+def _write_errors_log(console: _Console, path: Path) -> None:
+    """
+    Próbka błędnych linii (--error-samples) w errors.log - tylko gdy jest co zapisać. Bez próbki
+    (brak błędów albo --error-samples 0) istniejący plik zostaje nietknięty: ten przebieg go nie utworzył.
+    """
+    if not console.bad_samples:
+        return
+    try:
+        write_errors_log(path, console.bad_samples, console.bad_reasons, console.bad)
+        typer.echo(f"Błędne linie (pierwsze {len(console.bad_samples)} z {console.bad}): {path}", err=True)
+    except OSError as e:
+        raise typer.BadParameter(f"Nie można zapisać {path}: {e}", param_hint="'--outdir'")
+
+
+def _write_run_stats(
+    console: _Console, input_paths: list[Path], wall_seconds: float,
+    stats_json: Optional[Path], profiler: Optional["RunProfiler"],
+) -> None:
+    """--stats-json / --profile: dokument statystyk przebiegu i pliki profilu."""
+    from .profiling import StageTimings, build_stats, write_stats_json
+
+    if profiler is not None:
+        profiler.stop()
+    stats = build_stats(
+        input_paths, console.lines, console.ok, console.bad, console.filtered, console.fallback_lines,
+        wall_seconds, console.timings or StageTimings(), console.bad_reasons,
+        tracemalloc_peak=None if profiler is None else profiler.traced_peak,
+    )
+    if stats_json is not None:
+        try:
+            write_stats_json(stats_json, stats)
+        except OSError as e:
+            raise typer.BadParameter(f"Nie można zapisać statystyk {stats_json}: {e}", param_hint="'--stats-json'")
+        typer.echo(f"Statystyki (--stats-json): {stats_json}")
+    if profiler is not None:
+        try:
+            paths = profiler.dump(stats)
+        except OSError as e:
+            raise typer.BadParameter(f"Nie można zapisać profilu w {profiler.outdir}: {e}", param_hint="'--outdir'")
+        typer.echo(f"Profil (--profile): {', '.join(str(path) for path in paths)}")
+
+
+def _iter_chunks(
+    paths: list[Path], workers: int, max_open_files: int, limit: Optional[int], options: dict
+) -> Iterator["ChunkResult"]:
+    """
+    Wyniki (ChunkResult) dla wielu plików i/lub --workers, w kolejności wejścia.
+    - --workers > 1 (bez --limit i --cache-dir): zakresy wszystkich plików w jednej puli procesów;
+      pliki skompresowane przetwarzane strumieniowo w procesie głównym,
+    - --sqlite: pliki po kolei w bieżącym wątku (rekordy trafiają do jednego połączenia),
+    - w przeciwnym razie: scheduler plików (wątki, największe pliki najpierw).
+    """
+    from .pipeline import process_file
+
+    if options.get("sink") is not None:
+        # --sqlite: jedno połączenie z bazą - pliki po kolei, w bieżącym wątku
+        remaining = limit
+        for path in paths:
+            chunk = process_file(path, limit=remaining, **options)
+            yield chunk
+            if remaining is not None:
+                remaining -= chunk.lines
+            if chunk.failed or (remaining is not None and remaining <= 0):
+                return
+        return
+
+    if workers > 1 and limit is None and options.get("cache") is None:
+        from concurrent.futures import ProcessPoolExecutor
+        from .parallel import parse_parallel
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path in paths:
+                if detect_compression(path) is not None:
+                    yield process_file(path, **options)
+                else:
+                    chunks = parse_parallel(path, workers, pool=pool, **options)
+                    try:
+                        yield from chunks
+                    finally:
+                        chunks.close()
+        return
+
+    from .scheduler import process_files
+
+    chunks = process_files(paths, max_open_files=max_open_files, limit=limit, **options)
+    try:
+        yield from chunks
+    finally:
+        chunks.close()
+
+
+def _follow(paths: list[Path], encoding: str, window: int, interval: float, top: int, follow_for: float) -> None:
+    """--follow: statystyki okna na stdout do Ctrl+C (albo --follow-for); kończy program."""
+    if len(paths) != 1 or is_stream_input(paths[0]) or detect_compression(paths[0]) is not None:
+        raise typer.BadParameter("Wymaga dokładnie jednego, nieskompresowanego pliku --input", param_hint="'--follow'")
+    from .live import follow_stats
+
+    typer.echo(f"Śledzenie {paths[0]} (okno {window}s, co {interval:g}s; Ctrl+C kończy)")
+    try:
+        follow_stats(
+            paths[0], window=window, interval=interval, top=top, encoding=encoding,
+            emit=typer.echo, duration=follow_for or None,
+        )
+    except KeyboardInterrupt:
+        pass
+    raise typer.Exit(code=0)
+
+
+_RESUME_NOTES = {
+    "new": "nowy stan, od początku pliku",
+    "resume": "wznowiono od bajtu {offset}",
+    "rotated": "plik zrotowany (inny inode), od początku nowego pliku",
+    "truncated": "plik obcięty (krótszy niż zapisany offset), od początku",
+}
+
+
+def _resume_state(
+    state_file: Path, paths: list[Path], limit: Optional[int], console: _Console, options: dict
+) -> "Checkpoint":
+    """
+    --state-file: ustala zakres bajtów do przeczytania (od zapisanego offsetu do końca ostatniej
+    pełnej linii) i wstawia zapisany agregator do konsoli, żeby nowe fragmenty scaliły się z nim.
+    Zwraca stan do zapisania po udanym przebiegu (inode / rozmiar / offset z chwili startu,
+    liczniki narastające sprzed tego uruchomienia - dolicza je `_save_state`).
+    """
+    from .checkpoint import Checkpoint, complete_lines_end, load_checkpoint, resume_offset
+
+    if len(paths) != 1 or is_stream_input(paths[0]) or detect_compression(paths[0]) is not None:
+        raise typer.BadParameter("Wymaga dokładnie jednego, nieskompresowanego pliku --input", param_hint="'--state-file'")
+    if limit is not None:
+        raise typer.BadParameter("Nie łączy się z --limit (offset musi obejmować pełne przetworzenie)", param_hint="'--state-file'")
+    try:
+        state = load_checkpoint(state_file)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="'--state-file'")
+
+    path = paths[0]
+    offset, reason = resume_offset(state, path)
+    st = path.stat()
+    end = complete_lines_end(path, st.st_size)
+    options["byte_range"] = (offset, end)
+    typer.echo(f"Stan (--state-file): {_RESUME_NOTES[reason].format(offset=offset)}")
+
+    pending = Checkpoint(str(path.resolve()), st.st_ino, st.st_dev, st.st_size, end)
+    if state is None or reason == "new":
+        return pending
+    if state.aggregator is not None:
+        # wszystkie opcje wprost, przed czytaniem wejścia (np. inna --hll-precision wyszłaby dopiero przy scalaniu)
+        saved, current = state.aggregator.options(), options["aggregator_factory"]().options()
+        changed = [f"{name}: {saved[name]!r} -> {current[name]!r}" for name in current if saved.get(name) != current[name]]
+        if changed:
+            raise typer.BadParameter(
+                f"Zapisany stan ma inne opcje agregacji ({'; '.join(changed)}); usuń plik stanu albo użyj tych samych opcji",
+                param_hint="'--state-file'",
+            )
+        console.aggregator = state.aggregator
+    pending.lines, pending.ok, pending.bad, pending.filtered = state.lines, state.ok, state.bad, state.filtered
+    return pending
+
+
+def _save_state(state: "Checkpoint", state_file: Path, console: _Console) -> "Checkpoint":
+    """Zapisuje stan po udanym przebiegu: liczniki narastające i scalony agregator."""
+    from .checkpoint import save_checkpoint
+
+    state.lines += console.lines
+    state.ok += console.ok
+    state.bad += console.bad
+    state.filtered += console.filtered
+    state.aggregator = console.aggregator
+    save_checkpoint(state, state_file)
+    return state
+
+
 @app.command()
 def main(
-    input_path: Annotated[
-        Path,
+    input_patterns: Annotated[
+        list[str],
         typer.Option(
             "--input",
-            help="Ścieżka do pliku logów (Apache/Nginx)",
-            exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True
+            help="Plik logów (Apache/Nginx), katalog albo wzorzec glob, np. 'logs/*.log*' (opcję można powtarzać); '-' = stdin, np. zcat log.gz | ... --input -",
         )
     ],
 
@@ -98,66 +448,221 @@ def main(
     fail_policy: Annotated[
         FailPolicy,
         typer.Option("--fail-policy", help="Polityka błędów: skip/strict")] = FailPolicy.SKIP,
-    # PlaceHoldery
     preview_cap: Annotated[int, typer.Option("--preview-cap", help="Podgląd: pokaż pierwsze N linii (0=wyłączone)")] = 0,
     outdir_path: Annotated[Path, typer.Option("--outdir", help="Katalog raportów")] = Path("./reports"),
     format: Annotated[ReportFormat, typer.Option(help="Format raportu: txt|csv|json")] = ReportFormat.TXT,
-    top: Annotated[int, typer.Option("--top", help="Ilość pierwszych linijek.")] = 10,
-    time_bucket: Annotated[str, typer.Option("--time-bucket", help="Jednostka grupowania czasu (hour/day)")] = "hour",
+    gzip_report: Annotated[bool, typer.Option("--gzip", help="Raport skompresowany gzip (report.<format>.gz)")] = False,
+    top: Annotated[int, typer.Option("--top", min=1, help="Ile pozycji w listach top (IP, ścieżki)")] = 10,
+    time_bucket: Annotated[
+        TimeBucket,
+        typer.Option("--time-bucket", help="Szerokość kubełka histogramu czasu (UTC): minute/hour/day/none (bez czasu - szybciej)")] = TimeBucket.HOUR,
+    top_mode: Annotated[
+        TopMode,
+        typer.Option("--top-mode", help="Listy top: exact (Counter, pamięć rośnie z liczbą kluczy) / approx (szkic Space-Saving, stała pamięć)")] = TopMode.EXACT,
+    sketch_memory: Annotated[
+        str,
+        typer.Option("--sketch-memory", help="Budżet pamięci szkiców --top-mode approx na agregator, np. 64MB")] = "64MB",
+    unique: Annotated[
+        str,
+        typer.Option("--unique", help=f"Liczba unikalnych wartości na kubełek czasu (HyperLogLog) dla pól: {','.join(_UNIQUE_FIELDS)}, np. remote_host,user_agent")] = "",
+    hll_precision: Annotated[
+        int,
+        typer.Option("--hll-precision", min=_HLL_MIN_PRECISION, max=_HLL_MAX_PRECISION, help="Precyzja HLL p: 2**p B na kubełek i pole, błąd ~1.04/sqrt(2**p)")] = _HLL_DEFAULT_PRECISION,
+    quantiles: Annotated[
+        str,
+        typer.Option("--quantiles", help="Kwantyle rozmiaru odpowiedzi (całość, klasy statusów, ścieżki, kubełki czasu), np. 0.5,0.95,0.99")] = "",
     quiet: Annotated[bool, typer.Option("--quiet", help="Tryb cichy - minimum logów")] = False,
+    workers: Annotated[
+        int,
+        typer.Option("--workers", min=1, help="Liczba procesów parsujących (1 = szeregowo; przy --limit zawsze szeregowo)")] = 1,
+    reader: Annotated[
+        ReaderBackend,
+        typer.Option("--reader", help="Backend odczytu: text (linie str) / mmap (surowe bajty; linie ASCII dekodowane w całości raz, pozostałe - tylko pola)")] = ReaderBackend.TEXT,
+    max_open_files: Annotated[
+        int,
+        typer.Option("--max-open-files", min=1, help="Ile plików wejścia przetwarzać jednocześnie (wiele plików)")] = 4,
+    since: Annotated[
+        Optional[str],
+        typer.Option("--since", help="Tylko rekordy od tej chwili (włącznie), ISO 8601 lub format logu; bez strefy = UTC")] = None,
+    until: Annotated[
+        Optional[str],
+        typer.Option("--until", help="Tylko rekordy przed tą chwilą (wyłącznie); z indeksem (analyzer index build) bez czytania całego pliku")] = None,
+    status: Annotated[
+        str,
+        typer.Option("--status", help="Tylko rekordy o tych statusach / klasach, np. 5xx albo 404,429")] = "",
+    method: Annotated[
+        str,
+        typer.Option("--method", help="Tylko rekordy z tymi metodami HTTP, np. POST albo GET,HEAD")] = "",
+    path_prefix: Annotated[
+        Optional[list[str]],
+        typer.Option("--path-prefix", help="Tylko rekordy ze ścieżką o tym prefiksie, np. /api/ (opcję można powtarzać)")] = None,
+    state_file: Annotated[
+        Optional[Path],
+        typer.Option("--state-file", help="Plik stanu przetwarzania przyrostowego: kolejne uruchomienie czyta tylko linie dopisane do logu")] = None,
+    cache_dir: Annotated[
+        Optional[Path],
+        typer.Option("--cache-dir", help="Katalog pamięci podręcznej sparsowanych kolumn: kolejne raporty z niezmienionego pliku bez parsowania")] = None,
+    cache_size: Annotated[
+        str,
+        typer.Option("--cache-size", help="Limit rozmiaru --cache-dir (najdawniej używane wpisy są usuwane), np. 1GB")] = "1GB",
+    sqlite: Annotated[
+        Optional[Path],
+        typer.Option("--sqlite", help="Zapisz sparsowane rekordy do bazy SQLite (tabele requests, paths, user_agents; widok requests_v)")] = None,
+    follow: Annotated[
+        bool,
+        typer.Option("--follow", help="Śledź plik jak tail -F (także po rotacji) i co --interval s wypisuj statystyki ostatnich --window s")] = False,
+    window: Annotated[int, typer.Option("--window", min=1, help="--follow: długość okna statystyk [s]")] = 60,
+    interval: Annotated[float, typer.Option("--interval", min=0.01, help="--follow: co ile sekund wypisywać statystyki")] = 5.0,
+    follow_for: Annotated[float, typer.Option("--follow-for", min=0, help="--follow: zakończ po tylu sekundach (0 = do Ctrl+C)")] = 0,
+    stats_json: Annotated[
+        Optional[Path],
+        typer.Option("--stats-json", help="Zapisz statystyki przebiegu w JSON: linie/s, bajty/s, czasy etapów, przyczyny błędnych linii, szczyt pamięci")] = None,
+    error_samples: Annotated[
+        int,
+        typer.Option("--error-samples", min=0, help=f"Ile pierwszych błędnych linii zapisać w <outdir>/{ERRORS_LOG_NAME} (0 = bez pliku; liczniki wg przyczyny zawsze)")] = ERROR_SAMPLES_DEFAULT,
+    profile: Annotated[
+        bool,
+        typer.Option("--profile", help="Profil cProfile + tracemalloc procesu głównego: <outdir>/profile.pstats i profile.txt")] = False,
+    read_size: Annotated[
+        str,
+        typer.Option("--read-size", help="Porcja odczytu wejścia strumieniowego (--input - / potok nazwany), np. 1MB, 4MB")] = f"{STREAM_READ_BYTES // 1024**2}MB",
 
     ):
 
+    from .aggregator import TOP_FIELDS, Aggregator
+    from .pipeline import process_file
+    from .reporter import write_report
+    from .sketches import capacity_for_memory
+
     eff_limit: Optional[int] = None if (limit == 0 or limit < 0) else limit
+    sketch_capacity = capacity_for_memory(parse_memory_size(sketch_memory), len(TOP_FIELDS))
+    unique_fields = parse_unique_fields(unique)
+    size_quantiles = parse_quantiles(quantiles)
+    time_range = (parse_time_bound(since, "'--since'"), parse_time_bound(until, "'--until'"))
+    if time_range == (None, None):
+        time_range = None
+    line_filter = parse_line_filter(status, method, path_prefix)
+    stream_read_size = parse_memory_size(read_size, param_hint="'--read-size'")
+    try:
+        check_encoding(encoding)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="'--encoding'")
 
     try:
-        count = 0
-        parsed_ok = 0
-        parsed_bad = 0
-        parsed_preview_shown = 0 #licznik sparsowanych pokazanych w podglądzie
+        input_paths = expand_inputs(input_patterns)
+    except FileNotFoundError as e:
+        raise typer.BadParameter(f"Plik nie istnieje / brak dopasowań: {e}", param_hint="'--input'")
+    streamed = any(is_stream_input(path) for path in input_paths)
+    if streamed and len(input_paths) > 1:
+        raise typer.BadParameter(
+            "Wejście strumieniowe (stdin '-' albo potok) musi być jedynym --input", param_hint="'--input'"
+        )
 
+    if follow:
+        _follow(input_paths, encoding, window, interval, top, follow_for)
+
+    sink = None
+    profiler = None
+    try:
         # 1) weź "wartość" enuma albo zamień na string
         policy = (fail_policy.value if isinstance(fail_policy, Enum) else str(fail_policy))
-        
+
         # 2) zrób małe litery
         policy = policy.lower()
-        
-        for line in read_log_lines(input_path, encoding=encoding, limit=eff_limit):
-            count += 1
-           
-            if not quiet and preview_cap > 0 and count <= preview_cap:
-                typer.echo(f"[{count}] {line}")
+
+        console = _Console(preview_cap=preview_cap, error_samples=error_samples)
+        options: dict = dict(
+            encoding=encoding, reader=reader.value, fail_policy=policy,
+            preview_cap=preview_cap, quiet=quiet,
+            aggregator_factory=partial(
+                Aggregator, time_bucket.value, top_mode=top_mode.value, sketch_capacity=sketch_capacity,
+                unique_fields=unique_fields, hll_precision=hll_precision, size_quantiles=size_quantiles,
+            ),
+            time_range=time_range,
+            line_filter=line_filter,
+            stage_timings=stats_json is not None or profile,
+            error_samples=error_samples,
+        )
+        if streamed:
+            options["read_size"] = stream_read_size
+        if cache_dir is not None:
+            from .parse_cache import ParseCache
+
+            options["cache"] = ParseCache(cache_dir, parse_memory_size(cache_size, param_hint="'--cache-size'"))
+        if sqlite is not None:
+            import sqlite3
+            from .sqlite_sink import SqliteSink
 
             try:
-                rec = parse_line(line, fail_policy=policy)
-            
-                if rec is not None:
-                    parsed_ok +=1
-
-                    if not quiet and preview_cap > 0 and parsed_preview_shown < preview_cap: 
-                    #!r → używa repr(rec) (techniczny, „debugowy” zapis obiektu)
-                        typer.echo(f"[parsed {parsed_ok}] {rec!r}")
-                        parsed_preview_shown += 1
-                
-                else:
-                    parsed_bad += 1
-                    if policy == "strict":
-                        typer.echo(f"Błąd parsowania (None) w linii {count}", err=True)
-                        raise typer.Exit(code=1)
-            except Exception as e:
-                parsed_bad += 1
-                if policy == "strict":
-                    typer.echo(f"Błąd parsowania w linii {count}: {e}",  err=True)
+                sink = SqliteSink(sqlite)
+            except sqlite3.Error as e:
+                raise typer.BadParameter(f"Nie można otworzyć bazy {sqlite}: {e}", param_hint="'--sqlite'")
+            options["sink"] = sink.add
+            load_started = time.perf_counter()
+        state = None
+        if state_file is not None:
+            state = _resume_state(state_file, input_paths, eff_limit, console, options)
+        if profile:
+            from .profiling import RunProfiler
+
+            profiler = RunProfiler(outdir_path)
+            profiler.start()
+        run_started = time.perf_counter()
+
+        if len(input_paths) == 1 and (workers == 1 or eff_limit is not None or streamed):
+            # Jeden plik (albo stdin / potok - nie da się go podzielić), szeregowo: zdarzenia wypisywane na bieżąco
+            chunk = process_file(input_paths[0], limit=eff_limit, emit=console.handle, **options)
+            console.advance(chunk)
+            if chunk.failed:
+                raise typer.Exit(code=1)
+        else:
+            for chunk in _iter_chunks(input_paths, workers, max_open_files, eff_limit, options):
+                for event in chunk.events:
+                    console.handle(event)
+                console.advance(chunk)
+                if chunk.failed:
                     raise typer.Exit(code=1)
-                else:
-                    if not quiet:
-                        typer.echo(f"(skip) Błąd parsowania w linii {count}: {e}", err=True)
 
-                
+        source = input_paths[0] if len(input_paths) == 1 else f"{len(input_paths)} plików"
+        if str(source) == STDIN_INPUT:
+            source = "stdin"
 
-        typer.echo(f"Wczytano {count} linii z: {input_path}")
-        typer.echo(f"Poprawnie sparsowane: {parsed_ok}")
-        typer.echo(f"Błędnie sparsowane: {parsed_bad}")
+        typer.echo(f"Wczytano {console.lines} linii z: {source}")
+        typer.echo(f"Poprawnie sparsowane: {console.ok}")
+        reasons = f" ({format_reasons(console.bad_reasons)})" if console.bad_reasons else ""
+        typer.echo(f"Błędnie sparsowane: {console.bad}{reasons}")
+        filters = ["--since/--until"] if time_range is not None else []
+        if line_filter is not None:
+            flags = (("--status", status), ("--method", method), ("--path-prefix", path_prefix))
+            filters += [flag for flag, value in flags if value]
+        if filters:
+            typer.echo(f"Odfiltrowane ({', '.join(filters)}): {console.filtered}")
+        if console.fallback_lines:
+            typer.echo(f"Linie zdekodowane awaryjnie (latin-1): {console.fallback_lines}")
+        _write_errors_log(console, outdir_path / ERRORS_LOG_NAME)
+
+        if sink is not None:
+            sink.close()
+            elapsed = max(time.perf_counter() - load_started, 1e-9)
+            typer.echo(f"Zapisano do SQLite: {sink.rows} wierszy -> {sqlite} ({sink.rows / elapsed:,.0f} wierszy/s)")
+
+        if state is not None:
+            state = _save_state(state, state_file, console)
+            typer.echo(f"Łącznie (--state-file): wczytano {state.lines} linii, poprawnie sparsowane: {state.ok}")
+
+        if console.aggregator is not None:
+            report_started = time.perf_counter_ns()
+            _print_report(console.aggregator, top)
+            try:
+                reports = write_report(console.aggregator, outdir_path, format.value, top, compress=gzip_report)
+            except OSError as e:
+                raise typer.BadParameter(f"Nie można zapisać raportu w {outdir_path}: {e}", param_hint="'--outdir'")
+            if console.timings is not None:
+                console.timings.add("report", time.perf_counter_ns() - report_started)
+            typer.echo(f"Raport ({format.value}): {', '.join(str(path) for path in reports)}")
+
+        if options["stage_timings"]:
+            _write_run_stats(console, input_paths, time.perf_counter() - run_started, stats_json, profiler)
 
         raise typer.Exit(code=0)
 
@@ -177,6 +682,42 @@ def main(
         typer.echo(f"Błąd systemowy podczas odczytu pliku: {e}", err=True)
         raise typer.Exit(code=5)
 
+    finally:
+        if sink is not None:
+            sink.close()  # także po błędzie: zapisane partie zostają w bazie
+        if profiler is not None:
+            profiler.stop()
+
+
+# ===== analyzer index build: indeks czasu dla --since/--until =====
+index_app = typer.Typer(no_args_is_help=True, help="Indeks czasu plików logów (sidecar .idx) dla --since/--until")
+app.add_typer(index_app, name="index")
+
+
+@index_app.command("build")
+def index_build(
+    input_path: Annotated[Path, typer.Option("--input", help="Plik logów (nieskompresowany)")],
+    every_bytes: Annotated[
+        str,
+        typer.Option("--every-bytes", help="Wpis indeksu co tyle bajtów, np. 1MB")] = f"{_INDEX_EVERY_BYTES // 1024**2}MB",
+    every_lines: Annotated[
+        int,
+        typer.Option("--every-lines", min=0, help="Wpis indeksu także co tyle linii (0 = tylko wg bajtów)")] = 0,
+):
+    """Buduje <plik>.idx: offsety bajtów bloków i zakres czasu (min/max) każdego bloku."""
+    from .timeindex import build_index, index_path
+
+    step = parse_memory_size(every_bytes, param_hint="'--every-bytes'")
+    if not input_path.is_file():
+        raise typer.BadParameter(f"Plik nie istnieje: {input_path}", param_hint="'--input'")
+    try:
+        index = build_index(input_path, every_bytes=step, every_lines=every_lines)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="'--input'")
+    target = index_path(input_path)
+    index.save(target)
+    typer.echo(f"Zbudowano indeks: {target} ({len(index)} bloków, {index.file_size} B)")
+
 
 if __name__ == "__main__":
     app()
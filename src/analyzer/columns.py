@@ -0,0 +1,136 @@
+"""
+Module: columns.py
+Cel: Kolumnowa reprezentacja partii linii (parser.parse_batch) - bez obiektu na rekord.
+Public API:
+  - class Dictionary
+      Słownik kodujący wartości tekstowe na kolejne kody int (0, 1, 2, ...); None -> NULL_CODE.
+  - def new_dictionaries() -> dict[str, Dictionary]
+      Komplet słowników dla DICT_COLUMNS; przekazany do kolejnych parse_batch daje stałe kody.
+  - class ColumnBatch
+      Kolumny jednej partii, wiersz i = linia i wejścia (także błędna - wtedy wartości zerowe):
+        ip         array('I')  IPv4 jako uint32 (big-endian, 1.2.3.4 -> 0x01020304),
+        ts         array('q')  epoch UTC w sekundach,
+        status     array('H')  kod HTTP,
+        size       array('q')  rozmiar odpowiedzi; '-' -> SIZE_MISSING (-1),
+        method, path, referrer, user_agent
+                   array('i')  kody ze słowników `dictionaries[nazwa]`; None -> NULL_CODE (-1),
+        bad        bytearray   bitmapa błędnych linii (bit i % 8 w bajcie i // 8).
+      good_mask() -> list[bool] (maska poprawnych wierszy z bitmapy, bez pętli po wierszach),
+      to_numpy() -> dict[str, numpy.ndarray] (widoki bez kopiowania; wymaga numpy).
+Pakiet numpy jest opcjonalny - potrzebny tylko do to_numpy().
+"""
+from __future__ import annotations
+
+from array import array
+from itertools import chain
+from socket import inet_ntoa
+from typing import Final, Iterator
+
+SIZE_MISSING: Final[int] = -1  # size '-' w kolumnie `size`
+NULL_CODE: Final[int] = -1  # None w kolumnach kodowanych słownikiem
+
+DICT_COLUMNS: Final[tuple[str, ...]] = ("method", "path", "referrer", "user_agent")
+
+# bajt bitmapy `bad` -> maska "poprawny" dla jego 8 wierszy (bit i = wiersz i)
+_GOOD_BITS: Final[tuple[tuple[bool, ...], ...]] = tuple(
+    tuple(not byte >> bit & 1 for bit in range(8)) for byte in range(256)
+)
+
+# array('I') ma 4 bajty na typowych platformach; 'L' tam, gdzie unsigned int jest krótszy
+UINT32_TYPECODE: Final[str] = "I" if array("I").itemsize == 4 else "L"
+
+
+class Dictionary:
+    """Kodowanie słownikowe: wartość -> kod (kolejność pierwszego wystąpienia) i z powrotem."""
+
+    __slots__ = ("codes", "values")
+
+    def __init__(self) -> None:
+        self.codes: dict[str, int] = {}
+        self.values: list[str] = []
+
+    def encode(self, value: str | None) -> int:
+        if value is None:
+            return NULL_CODE
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, code: int) -> str | None:
+        return None if code == NULL_CODE else self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def new_dictionaries() -> dict[str, Dictionary]:
+    """Puste słowniki dla wszystkich kolumn kodowanych (DICT_COLUMNS)."""
+    return {name: Dictionary() for name in DICT_COLUMNS}
+
+
+def ip_to_str(value: int) -> str:
+    """uint32 z kolumny `ip` -> zapis kropkowy."""
+    return inet_ntoa(value.to_bytes(4, "big"))
+
+
+class ColumnBatch:
+    """Kolumny jednej partii linii; wiersze wyrównane z liniami wejścia (patrz moduł)."""
+
+    __slots__ = ("rows", "ip", "ts", "status", "size", "method", "path", "referrer", "user_agent",
+                 "bad", "dictionaries")
+
+    def __init__(self, dictionaries: dict[str, Dictionary] | None = None) -> None:
+        self.rows = 0
+        self.ip = array(UINT32_TYPECODE)
+        self.ts = array("q")
+        self.status = array("H")
+        self.size = array("q")
+        self.method = array("i")
+        self.path = array("i")
+        self.referrer = array("i")
+        self.user_agent = array("i")
+        self.bad = bytearray()
+        self.dictionaries = new_dictionaries() if dictionaries is None else dictionaries
+
+    def is_bad(self, row: int) -> bool:
+        return bool(self.bad[row >> 3] & (1 << (row & 7)))
+
+    @property
+    def bad_count(self) -> int:
+        return int.from_bytes(self.bad, "little").bit_count()
+
+    def good_mask(self) -> list[bool]:
+        """Maska poprawnych wierszy (True = poprawny), np. do itertools.compress."""
+        mask = list(chain.from_iterable(map(_GOOD_BITS.__getitem__, self.bad)))
+        del mask[self.rows:]
+        return mask
+
+    def good_rows(self) -> Iterator[int]:
+        """Indeksy poprawnie sparsowanych wierszy."""
+        return (row for row in range(self.rows) if not self.is_bad(row))
+
+    def decode(self, column: str, row: int) -> str | None:
+        """Wartość tekstowa kolumny kodowanej słownikiem (np. decode("path", 0))."""
+        return self.dictionaries[column].decode(getattr(self, column)[row])
+
+    def to_numpy(self) -> dict:
+        """
+        Kolumny jako tablice numpy (np.frombuffer - bez kopiowania, tylko do odczytu
+        dopóki batch żyje) oraz "bad" jako maska bool o długości `rows`.
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("ColumnBatch.to_numpy wymaga pakietu numpy (pip install numpy)") from None
+
+        out = {
+            name: np.frombuffer(getattr(self, name), dtype=np.dtype(getattr(self, name).typecode))
+            for name in ("ip", "ts", "status", "size") + DICT_COLUMNS
+        }
+        out["bad"] = np.unpackbits(np.frombuffer(self.bad, dtype=np.uint8), bitorder="little")[: self.rows].astype(bool)
+        return out
+
+    def __len__(self) -> int:
+        return self.rows
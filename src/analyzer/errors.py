@@ -0,0 +1,72 @@
+"""
+Module: errors.py
+Cel: Zbiorcze raportowanie błędnych linii: liczniki wg przyczyny i ograniczona próbka w errors.log
+     zamiast ostrzeżenia loggera (i wypisu) na każdą błędną linię.
+Public API:
+  - ERRORS_LOG_NAME = "errors.log", ERROR_SAMPLES_DEFAULT (--error-samples)
+  - def error_reason(exc) -> str
+      Kategoria błędu parsowania: prefiks komunikatu przed ':' ("line: bad shape" -> "line",
+      "ts: bad month token" -> "ts", "status: out of range" -> "status"); OverflowError
+      (data spoza zakresu datetime) -> "ts"; komunikat bez prefiksu -> "other".
+  - def count_reason(reasons, reason, count=1) / merge_reasons(into, other)
+      Liczniki przyczyn (dict kategoria -> liczba), scalane między fragmentami wejścia.
+  - def format_reasons(reasons) -> str          ("line=1014, ts=193" - malejąco wg liczby)
+  - def write_errors_log(path, samples, reasons, bad) -> Path
+      Próbka [(nr linii, komunikat, treść)] zapisana jednym buforowanym zapisem atomowym
+      (reporter.atomic_writer); treść linii przycięta do ERROR_LINE_MAX_CHARS znaków.
+Pipeline (pipeline.process_lines) woła parser z fail_policy="strict" i sam liczy błędy, więc
+przy "skip" nie powstaje ani rekord loggera, ani zdarzenie na linię - tylko licznik i (do limitu)
+próbka. parser.parse_line wywołany bezpośrednio zachowuje swoje ostrzeżenie "parse_line skipped".
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Final, Iterable
+
+ERRORS_LOG_NAME: Final[str] = "errors.log"
+ERROR_SAMPLES_DEFAULT: Final[int] = 100
+ERROR_LINE_MAX_CHARS: Final[int] = 2000
+
+ErrorSample = tuple[int, str, str]  # (numer linii, komunikat błędu, treść linii)
+
+
+def error_reason(exc: BaseException) -> str:
+    """Kategoria błędu (patrz opis modułu)."""
+    if isinstance(exc, OverflowError):
+        return "ts"
+    category, sep, _ = str(exc).partition(":")
+    category = category.strip()
+    return category if sep and category and " " not in category else "other"
+
+
+def count_reason(reasons: dict[str, int], reason: str, count: int = 1) -> None:
+    reasons[reason] = reasons.get(reason, 0) + count
+
+
+def merge_reasons(into: dict[str, int], other: dict[str, int]) -> None:
+    for reason, count in other.items():
+        into[reason] = into.get(reason, 0) + count
+
+
+def sorted_reasons(reasons: dict[str, int]) -> dict[str, int]:
+    """Przyczyny malejąco wg liczby (przy remisie alfabetycznie)."""
+    return dict(sorted(reasons.items(), key=lambda item: (-item[1], item[0])))
+
+
+def format_reasons(reasons: dict[str, int]) -> str:
+    return ", ".join(f"{reason}={count}" for reason, count in sorted_reasons(reasons).items())
+
+
+def write_errors_log(path: Path, samples: Iterable[ErrorSample], reasons: dict[str, int], bad: int) -> Path:
+    """errors.log: nagłówek z licznikami i próbka linii (numer<TAB>komunikat<TAB>treść)."""
+    from .reporter import atomic_writer
+
+    samples = list(samples)
+    with atomic_writer(path) as out:
+        out.write(f"# błędne linie: {bad}; wg przyczyny: {format_reasons(reasons) or '-'}\n")
+        out.write(f"# próbka: pierwsze {len(samples)} (numer linii, błąd, treść)\n")
+        for number, message, text in samples:
+            if len(text) > ERROR_LINE_MAX_CHARS:
+                text = text[:ERROR_LINE_MAX_CHARS] + f"... (+{len(text) - ERROR_LINE_MAX_CHARS} znaków)"
+            out.write(f"{number}\t{message}\t{text}\n")
+    return path
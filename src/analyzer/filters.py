@@ -0,0 +1,143 @@
+"""
+Module: filters.py
+Cel: Filtry rekordów (--status, --method, --path-prefix) sprawdzane na surowej linii PRZED parsowaniem.
+Public API:
+  - class LineFilter(statuses=(), methods=(), path_prefixes=())
+      statuses      - kody ("404") i klasy ("5xx"), np. ("5xx", "404"),
+      methods       - metody HTTP (wielkość liter bez znaczenia), np. ("POST",),
+      path_prefixes - prefiksy ścieżki, np. ("/api/",); rekord pasuje, gdy spełnia KAŻDY podany filtr.
+      may_match(line) -> bool   - tani test surowej linii (str albo bytes z readera mmap):
+                                  False = na pewno nie pasuje (linia nie jest parsowana),
+                                  True  = kandydat - decyduje parse_line + matches(rec),
+      matches(rec) -> bool      - dokładny test sparsowanego rekordu (LogRecord / dict),
+      row_matcher(batch) -> (row -> bool) - to samo dla wierszy ColumnBatch (--cache-dir).
+  - def parse_status_filter(text) -> tuple[str, ...]   ("5xx,404" -> ("5xx", "404"); ValueError)
+Test surowej linii (jeden regex RAW_REQUEST_RE) korzysta ze stałego układu formatu Combined: żądanie
+zaczyna się od pierwszego '"' (metoda, spacja, ścieżka), a status to 3 cyfry tuż za '" ' zamykającym
+żądanie. Gdy układ jest nietypowy (escape '\\"' w żądaniu, tabulatory, wielokrotne spacje) test
+zwraca True i o wyniku decyduje pełne parsowanie, więc filtr nie odrzuca poprawnych pasujących
+linii (zakłada, że pola identd/user nie zawierają '"', jak w logach Apache/Nginx).
+Linie odrzucone przed parsowaniem liczone są jako odfiltrowane - także te, które byłyby błędne.
+"""
+from __future__ import annotations
+
+import re
+from typing import Callable, Final, Iterable, Mapping
+
+from .columns import ColumnBatch
+from .parser import ALLOWED_HTTP_METHODS
+
+STATUS_FILTER_RE: Final[re.Pattern[str]] = re.compile(r"[1-5](?:xx|\d\d)", re.IGNORECASE)
+
+# Surowa linia: pierwsze '"' otwiera żądanie "METODA ŚCIEŻKA[ PROTOKÓŁ]", za '" ' status i spacja.
+# Ścieżka kończy się na białym znaku (jak \S+ w parserze); '"' lub '\\' w żądaniu -> brak dopasowania.
+RAW_REQUEST_RE: Final[re.Pattern[str]] = re.compile(r'[^"]*"([A-Za-z]+) ([^\s"\\]+)[^"\\]*" ([0-9]{3}) ')
+RAW_REQUEST_BYTES_RE: Final[re.Pattern[bytes]] = re.compile(RAW_REQUEST_RE.pattern.encode("ascii"))
+
+
+def parse_status_filter(text: str) -> tuple[str, ...]:
+    """Lista kodów / klas po przecinku, np. "5xx,404"; ValueError przy złej pozycji."""
+    items = tuple(item.strip().lower() for item in text.split(",") if item.strip())
+    for item in items:
+        if not STATUS_FILTER_RE.fullmatch(item):
+            raise ValueError(f"Niepoprawny status: {item!r} (oczekiwano np. 404 albo 5xx)")
+    return items
+
+
+class LineFilter:
+    """Koniunkcja filtrów statusu, metody i prefiksu ścieżki (patrz opis modułu)."""
+
+    def __init__(
+        self,
+        statuses: Iterable[str] = (),
+        methods: Iterable[str] = (),
+        path_prefixes: Iterable[str] = (),
+    ):
+        statuses = tuple(statuses)
+        self.status_codes = frozenset(int(s) for s in statuses if s[1:].isdigit())
+        self.status_classes = frozenset(int(s[0]) for s in statuses if not s[1:].isdigit())
+        self.methods = frozenset(m.upper() for m in methods)
+        for method in self.methods:
+            if method not in ALLOWED_HTTP_METHODS:
+                raise ValueError(f"Nieznana metoda HTTP: {method!r} (dozwolone: {', '.join(sorted(ALLOWED_HTTP_METHODS))})")
+        self.path_prefixes = tuple(path_prefixes)
+        # dozwolone statusy jako napisy 3 cyfr (None = bez filtra statusu) - test bez int()
+        self._statuses = None
+        if self.status_codes or self.status_classes:
+            self._statuses = frozenset(str(code) for code in range(100, 1000) if self.status_ok(code))
+        self._statuses_bytes = None if self._statuses is None else frozenset(s.encode() for s in self._statuses)
+        # bytes (reader mmap): prefiks spoza ASCII zależy od kodowania / dekodowania awaryjnego
+        # pola, więc wtedy ścieżkę sprawdza dopiero matches(rec)
+        self._methods_bytes = frozenset(m.encode("ascii") for m in self.methods)
+        self._path_prefixes_bytes = (
+            tuple(p.encode("ascii") for p in self.path_prefixes)
+            if all(p.isascii() for p in self.path_prefixes) else ()
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.status_codes or self.status_classes or self.methods or self.path_prefixes)
+
+    def status_ok(self, status: int) -> bool:
+        if not (self.status_codes or self.status_classes):
+            return True
+        return status in self.status_codes or status // 100 in self.status_classes
+
+    def may_match(self, line: str | bytes) -> bool:
+        """False tylko wtedy, gdy surowa linia na pewno nie spełnia filtrów (bez parsowania)."""
+        if isinstance(line, str):
+            match = RAW_REQUEST_RE.match(line)
+            statuses, methods, prefixes = self._statuses, self.methods, self.path_prefixes
+        else:
+            match = RAW_REQUEST_BYTES_RE.match(line)
+            statuses, methods, prefixes = self._statuses_bytes, self._methods_bytes, self._path_prefixes_bytes
+        if match is None:
+            return True  # nietypowy układ: decyduje parser
+        method, path, status = match.groups()
+        if statuses is not None and status not in statuses:
+            return False
+        if methods and method.upper() not in methods:
+            return False
+        if prefixes and not path.startswith(prefixes):
+            return False
+        return True
+
+    def matches(self, rec: Mapping) -> bool:
+        """Dokładny test rekordu z parse_line (LogRecord albo dict)."""
+        if not self.status_ok(rec["status"]):
+            return False
+        if self.methods and rec["method"] not in self.methods:
+            return False
+        if self.path_prefixes and not rec["path"].startswith(self.path_prefixes):
+            return False
+        return True
+
+    def row_matcher(self, batch: ColumnBatch) -> Callable[[int], bool]:
+        """
+        Test wiersza `row` partii kolumn (--cache-dir) - jak matches(rec); metody i ścieżki
+        sprawdzane są raz na kod słownika, nie na wiersz.
+        """
+        status = batch.status
+        method_codes, path_codes = batch.method, batch.path
+        method_ok = _memo(lambda code: batch.dictionaries["method"].decode(code) in self.methods)
+        path_ok = _memo(lambda code: batch.dictionaries["path"].decode(code).startswith(self.path_prefixes))
+
+        def match(row: int) -> bool:
+            return (
+                self.status_ok(status[row])
+                and (not self.methods or method_ok(method_codes[row]))
+                and (not self.path_prefixes or path_ok(path_codes[row]))
+            )
+
+        return match
+
+
+def _memo(func: Callable[[int], bool]) -> Callable[[int], bool]:
+    cache: dict[int, bool] = {}
+
+    def lookup(code: int) -> bool:
+        ok = cache.get(code)
+        if ok is None:
+            ok = cache[code] = func(code)
+        return ok
+
+    return lookup
@@ -22,25 +22,374 @@
 # [x] test_encoding_fallback_utf8_to_latin1
 # [ ] (opcjonalnie) test_permission_error (jeśli chcesz zasymulować)
 
+from contextlib import closing
 from pathlib import Path
-from typing import Optional, Iterator
+import glob
+from typing import TYPE_CHECKING, BinaryIO, Optional, Iterator
+import bz2
+import gzip
+import io
 import logging
+import lzma
+import mmap
+import os
+import queue
+import stat
+import sys
+import threading
+import time
+
+if TYPE_CHECKING:
+    from .profiling import StageTimings
 
 logger = logging.getLogger(__name__)
 # logger.setLevel(logging.DEBUG) to ma ustawic cli
 
-def read_log_lines(path: Path, encoding: str = "utf-8", limit: Optional[int]= None) -> Iterator[str]:
+MMAP_BLOCK_BYTES = 4 * 1024 * 1024  # 4MiB - porcja mapy dzielona na linie jednym wywołaniem
+FALLBACK_ENCODING = "latin-1"  # dekoduje każdy bajt, więc nigdy nie zawodzi
+_ASCII_PROBE = "\t\n\r 0123456789 ABCXYZ abcxyz []/:+-\"'.?=&%"  # znaki logu, które muszą być ASCII
+
+# Kompresja rozpoznawana po magicznych bajtach (nie po rozszerzeniu)
+COMPRESSION_MAGIC: dict[str, bytes] = {
+    "gzip": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+DECOMPRESS_BLOCK_BYTES = 1024 * 1024  # 1MiB - porcja zdekompresowanych danych na blok
+READ_AHEAD_BLOCKS = 8  # ile bloków wątek dekompresji może wyprzedzić parser
+READ_AHEAD_JOIN_SECONDS = 1.0  # ile close() czeka na wątek zablokowany w read (np. stdin bez danych)
+FOLLOW_READ_BYTES = 1024 * 1024  # 1MiB - porcja odczytu w follow_log_lines
+FOLLOW_POLL_SECONDS = 0.25  # jak często follow_log_lines sprawdza plik bez nowych danych
+STDIN_INPUT = "-"  # --input - : standardowe wejście
+STREAM_READ_BYTES = 1024 * 1024  # 1MiB - porcja odczytu ze stdin / potoku (--read-size)
+PIPE_BUFFER_FALLBACK_BYTES = 1024 * 1024  # domyślny /proc/sys/fs/pipe-max-size (bez uprawnień root)
+
+
+class ReadStats:
+    """
+    Liczniki odczytu wypełniane przez readery (opcjonalny parametr `stats`).
+
+    Atrybuty:
+      - lines: liczba zwróconych linii,
+      - fallback_lines: ile z nich trzeba było zdekodować w FALLBACK_ENCODING.
+    """
+
+    __slots__ = ("lines", "fallback_lines")
+
+    def __init__(self) -> None:
+        self.lines = 0
+        self.fallback_lines = 0
+
+
+def _decode_line(raw: bytes, encoding: str, stats: Optional[ReadStats]) -> str:
+    """Dekoduje jedną linię; przy błędzie tylko ta linia idzie przez FALLBACK_ENCODING."""
+    try:
+        return raw.decode(encoding).rstrip()
+    except UnicodeDecodeError:
+        if stats is not None:
+            if stats.fallback_lines == 0:
+                logger.warning(f"Błąd kodowania ({encoding}) w linii {stats.lines + 1}, dekodowanie linii w {FALLBACK_ENCODING}")
+            stats.fallback_lines += 1
+        return raw.decode(FALLBACK_ENCODING).rstrip()
+
+
+def _split_bare_cr(line):
+    """
+    Linia (str albo bytes, już po rstrip) z samotnym '\r' w środku -> osobne linie, jak w trybie
+    tekstowym (universal newlines: stare pliki Mac, mieszane końce linii). '\r\n' zdejmuje rstrip.
+    """
+    return [part.rstrip() for part in line.split("\r" if isinstance(line, str) else b"\r")]
+
+
+def check_encoding(encoding: str) -> None:
+    """
+    Sprawdza, czy `encoding` nadaje się do readerów bajtowych: linie dzielone są na b"\n" / b"\r"
+    przed dekodowaniem, więc kodowanie musi zgadzać się z ASCII (utf-8, latin-1, cp1250, ...).
+    utf-16/utf-32 i podobne -> ValueError z czytelnym komunikatem; nieznane kodowanie -> ValueError.
+    """
+    try:
+        compatible = _ASCII_PROBE.encode("ascii").decode(encoding) == _ASCII_PROBE
+    except LookupError:
+        raise ValueError(f"Nieznane kodowanie: {encoding!r}") from None
+    except UnicodeDecodeError:
+        compatible = False
+    if not compatible:
+        raise ValueError(
+            f"Kodowanie {encoding!r} nie jest zgodne z ASCII (np. utf-16/utf-32) - nieobsługiwane; "
+            f"przekoduj plik, np. iconv -f {encoding} -t utf-8"
+        )
+
+def is_stream_input(path: Path) -> bool:
+    """
+    True dla wejścia strumieniowego: "-" (stdin) albo potok nazwany / urządzenie znakowe.
+    Strumienia nie da się przewinąć ani zmierzyć - czyta go tylko `read_log_lines` (od początku do końca).
+    """
+    if str(path) == STDIN_INPUT:
+        return True
+    try:
+        mode = path.stat().st_mode
+    except OSError:
+        return False
+    return stat.S_ISFIFO(mode) or stat.S_ISCHR(mode)
+
+
+def detect_compression(path: Path) -> Optional[str]:
+    """
+    Rozpoznaje kompresję pliku po magicznych bajtach nagłówka.
+
+    Zwraca:
+    --------
+    Optional[str]
+        "gzip", "bz2", "xz", "zstd" albo None dla zwykłego pliku tekstowego i dla wejścia
+        strumieniowego (is_stream_input) - odczyt nagłówka zabrałby dane ze strumienia; kompresję
+        strumienia rozpoznaje `read_log_lines` (peek), nie konsumując bajtów.
+    """
+    if is_stream_input(path):
+        return None
+    with open(path, "rb") as file:
+        head = file.read(6)
+    for name, magic in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def _open_decompressed(path: Path, compression: str, fileobj: Optional[BinaryIO] = None) -> BinaryIO:
+    """
+    Otwiera strumień zdekompresowanych bajtów dla rozpoznanej kompresji. `fileobj` - już otwarte
+    źródło (stdin / potok) zamiast `path`; nie jest zamykane razem ze strumieniem.
+    """
+    source = path if fileobj is None else fileobj
+    if compression == "gzip":
+        return gzip.open(source, "rb")
+    if compression == "bz2":
+        return bz2.open(source, "rb")
+    if compression == "xz":
+        return lzma.open(source, "rb")
+    if compression == "zstd":
+        try:  # zstd jest opcjonalny (extra "zstd"); import dopiero dla pliku .zst - nie przy starcie CLI
+            import zstandard
+        except ImportError:  # pragma: no cover - zależy od środowiska
+            raise OSError(f"Plik {path} jest skompresowany zstd - wymagany pakiet 'zstandard'") from None
+        return zstandard.ZstdDecompressor().stream_reader(
+            open(path, "rb") if fileobj is None else fileobj, read_across_frames=True, closefd=fileobj is None
+        )
+    raise ValueError(f"Nieznana kompresja: {compression}")
+
+
+_EOF = object()
+
+
+class _ReadAheadBlocks:
+    """
+    Wątek w tle czyta bloki ze strumienia (dekompresja) do ograniczonej kolejki.
+
+    zlib/bz2/lzma zwalniają GIL podczas dekompresji, więc kolejne bloki są rozpakowywane
+    równolegle z parsowaniem poprzednich. Kolejka ma `depth` miejsc - pamięć jest stała.
+    Każdy błąd wątku jest przekazywany do konsumenta (iteracja rzuca wyjątek zamiast zakończyć
+    się jak na końcu pliku); błędy danych dekompresora są zamieniane na OSError.
+    """
+
+    def __init__(self, stream: BinaryIO, block_size: int = DECOMPRESS_BLOCK_BYTES, depth: int = READ_AHEAD_BLOCKS):
+        self._queue: queue.Queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(stream, block_size), name="log-read-ahead", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, stream: BinaryIO, block_size: int) -> None:
+        try:
+            while not self._stop.is_set():
+                block = stream.read(block_size)
+                if not block:
+                    break
+                self._put(block)
+        except (OSError, MemoryError) as e:
+            self._put(e)
+        except Exception as e:
+            # np. ucięty .gz (EOFError), uszkodzony .gz (zlib.error), .xz (lzma.LZMAError), .zst
+            # (zstandard.ZstdError) - dla CLI to błąd odczytu pliku, nie koniec danych
+            error = OSError(f"Uszkodzony plik skompresowany: {e}")
+            error.__cause__ = e
+            self._put(error)
+        except BaseException as e:  # każdy inny wyjątek też trafia do konsumenta - nigdy cichy koniec
+            self._put(e)
+        finally:
+            self._put(_EOF)
+
+    def _put(self, item: object) -> None:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            item = self._queue.get()
+            if item is _EOF:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def close(self) -> None:
+        """
+        Zatrzymuje wątek. Wątek czekający na miejsce w kolejce kończy się od razu; zablokowany
+        w stream.read (potok bez danych, np. --limit na skompresowanym stdin) nie da się przerwać -
+        po READ_AHEAD_JOIN_SECONDS zostaje porzucony (daemon, nie blokuje wyjścia z programu).
+        """
+        self._stop.set()
+        self._thread.join(timeout=READ_AHEAD_JOIN_SECONDS)
+
+
+def _iter_block_lines(blocks) -> Iterator[bytes]:
+    """Dzieli strumień bloków bajtów na linie (bez b"\\n"); ostatnia linia może nie mieć '\\n'."""
+    tail = b""
+    for block in blocks:
+        parts = block.split(b"\n")
+        if tail:
+            parts[0] = tail + parts[0]
+        tail = parts.pop()
+        yield from parts
+    if tail:
+        yield tail
+
+
+def _iter_raw_lines(path: Path, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Surowe linie pliku; pliki skompresowane są dekompresowane strumieniowo z wyprzedzeniem.
+    [start, end) - zakres bajtów (tylko pliki nieskompresowane); linia zaczynająca się przed
+    `end` jest zwracana w całości.
+    """
+    compression = detect_compression(path)
+    if compression is None:
+        with open(path, "rb") as file:
+            if start:
+                file.seek(start)
+            if end is None:
+                yield from file
+                return
+            pos = start
+            for raw in file:
+                if pos >= end:
+                    break
+                pos += len(raw)
+                yield raw
+        return
+
+    if start or end is not None:
+        raise ValueError(f"Pliku skompresowanego ({compression}) nie można czytać od offsetu: {path}")
+
+    with _open_decompressed(path, compression) as stream:
+        blocks = _ReadAheadBlocks(stream)
+        try:
+            yield from _iter_block_lines(blocks)
+        finally:
+            blocks.close()
+
+
+def _grow_pipe_buffer(source: BinaryIO, size: int) -> None:
+    """
+    Powiększa bufor potoku (Linux, F_SETPIPE_SZ) do `size` - domyślne 64KiB ograniczałoby
+    każdy odczyt do 64KiB niezależnie od --read-size. Bez uprawnień limitem jest pipe-max-size
+    (zwykle 1MiB); gdy się nie da (inny system, nie potok) - bez zmian.
+    """
+    try:
+        import fcntl
+
+        fd = source.fileno()
+        if not stat.S_ISFIFO(os.fstat(fd).st_mode):
+            return
+        for candidate in (size, min(size, PIPE_BUFFER_FALLBACK_BYTES)):
+            try:
+                fcntl.fcntl(fd, fcntl.F_SETPIPE_SZ, candidate)
+                return
+            except OSError:
+                continue
+    except (ImportError, AttributeError, OSError, ValueError):  # io.UnsupportedOperation to OSError
+        return
+
+
+def _iter_stream_blocks(source: BinaryIO, read_size: int) -> Iterator[bytes]:
+    """Bloki do `read_size` bajtów: read1 = jedno wywołanie read na blok (tyle, ile strumień ma gotowe)."""
+    read = source.read1
+    while True:
+        block = read(read_size)
+        if not block:
+            return
+        yield block
+
+
+def _iter_stream_raw_lines(path: Path, read_size: int = STREAM_READ_BYTES) -> Iterator[bytes]:
+    """
+    Surowe linie wejścia strumieniowego ("-" = stdin albo potok nazwany): bloki z `_iter_stream_blocks`
+    dzielone na linie w pamięci (`_iter_block_lines`), bez wywołania systemowego na linię.
+    Kompresja rozpoznawana po magicznych bajtach z peek() (bez zabierania ich ze strumienia),
+    np. `cat access.log.gz | ... --input -`, jest dekompresowana jak w plikach - wątkiem w tle.
+    stdin nie jest zamykany.
+    """
+    if str(path) == STDIN_INPUT:
+        stdin = getattr(sys.stdin, "buffer", None)
+        if stdin is None:
+            raise OSError("Brak standardowego wejścia (stdin) dla --input -")
+        # stdin zastąpiony obiektem bez peek (np. BytesIO w testach) - bufor nakładany na czas odczytu
+        source = stdin if hasattr(stdin, "peek") else io.BufferedReader(stdin, read_size)
+        release = None if source is stdin else source.detach
+    else:
+        source = open(path, "rb", buffering=read_size)
+        release = source.close
+    try:
+        _grow_pipe_buffer(source, read_size)
+        head = source.peek(6)[:6]
+        compression = next((name for name, magic in COMPRESSION_MAGIC.items() if head.startswith(magic)), None)
+        if compression is None:
+            yield from _iter_block_lines(_iter_stream_blocks(source, read_size))
+            return
+        with _open_decompressed(path, compression, fileobj=source) as stream:
+            blocks = _ReadAheadBlocks(stream, block_size=read_size)
+            try:
+                yield from _iter_block_lines(blocks)
+            finally:
+                blocks.close()
+    finally:
+        if release is not None:
+            release()
+
+
+def read_log_lines(
+    path: Path,
+    encoding: str = "utf-8",
+    limit: Optional[int] = None,
+    stats: Optional[ReadStats] = None,
+    start: int = 0,
+    end: Optional[int] = None,
+    timings: Optional["StageTimings"] = None,
+    read_size: int = STREAM_READ_BYTES,
+) -> Iterator[str]:
     """
     Generator do strumieniowego odczytu linii z pliku logu.
 
     Parametry:
     ----------
     path : Path
-        Ścieżka do pliku logu do odczytu.
+        Ścieżka do pliku logu do odczytu; "-" = stdin, potok nazwany też jest akceptowany.
     encoding : str, opcjonalnie (domyślnie "utf-8")
         Kodowanie znaków używane przy otwieraniu pliku.
     limit : Optional[int], opcjonalnie
         Maksymalna liczba linii do odczytania. Jeśli None lub 0, odczytywane są wszystkie linie.
+    stats : Optional[ReadStats], opcjonalnie
+        Obiekt liczników uzupełniany w trakcie odczytu (m.in. liczba linii po fallbacku).
+    start, end : int, opcjonalnie
+        Zakres bajtów [start, end) - np. z indeksu czasu (timeindex.byte_range_for); `start`
+        musi wypadać na początku linii. Tylko dla plików nieskompresowanych (inaczej ValueError).
+    timings : profiling.StageTimings, opcjonalnie
+        Czasy etapów "read" (surowa linia) i "decode" (--stats-json / --profile); None = bez pomiaru.
+    read_size : int, opcjonalnie (domyślnie STREAM_READ_BYTES)
+        Porcja odczytu wejścia strumieniowego (--read-size); pliki zwykłe jej nie używają.
 
     Zwraca:
     --------
@@ -51,45 +400,366 @@ def read_log_lines(path: Path, encoding: str = "utf-8", limit: Optional[int]= No
     --------
     FileNotFoundError
         Jeśli plik nie istnieje lub nie można go otworzyć.
-    UnicodeDecodeError
-        Jeśli podane kodowanie jest niepoprawne. Wtedy funkcja próbuje fallback na "latin-1".
-        W przypadku błędu kodowania plik jest ponownie otwierany od początku w latin-1.
+    ValueError
+        Kodowanie nieznane albo niezgodne z ASCII (`check_encoding`), limit < 0, zakres dla
+        pliku skompresowanego / wejścia strumieniowego.
 
     Zachowanie:
     -----------
-    - Odczytuje plik linię po linii, bez wczytywania całego pliku do pamięci.
-    - W przypadku błędu kodowania próbuje ponownie z kodowaniem "latin-1".
+    - Odczytuje plik binarnie linię po linii (podział na '\\n', '\\r\\n' i samotne '\\r' - jak tryb
+      tekstowy), bez wczytywania całego pliku do pamięci.
+    - `encoding` musi być zgodne z ASCII (`check_encoding`); utf-16/utf-32 -> ValueError.
+    - Każda linia dekodowana jest osobno w `encoding`; linia, której nie da się zdekodować,
+      jest dekodowana w "latin-1" - w miejscu, bez ponownego czytania pliku i bez powtórnego
+      zwracania wcześniejszych linii. Liczbę takich linii raportuje `stats.fallback_lines`.
+    - Pliki gzip/bz2/xz/zstd (rozpoznane po magicznych bajtach, zstd wymaga pakietu
+      'zstandard') są dekompresowane strumieniowo blokami DECOMPRESS_BLOCK_BYTES w wątku
+      w tle, który wyprzedza parsowanie o maks. READ_AHEAD_BLOCKS bloków.
+    - Wejście strumieniowe (is_stream_input: stdin, potok) czytane jest blokami do `read_size`
+      bajtów i dzielone na linie w pamięci; ta sama kompresja i fallback kodowania co dla plików,
+      bez zakresu `start`/`end` (ValueError).
     - Jeśli ustawiono limit, odczyt kończy po osiągnięciu tej liczby linii.
     - Loguje błędy (wymaga wcześniejszej konfiguracji loggera).
     """
 
-    if not path.is_file():
+    streamed = is_stream_input(path)
+    if not streamed and not path.is_file():
         logger.error(f"File not found: {path}")
         raise FileNotFoundError(str(path))
     
     if limit is not None and limit < 0:
         raise ValueError(f"Parametr 'limit' musi być nieujemny, otrzymano: {limit}")
 
+    if streamed and (start or end is not None):
+        raise ValueError(f"Wejścia strumieniowego nie można czytać od offsetu: {path}")
+
+    check_encoding(encoding)
+    if stats is None:
+        stats = ReadStats()
+
     try:
-        with open(path, "r", encoding=encoding) as file:
-            for count, line in enumerate(file, start=1):
-                yield line.rstrip()
-                if limit is not None and limit > 0 and count >= limit:
-                    break
-    
-    except UnicodeDecodeError:
-        logger.error("Błąd kodowania, ponowne otwarcie pliku z latin-1")
-        count = 0
-        with open(path, "r", encoding="latin-1") as file:
-            for count, line in enumerate(file, start=1):
-                yield line.rstrip()
-                if limit is not None and limit > 0 and count >= limit:
-                    break
-    
+        raw_source = _iter_stream_raw_lines(path, read_size) if streamed else _iter_raw_lines(path, start, end)
+        with closing(raw_source) as raw_lines:
+            decode = _decode_line
+            if timings is not None:
+                raw_lines = timings.wrap_iter("read", raw_lines)
+                decode = timings.wrap("decode", _decode_line)
+            count = 0
+            for raw in raw_lines:
+                line = decode(raw, encoding, stats)
+                for line in (_split_bare_cr(line) if "\r" in line else (line,)):
+                    stats.lines += 1
+                    yield line
+                    count += 1
+                    if limit is not None and limit > 0 and count >= limit:
+                        return
+
     except PermissionError as e:
         logger.error(f"Brak uprawnień do pliku: {path} ({e})")
         raise PermissionError(f"Brak uprawnień do pliku: {path}") from e
     
     except OSError as e:
         logger.error(f"Błąd systemowy podczas otwierania pliku: {path} ({e})")
-        raise OSError(f"Błąd systemowy podczas otwierania pliku: {path}") from e
\ No newline at end of file
+        raise OSError(f"Błąd systemowy podczas otwierania pliku: {path}") from e
+
+
+def follow_log_lines(
+    path: Path,
+    encoding: str = "utf-8",
+    stats: Optional[ReadStats] = None,
+    from_start: bool = False,
+    poll_interval: float = FOLLOW_POLL_SECONDS,
+    stop: Optional[threading.Event] = None,
+) -> Iterator[Optional[str]]:
+    """
+    Śledzenie pliku jak `tail -F`: kolejne dopisywane linie, bez końca (do `stop` / zamknięcia generatora).
+
+    Parametry:
+    ----------
+    path : Path
+        Śledzony plik (po nazwie - po rotacji otwierany jest nowy plik o tej nazwie).
+    encoding, stats : jak w `read_log_lines` (ten sam fallback na "latin-1" per linia).
+    from_start : bool
+        False (domyślnie) - zaczyna od końca pliku, True - od początku.
+    poll_interval : float
+        Co ile sekund sprawdzać plik, gdy nie ma nowych danych.
+    stop : threading.Event, opcjonalnie
+        Ustawienie kończy iterację (przy najbliższym sprawdzeniu pliku).
+
+    Zwraca:
+    --------
+    Generator[str | None]
+        Linie jak w `read_log_lines`; None przy każdym "pustym" sprawdzeniu pliku, żeby
+        konsument mógł robić coś okresowo (np. wypisywać statystyki) także bez nowych linii.
+
+    Zachowanie:
+    -----------
+    - Dane czytane są blokami FOLLOW_READ_BYTES; linia bez '\n' czeka na dokończenie.
+    - Rotacja (pod nazwą jest plik o innym inode): stary plik jest doczytany do końca,
+      potem otwierany jest nowy i czytany od początku. Brak pliku - czekanie, aż się pojawi.
+    - Obcięcie (copytruncate: plik krótszy niż pozycja odczytu) - czytanie od początku.
+    """
+    check_encoding(encoding)
+    if stats is None:
+        stats = ReadStats()
+    wait = stop.wait if stop is not None else time.sleep
+
+    file: Optional[BinaryIO] = None
+    identity: tuple[int, int] = (0, 0)
+    tail = b""
+    try:
+        while stop is None or not stop.is_set():
+            if file is None:
+                try:
+                    file = open(path, "rb")
+                except FileNotFoundError:
+                    yield None
+                    wait(poll_interval)
+                    continue
+                st = os.fstat(file.fileno())
+                identity = (st.st_ino, st.st_dev)
+                if not from_start:
+                    file.seek(0, os.SEEK_END)
+                from_start = True  # kolejne pliki (po rotacji) czytane są od początku
+                tail = b""
+
+            block = file.read(FOLLOW_READ_BYTES)
+            if block:
+                parts = block.split(b"\n")
+                if tail:
+                    parts[0] = tail + parts[0]
+                tail = parts.pop()
+                for raw in parts:
+                    line = _decode_line(raw, encoding, stats)
+                    for line in (_split_bare_cr(line) if "\r" in line else (line,)):
+                        stats.lines += 1
+                        yield line
+                continue
+
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                st = None
+            if st is not None and (st.st_ino, st.st_dev) != identity:
+                if tail:  # ostatnia linia starego pliku bez '\n'
+                    line = _decode_line(tail, encoding, stats)
+                    for line in (_split_bare_cr(line) if "\r" in line else (line,)):
+                        stats.lines += 1
+                        yield line
+                file.close()
+                file = None
+                continue
+            if st is not None and st.st_size < file.tell():
+                file.seek(0)
+                tail = b""
+                continue
+            yield None
+            wait(poll_interval)
+    finally:
+        if file is not None:
+            file.close()
+
+
+def expand_inputs(patterns: list[str]) -> list[Path]:
+    """
+    Rozwija wzorce wejścia (--input) do listy plików.
+
+    Parametry:
+    ----------
+    patterns : list[str]
+        Każdy element to ścieżka pliku, katalog (wszystkie zwykłe pliki w nim, bez rekurencji),
+        wzorzec glob (np. "logs/*.log*"), potok nazwany albo "-" (stdin).
+
+    Zwraca:
+    --------
+    list[Path]
+        Bezwzględne ścieżki plików, w kolejności wzorców (w obrębie wzorca - posortowane),
+        bez duplikatów; "-" zostaje jako Path("-").
+
+    Wyjątki:
+    --------
+    FileNotFoundError
+        Jeśli któryś wzorzec nie pasuje do żadnego pliku.
+    """
+    paths: list[Path] = []
+    seen: set[Path] = set()
+    for pattern in patterns:
+        candidate = Path(pattern)
+        if pattern == STDIN_INPUT:
+            matches = [candidate]
+        elif candidate.is_dir():
+            matches = sorted(p for p in candidate.iterdir() if p.is_file())
+        elif glob.has_magic(pattern):
+            matches = sorted(Path(p) for p in glob.glob(pattern) if Path(p).is_file())
+        elif candidate.is_file() or is_stream_input(candidate):
+            matches = [candidate]
+        else:
+            matches = []
+
+        if not matches:
+            logger.error(f"File not found: {pattern}")
+            raise FileNotFoundError(pattern)
+
+        for match in matches:
+            resolved = match if pattern == STDIN_INPUT else match.resolve()
+            if resolved not in seen:
+                seen.add(resolved)
+                paths.append(resolved)
+    return paths
+
+
+def split_byte_ranges(path: Path, parts: int, start: int = 0, end: Optional[int] = None) -> list[tuple[int, int]]:
+    """
+    Dzieli plik (albo jego fragment [start, end), `start` na początku linii) na `parts`
+    zakresów bajtów [start, end) wyrównanych do granic linii.
+
+    Parametry:
+    ----------
+    path : Path
+        Ścieżka do pliku logu.
+    parts : int
+        Docelowa liczba zakresów (>= 1). Dla małych plików może powstać mniej zakresów.
+
+    Zwraca:
+    --------
+    list[tuple[int, int]]
+        Kolejne, rozłączne zakresy pokrywające cały plik. Każda granica (poza 0 i końcem
+        pliku) wypada tuż za znakiem '\\n', więc żadna linia nie jest dzielona.
+
+    Wyjątki:
+    --------
+    FileNotFoundError
+        Jeśli plik nie istnieje.
+    ValueError
+        Jeśli `parts` < 1.
+    """
+    if not path.is_file():
+        logger.error(f"File not found: {path}")
+        raise FileNotFoundError(str(path))
+
+    if parts < 1:
+        raise ValueError(f"Parametr 'parts' musi być >= 1, otrzymano: {parts}")
+
+    size = path.stat().st_size if end is None else min(end, path.stat().st_size)
+    if size <= start:
+        return []
+
+    bounds = [start]
+    with open(path, "rb") as file:
+        for i in range(1, parts):
+            target = start + (size - start) * i // parts
+            if target <= bounds[-1]:
+                continue
+            # Cofnij się o bajt, aby linia kończąca się dokładnie przed `target` nie została pominięta
+            file.seek(target - 1)
+            file.readline()
+            pos = file.tell()
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+    bounds.append(size)
+
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def read_line_range(
+    path: Path, start: int, end: int, encoding: str = "utf-8", stats: Optional[ReadStats] = None,
+    timings: Optional["StageTimings"] = None,
+) -> Iterator[str]:
+    """
+    Generator linii z zakresu bajtów [start, end) pliku (np. z `split_byte_ranges`).
+
+    Linie są czytane i dekodowane tak jak w `read_log_lines` (fallback na "latin-1" per linia,
+    liczniki w opcjonalnym `stats`, czasy etapów w opcjonalnym `timings`).
+
+    Zakłada, że `start` wypada na początku linii; linia zaczynająca się przed `end`
+    jest zwracana w całości.
+    """
+    with open(path, "rb") as file:
+        file.seek(start)
+        pos = start
+        readline, decode = file.readline, _decode_line
+        if timings is not None:
+            readline, decode = timings.wrap("read", readline), timings.wrap("decode", decode)
+        while pos < end:
+            raw = readline()
+            if not raw:
+                break
+            pos += len(raw)
+            line = decode(raw, encoding, stats)
+            for line in (_split_bare_cr(line) if "\r" in line else (line,)):
+                if stats is not None:
+                    stats.lines += 1
+                yield line
+
+
+def read_log_lines_mmap(
+    path: Path, limit: Optional[int] = None, start: int = 0, end: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    Generator linii pliku jako surowe bajty, odczytywanych przez mmap (bez dekodowania).
+
+    Parametry:
+    ----------
+    path : Path
+        Ścieżka do pliku logu.
+    limit : Optional[int], opcjonalnie
+        Jak w `read_log_lines`: None lub 0 = wszystkie linie, N = pierwsze N linii, < 0 = ValueError.
+    start, end : int, opcjonalnie
+        Zakres bajtów [start, end) (np. z `split_byte_ranges`); domyślnie cały plik.
+        Linia zaczynająca się przed `end` jest zwracana w całości.
+
+    Zwraca:
+    --------
+    Generator[bytes]
+        Kolejne linie (podział na b"\\n", '\\r\\n' i samotne b"\\r") bez białych znaków po prawej stronie.
+        Dekodowanie (z fallbackiem na "latin-1") wykonuje dopiero parser
+        (`parser.parse_line_bytes`), i to tylko dla pól, które trafiają do wyniku.
+
+    Zachowanie:
+    -----------
+    - Tylko dla plików nieskompresowanych (patrz `detect_compression`).
+    - Plik mapowany jest w całości tylko do odczytu; system operacyjny doczytuje strony
+      na żądanie, więc pamięć procesu nie rośnie z rozmiarem pliku.
+    - Na linię przypada jeden obiekt `bytes` (wycinek mapy) - bez str, bez kopii z rstrip.
+    """
+    if not path.is_file():
+        logger.error(f"File not found: {path}")
+        raise FileNotFoundError(str(path))
+
+    if limit is not None and limit < 0:
+        raise ValueError(f"Parametr 'limit' musi być nieujemny, otrzymano: {limit}")
+
+    try:
+        size = path.stat().st_size
+        if size == 0:
+            return  # pustego pliku nie da się zmapować
+
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            stop = size if end is None else min(end, size)
+            pos = start
+            count = 0
+            while pos < stop:
+                # Blok ~MMAP_BLOCK_BYTES domknięty do końca linii; podział na linie robi bytes.split (C)
+                target = min(pos + MMAP_BLOCK_BYTES, stop)
+                nl = mm.find(b"\n", target - 1)
+                block_end = size if nl == -1 else nl + 1
+                block = mm[pos:block_end].split(b"\n")
+                if block_end != size or block[-1] == b"":
+                    block.pop()  # pusty element za ostatnim '\n'
+                pos = block_end
+
+                for raw in block:
+                    raw = raw.rstrip()
+                    for line in (_split_bare_cr(raw) if b"\r" in raw else (raw,)):
+                        yield line
+                        count += 1
+                        if limit is not None and limit > 0 and count >= limit:
+                            return
+
+    except PermissionError as e:
+        logger.error(f"Brak uprawnień do pliku: {path} ({e})")
+        raise PermissionError(f"Brak uprawnień do pliku: {path}") from e
+
+    except OSError as e:
+        logger.error(f"Błąd systemowy podczas otwierania pliku: {path} ({e})")
+        raise OSError(f"Błąd systemowy podczas otwierania pliku: {path}") from e
@@ -0,0 +1,85 @@
+"""
+Module: live.py
+Cel: Tryb --follow: śledzenie logu (tail -F) i okresowe statystyki z przesuwnego okna czasu.
+Public API:
+  - def follow_stats(path, window=60, interval=5.0, top=5, encoding="utf-8", from_start=False,
+                     emit=print, stop=None, duration=None, clock=time.monotonic) -> RollingWindow
+      Czyta linie z io_reader.follow_log_lines, parsuje je (parse_line, as_record) i wrzuca do
+      window.RollingWindow; co `interval` sekund przekazuje do `emit` linię ze statystykami okna.
+  - def format_window(stats, end_epoch) -> str
+Koniec okna to czas NAJNOWSZEGO rekordu przesuwany zegarem, gdy linie nie przychodzą - dzięki
+temu okno działa także przy odtwarzaniu starego logu (from_start) i po przestoju zapisu.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+from .io_reader import FOLLOW_POLL_SECONDS, ReadStats, follow_log_lines
+from .parser import parse_line
+from .window import RollingWindow
+
+
+def format_window(stats: dict, end_epoch: int) -> str:
+    """Jedna linia statystyk okna, np. do wypisania co --interval sekund."""
+    end = datetime.fromtimestamp(end_epoch, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    ips = ", ".join(f"{ip} ({count})" for ip, count in stats["top_ips"]) or "-"
+    return (
+        f"[{end} UTC] ostatnie {stats['window']}s: {stats['requests']} żądań, {stats['rate']:.2f} req/s, "
+        f"5xx {stats['error_ratio']:.1%}, top IP: {ips}"
+    )
+
+
+def follow_stats(
+    path: Path,
+    window: int = 60,
+    interval: float = 5.0,
+    top: int = 5,
+    encoding: str = "utf-8",
+    from_start: bool = False,
+    emit: Callable[[str], None] = print,
+    stop: Optional[threading.Event] = None,
+    duration: Optional[float] = None,
+    clock: Callable[[], float] = time.monotonic,
+    poll_interval: float = FOLLOW_POLL_SECONDS,
+) -> RollingWindow:
+    """
+    Śledzi `path` i co `interval` sekund (zegar `clock`) emituje statystyki ostatnich `window` sekund.
+    Kończy się po `duration` sekundach (None = bez końca), po ustawieniu `stop` albo przez
+    KeyboardInterrupt u wywołującego. Błędne linie są pomijane (okno liczy tylko poprawne rekordy).
+    Zwraca okno (np. do testów).
+    """
+    rolling = RollingWindow(window)
+    lines = follow_log_lines(
+        path, encoding=encoding, stats=ReadStats(), from_start=from_start, stop=stop,
+        poll_interval=min(poll_interval, interval),
+    )
+    started = clock()
+    next_emit = started + interval
+    latest: Optional[int] = None  # najnowszy czas rekordu (epoch) ...
+    latest_at = started           # ... i chwila (clock), w której go zobaczono
+    add = rolling.add
+    try:
+        for line in lines:
+            now = clock()
+            if line is not None:
+                try:
+                    rec = parse_line(line, fail_policy="strict", as_record=True)
+                except (ValueError, OverflowError):
+                    rec = None
+                if rec is not None:
+                    add(rec.epoch, rec.status, rec.remote_host)
+                    if latest is None or rec.epoch > latest:
+                        latest, latest_at = rec.epoch, now
+            if now >= next_emit:
+                end = int(time.time()) if latest is None else latest + int(now - latest_at)
+                emit(format_window(rolling.snapshot(end, top), end))
+                next_emit = now + interval
+            if duration is not None and now - started >= duration:
+                break
+    finally:
+        lines.close()
+    return rolling
@@ -0,0 +1,132 @@
+"""
+Module: parallel.py
+Cel: Równoległe parsowanie jednego pliku w puli procesów (--workers N).
+Public API:
+  - def parse_parallel(path, workers, encoding="utf-8", fail_policy="skip",
+                       preview_cap=0, quiet=False, reader="text", pool=None,
+                       aggregator_factory=None, time_range=None,
+                       byte_range=None, line_filter=None, stage_timings=False,
+                       error_samples=ERROR_SAMPLES_DEFAULT) -> Iterator[ChunkResult]
+Zasada działania:
+  - plik dzielony jest na zakresy bajtów wyrównane do '\\n' (io_reader.split_byte_ranges),
+  - każdy zakres parsowany jest w osobnym procesie przez pipeline.process_lines,
+  - wyniki zwracane są W KOLEJNOŚCI zakresów, więc CLI może je scalić tak,
+    aby podsumowanie było identyczne z trybem szeregowym.
+Zakresów jest więcej niż procesów (min. CHUNKS_PER_WORKER na proces, maks. ~CHUNK_TARGET_BYTES
+na zakres), żeby wolniejszy fragment nie blokował reszty puli.
+"""
+from __future__ import annotations
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Final, Iterator, Optional
+
+from .aggregator import Aggregator
+from .errors import ERROR_SAMPLES_DEFAULT
+from .io_reader import ReadStats, read_line_range, read_log_lines_mmap, split_byte_ranges
+from .filters import LineFilter
+from .pipeline import (
+    ByteRange, ChunkResult, TimeRange, needs_time, process_lines, resolve_byte_range, select_parse,
+)
+from .profiling import StageTimings
+
+CHUNKS_PER_WORKER: Final[int] = 4
+CHUNK_TARGET_BYTES: Final[int] = 64 * 1024 * 1024  # 64MiB
+
+
+def _parse_range(job: tuple) -> ChunkResult:
+    """Zadanie procesu roboczego: sparsuj (i zagreguj) jeden zakres bajtów."""
+    (path, start, end, encoding, fail_policy, preview_cap, quiet, reader, aggregator_factory, time_range,
+     line_filter, stage_timings, error_samples) = job
+    stats = ReadStats()
+    timings = StageTimings() if stage_timings else None
+    if reader == "mmap":
+        lines = read_log_lines_mmap(path, start=start, end=end)
+        if timings is not None:
+            lines = timings.wrap_iter("read", lines)
+    else:
+        lines = read_line_range(path, start, end, encoding=encoding, stats=stats, timings=timings)
+    aggregator = None if aggregator_factory is None else aggregator_factory()
+    result = process_lines(
+        lines,
+        fail_policy=fail_policy,
+        preview_cap=preview_cap,
+        quiet=quiet,
+        parse=select_parse(
+            reader, encoding, as_record=aggregator is not None,
+            with_time=needs_time(aggregator, time_range, None, preview_cap), timings=timings,
+        ),
+        aggregator=aggregator,
+        time_range=time_range,
+        line_filter=line_filter,
+        timings=timings,
+        error_samples=error_samples,
+    )
+    result.fallback_lines = stats.fallback_lines
+    return result
+
+
+def parse_parallel(
+    path: Path,
+    workers: int,
+    encoding: str = "utf-8",
+    fail_policy: str = "skip",
+    preview_cap: int = 0,
+    quiet: bool = False,
+    reader: str = "text",
+    pool: Optional[Executor] = None,
+    aggregator_factory: Optional[Callable[[], Aggregator]] = None,
+    time_range: Optional[TimeRange] = None,
+    byte_range: Optional[ByteRange] = None,
+    line_filter: Optional[LineFilter] = None,
+    stage_timings: bool = False,
+    error_samples: int = ERROR_SAMPLES_DEFAULT,
+) -> Iterator[ChunkResult]:
+    """
+    Parsuje plik w `workers` procesach i zwraca wyniki zakresów w kolejności pliku.
+
+    `reader` wybiera sposób czytania zakresu: "text" (read_line_range) albo "mmap"
+    (read_log_lines_mmap + parse_line_bytes).
+
+    `aggregator_factory` (picklowalna, np. functools.partial(Aggregator, "hour")) tworzy
+    agregator dla każdego zakresu; wywołujący scala je przez `Aggregator.merge`.
+
+    `time_range` (since, until) zawęża plik do zakresu bajtów z `timeindex.byte_range_for`
+    i filtruje rekordy (jak w `process_lines`); `byte_range` (start, end) podaje zakres wprost.
+    `line_filter` (filters.LineFilter) działa jak w `process_lines`, `stage_timings` jak w `process_file`
+    (czasy etapów mierzone w procesach roboczych, w `ChunkResult.timings` każdego zakresu).
+    `error_samples` ogranicza próbkę błędnych linii każdego zakresu (jak w `process_lines`).
+
+    `pool` pozwala użyć wspólnej puli dla wielu plików (wywołujący ją zamyka);
+    domyślnie tworzona jest pula `workers` procesów na czas jednego pliku.
+
+    Przerwanie iteracji (np. po zdarzeniu "fatal" w trybie strict) anuluje zadania,
+    które jeszcze nie wystartowały.
+    """
+    if workers < 1:
+        raise ValueError(f"Parametr 'workers' musi być >= 1, otrzymano: {workers}")
+
+    first, last = resolve_byte_range(path, time_range, byte_range)
+    size = (path.stat().st_size if last is None else last) - first
+    parts = max(workers * CHUNKS_PER_WORKER, size // CHUNK_TARGET_BYTES)
+    jobs = [
+        (path, start, end, encoding, fail_policy, preview_cap, quiet, reader, aggregator_factory, time_range,
+         line_filter, stage_timings, error_samples)
+        for start, end in split_byte_ranges(path, parts, first, last)
+    ]
+
+    if pool is not None:
+        futures = [pool.submit(_parse_range, job) for job in jobs]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+        return
+
+    own_pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        yield from own_pool.map(_parse_range, jobs)
+    finally:
+        own_pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,236 @@
+"""
+Module: parse_cache.py
+Cel: Pamięć podręczna wyników parsowania (--cache-dir): kolejne raporty z tego samego pliku bez parse_line.
+Public API:
+  - class ParseCache(directory, max_bytes=DEFAULT_CACHE_BYTES)
+      entry_path(path, encoding)  - plik wpisu; klucz: ścieżka, mtime, rozmiar, kodowanie, PARSER_VERSION,
+      load(path, encoding)        - CachedColumns albo None (brak / nieaktualny / uszkodzony wpis),
+      build(path, encoding)       - parsuje plik (parse_batch) i zapisuje wpis; zwraca CachedColumns,
+      evict(keep=None)            - LRU: usuwa najdawniej używane wpisy ponad `max_bytes`.
+  - class CachedColumns
+      Kolumny wpisu zmapowane (mmap) bez kopiowania: rows, bad_count, fallback_lines,
+      bad_reasons / bad_samples (przyczyny błędnych linii i pierwsze CACHED_ERROR_SAMPLES z nich,
+      jak w errors.py) i batches(rows_per_batch) -> Iterator[ColumnBatch] (widoki memoryview na mapę).
+Format wpisu (.lcol): nagłówek _HEADER, tabela sekcji _SECTION (nazwa, typecode, offset, długość),
+sekcje wyrównane do 8 B: ts, ip, status, size, method, path, referrer, user_agent (jak w
+ColumnBatch), bad (bitmapa), dicts (JSON: wartości słowników DICT_COLUMNS) i errors (JSON:
+przyczyny i próbka błędnych linii).
+"Ostatnie użycie" wpisu to jego mtime (odświeżany przy każdym trafieniu) - atime bywa wyłączony.
+Wpis zapisywany jest do pliku tymczasowego i przenoszony (os.replace), więc czytelnik nigdy nie
+widzi niepełnego wpisu; kolumny w trakcie budowy trafiają do plików pomocniczych, nie do RAM.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from contextlib import ExitStack
+from itertools import islice
+from pathlib import Path
+from typing import Final, Iterator, Optional
+
+from .columns import DICT_COLUMNS, UINT32_TYPECODE, ColumnBatch, Dictionary, new_dictionaries
+from .errors import ERROR_SAMPLES_DEFAULT, ErrorSample, count_reason, error_reason
+from .io_reader import ReadStats, read_log_lines
+from .parser import PARSER_VERSION, parse_batch
+
+CACHE_SUFFIX: Final[str] = ".lcol"
+DEFAULT_CACHE_BYTES: Final[int] = 1024**3  # 1GiB
+BUILD_BATCH_ROWS: Final[int] = 64 * 1024  # wielokrotność 8: bitmapy partii łączą się bajt w bajt
+READ_BATCH_ROWS: Final[int] = 1024 * 1024  # wielokrotność 8
+CACHED_ERROR_SAMPLES: Final[int] = 10 * ERROR_SAMPLES_DEFAULT  # --error-samples z wpisu - maks. tyle
+
+_MAGIC: Final[bytes] = b"LACOL2\0\0"
+_HEADER: Final[struct.Struct] = struct.Struct("<8sIIqqq")  # magic, PARSER_VERSION, sekcje, rows, bad, fallback
+_SECTION: Final[struct.Struct] = struct.Struct("<16s2sqq")  # nazwa, typecode, offset, długość [B]
+_COLUMNS: Final[tuple[tuple[str, str], ...]] = (
+    ("ts", "q"), ("ip", UINT32_TYPECODE), ("status", "H"), ("size", "q"),
+    ("method", "i"), ("path", "i"), ("referrer", "i"), ("user_agent", "i"),
+)
+_ALIGN: Final[int] = 8
+
+
+class CachedColumns:
+    """Kolumny jednego wpisu pamięci podręcznej, zmapowane tylko do odczytu."""
+
+    def __init__(self, entry: Path):
+        with open(entry, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.columns: dict[str, memoryview] = {}
+        try:
+            self._parse()
+        except (ValueError, struct.error, UnicodeDecodeError, KeyError, TypeError):
+            self.close()
+            raise ValueError(f"Uszkodzony wpis pamięci podręcznej: {entry}") from None
+
+    def _parse(self) -> None:
+        magic, version, sections, self.rows, self.bad_count, self.fallback_lines = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != PARSER_VERSION:
+            raise ValueError("zły nagłówek")
+        view = memoryview(self._map)
+        for i in range(sections):
+            name, typecode, offset, length = _SECTION.unpack_from(self._map, _HEADER.size + i * _SECTION.size)
+            if offset + length > len(self._map):
+                raise ValueError("sekcja poza plikiem")
+            self.columns[name.rstrip(b"\0").decode()] = view[offset:offset + length].cast(typecode.rstrip(b"\0").decode())
+        values = json.loads(bytes(self.columns.pop("dicts")).decode("utf-8"))
+        self.dictionaries: dict[str, Dictionary] = {}
+        for name in DICT_COLUMNS:
+            dictionary = self.dictionaries[name] = Dictionary()
+            dictionary.values = values[name]
+            dictionary.codes = {value: code for code, value in enumerate(dictionary.values)}
+        errors = json.loads(bytes(self.columns.pop("errors")).decode("utf-8"))
+        self.bad_reasons: dict[str, int] = errors["reasons"]
+        self.bad_samples: list[ErrorSample] = [tuple(sample) for sample in errors["samples"]]
+        for name, _ in _COLUMNS:
+            if len(self.columns[name]) != self.rows:
+                raise ValueError("zła długość kolumny")
+
+    def batches(self, rows_per_batch: int = READ_BATCH_ROWS) -> Iterator[ColumnBatch]:
+        """Kolejne partie wierszy jako ColumnBatch (widoki na mapę, wspólne słowniki)."""
+        step = max(_ALIGN, rows_per_batch - rows_per_batch % _ALIGN)
+        for start in range(0, self.rows, step):
+            end = min(start + step, self.rows)
+            batch = ColumnBatch(self.dictionaries)
+            batch.rows = end - start
+            for name, _ in _COLUMNS:
+                setattr(batch, name, self.columns[name][start:end])
+            batch.bad = self.columns["bad"][start // 8:(end + 7) // 8]
+            yield batch
+
+    def close(self) -> None:
+        """Zwalnia mapę (jeśli żadna partia nie trzyma już widoku - inaczej zrobi to GC)."""
+        self.columns.clear()
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+
+
+class ParseCache:
+    """Katalog wpisów .lcol z limitem rozmiaru (LRU)."""
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_CACHE_BYTES):
+        if max_bytes < 1:
+            raise ValueError(f"Parametr 'max_bytes' musi być >= 1, otrzymano: {max_bytes}")
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def entry_path(self, path: Path, encoding: str) -> Path:
+        st = path.stat()
+        key = f"{path.resolve()}\0{st.st_mtime_ns}\0{st.st_size}\0{encoding.lower()}\0{PARSER_VERSION}"
+        return self.directory / (hashlib.sha1(key.encode("utf-8", "surrogateescape")).hexdigest() + CACHE_SUFFIX)
+
+    def load(self, path: Path, encoding: str = "utf-8") -> Optional[CachedColumns]:
+        """Wpis dla pliku albo None; uszkodzony wpis jest usuwany."""
+        entry = self.entry_path(path, encoding)
+        try:
+            cached = CachedColumns(entry)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            _remove(entry)
+            return None
+        try:
+            os.utime(entry)  # LRU: "ostatnio użyty"
+        except OSError:
+            pass
+        return cached
+
+    def build(self, path: Path, encoding: str = "utf-8") -> CachedColumns:
+        """Parsuje cały plik do wpisu (kolumny partiami na dysk), sprząta LRU i zwraca wpis."""
+        entry = self.entry_path(path, encoding)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+        spills = {name: tmp.with_name(f"{tmp.name}.{name}") for name, _ in _COLUMNS}
+        spills["bad"] = tmp.with_name(f"{tmp.name}.bad")
+        stats = ReadStats()
+        dictionaries = new_dictionaries()
+        rows = bad = 0
+        reasons: dict[str, int] = {}
+        samples: list[ErrorSample] = []
+
+        def on_error(row: int, line: str, exc: Exception) -> None:
+            count_reason(reasons, error_reason(exc))
+            if len(samples) < CACHED_ERROR_SAMPLES:
+                samples.append((rows + row + 1, str(exc), line))
+
+        try:
+            with ExitStack() as stack:
+                files = {name: stack.enter_context(open(spill, "wb")) for name, spill in spills.items()}
+                lines = read_log_lines(path, encoding=encoding, stats=stats)
+                while True:
+                    batch = parse_batch(islice(lines, BUILD_BATCH_ROWS), dictionaries=dictionaries, on_error=on_error)
+                    if batch.rows == 0:
+                        break
+                    rows += batch.rows
+                    bad += batch.bad_count
+                    for name, _ in _COLUMNS:
+                        getattr(batch, name).tofile(files[name])
+                    files["bad"].write(batch.bad)
+            _assemble(tmp, spills, rows, bad, stats.fallback_lines, dictionaries, {"reasons": reasons, "samples": samples})
+            os.replace(tmp, entry)
+        finally:
+            for spill in (*spills.values(), tmp):
+                _remove(spill)
+        self.evict(keep=entry)
+        return CachedColumns(entry)
+
+    def evict(self, keep: Optional[Path] = None) -> None:
+        """Usuwa najdawniej używane wpisy, aż suma rozmiarów <= max_bytes (`keep` - na końcu)."""
+        entries = []
+        for entry in self.directory.glob("*" + CACHE_SUFFIX):
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((entry == keep, st.st_mtime_ns, st.st_size, entry))
+        total = sum(size for _, _, size, _ in entries)
+        for _, _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            _remove(entry)
+            total -= size
+
+
+def _remove(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _assemble(
+    target: Path, spills: dict[str, Path], rows: int, bad: int, fallback_lines: int,
+    dictionaries: dict[str, Dictionary], errors: dict,
+) -> None:
+    """Skleja pliki kolumn, słowniki i błędy w jeden wpis (nagłówek + tabela sekcji + sekcje)."""
+    blobs = {
+        "dicts": json.dumps({name: dictionaries[name].values for name in DICT_COLUMNS}, ensure_ascii=False),
+        "errors": json.dumps(errors, ensure_ascii=False),
+    }
+    blobs = {name: text.encode("utf-8") for name, text in blobs.items()}
+    sections = [(name, typecode, spills[name].stat().st_size) for name, typecode in _COLUMNS]
+    sections += [("bad", "B", spills["bad"].stat().st_size)]
+    sections += [(name, "B", len(blob)) for name, blob in blobs.items()]
+
+    offset = _HEADER.size + len(sections) * _SECTION.size
+    table = []
+    for name, typecode, length in sections:
+        offset += -offset % _ALIGN
+        table.append(_SECTION.pack(name.encode(), typecode.encode(), offset, length))
+        offset += length
+
+    with open(target, "wb") as out:
+        out.write(_HEADER.pack(_MAGIC, PARSER_VERSION, len(sections), rows, bad, fallback_lines))
+        out.write(b"".join(table))
+        for name, _, _ in sections:
+            out.write(b"\0" * (-out.tell() % _ALIGN))
+            if name in blobs:
+                out.write(blobs[name])
+                continue
+            with open(spills[name], "rb") as spill:
+                while chunk := spill.read(1024 * 1024):
+                    out.write(chunk)
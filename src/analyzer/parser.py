@@ -20,17 +20,37 @@ Public API:
       Polityka błędów:
         - "skip": zwróć None i zaloguj ostrzeżenie na loggerze modułu,
         - "strict": podnieś ValueError z krótką diagnozą.
+  - def parse_line_bytes(line: bytes, fail_policy: str = "skip", encoding: str = "utf-8") -> dict | None
+      Jak parse_line, ale dla surowych bajtów (reader mmap): linia ASCII jest dekodowana raz i idzie
+      szybką ścieżką parse_line, pozostałe - regex na bajtach, dekodowane są tylko pola.
+  - as_record=True (w obu funkcjach): zamiast dict zwracany jest record.LogRecord
+      (__slots__, czas jako int `epoch`, `ts` liczony leniwie; dostęp rec["pole"] działa dalej).
+  - with_time=False (w obu funkcjach): timestamp jest walidowany jak zwykle (memo), ale nie jest
+      zamieniany na wartość (raport bez czasu, --time-bucket none); "ts" = None w dict, epoch = 0
+      w LogRecord. Liczniki poprawnych/błędnych linii nie zależą od with_time.
+  - def parse_line_timed(line, timings, fail_policy="skip", encoding="utf-8", as_record=False,
+                         with_time=True) -> dict | LogRecord | None
+      parse_line / parse_line_bytes (wg typu linii) z czasami etapów w profiling.StageTimings
+      (match, decode, validate) - dla --stats-json / --profile; te same kroki co bez pomiaru.
+  - def parse_batch(lines, encoding="utf-8", dictionaries=None, on_error=None) -> columns.ColumnBatch
+      Partia linii (str lub bytes) -> kolumny array (ip, ts, status, size, kody słownikowe
+      method/path/referrer/user_agent) + bitmapa błędnych linii; bez ostrzeżeń na linię.
 Wyjątki:
   - ValueError przy "strict" (zła składnia, zły status/metoda/IP, zła data, linia > limit).
 Bezpieczeństwo:
   - Limit długości linii (domyśl: 16 MiB) – odrzuca nadmiernie długie rekordy.
   - Brak eval/exec, brak parsowania niekontrolowanych fragmentów jako kodu.
   - Walidacje pól liczbowych, zakresów i formatu IP; świadome logowanie (bez PII).
+Wydajność:
+  - Szybka ścieżka (_parse_fast): typowa poprawna linia dzielona jest bez dużego regexu
+    (jeden split po '"', stałe pozycje timestampu, partition); każda nietypowa lub błędna
+    linia idzie ścieżką regex, więc wyniki i komunikaty błędów są identyczne.
 TODO (lekcja 3):
   [x] PRECOMPILED_COMBINED_RE: regex z nazwanymi grupami (remote_host, identd, user, ts, method, path, protocol, status, size, referrer, user_agent)
   [x] WHITELIST_METHODS: {"GET","POST","PUT","DELETE","HEAD","OPTIONS","PATCH","CONNECT","TRACE"}
   [ ] parse_request(raw: str) -> tuple[str, str, str | None]
-  [x] parse_timestamp(raw: str) -> datetime     # tz-aware i normalizacja do UTC
+  [x] parse_timestamp(raw: str) -> datetime     # tz-aware i normalizacja do UTC (memoizowane)
+  [x] parse_timestamp_epoch(raw: str) -> int    # to samo jako epoch UTC (bez datetime)
   [x] is_ipv4(text: str) -> bool                # format + zakres 0–255
   [x] parse_size(text: str) -> int | None       # '-' → None
   [x] parse_line(line: str, fail_policy: str = "skip") -> dict | None
@@ -38,13 +58,24 @@ TODO (lekcja 3):
 # imports: stdlib -> third-party -> local
 from __future__ import annotations
 
-import re, logging
+import logging
+import re
+import time
 from datetime import datetime, timezone, timedelta
-from typing import Final
+from functools import lru_cache
+from socket import inet_aton
+from typing import TYPE_CHECKING, Callable, Final, Iterable
+
+from .columns import NULL_CODE, SIZE_MISSING, ColumnBatch, Dictionary
+from .record import LogRecord
+
+if TYPE_CHECKING:
+    from .profiling import StageTimings
 
 logger = logging.getLogger(__name__)
 
 MAX_LINE_LEN: Final[int] = 16 * 1024 * 1024  # 16MiB
+PARSER_VERSION: Final[int] = 1  # bump whenever parse results change (invalidates --cache-dir entries)
 
 PRECOMPILED_COMBINED_RE = re.compile(
     r"""
@@ -98,6 +129,13 @@ PRECOMPILED_COMBINED_RE = re.compile(
     re.VERBOSE,
 )
 
+# Same pattern over raw bytes (mmap reader): fields are decoded only after the match.
+# NOTE: in bytes mode \d/\s/\S are ASCII-only, which is at least as strict as the str regex.
+PRECOMPILED_COMBINED_BYTES_RE = re.compile(
+    PRECOMPILED_COMBINED_RE.pattern.encode("utf-8"),
+    re.VERBOSE,
+)
+
 
 # Three-letter English month abbreviations (canonical, upper-case)
 MONTHS_ABBR: Final[tuple[str, ...]] = (
@@ -115,6 +153,17 @@ TS_RE: Final[re.Pattern[str]] = re.compile(
     r"(?P<sign>[+-])(?P<offhh>\d{2})(?P<offmm>\d{2})$"
 )
 
+# Timestamp caches (see parse_timestamp): bounded, shared by all entry points
+TS_CACHE_SIZE: Final[int] = 4096
+_EPOCH: Final[datetime] = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_SECOND: Final[timedelta] = timedelta(seconds=1)
+_MINUTE_BASE: dict[str, int] = {}  # "DD/Mon/YYYY:HH:MM ±HHMM" -> epoch of HH:MM:00
+_TZ_BY_OFFSET: dict[int, timezone] = {}  # offset minutes -> timezone
+# UTC datetime range as epoch seconds: LogRecord.ts must always be constructible
+_EPOCH_MIN: Final[int] = -62135596800  # 0001-01-01T00:00:00Z
+_EPOCH_MAX: Final[int] = 253402300799  # 9999-12-31T23:59:59Z
+_NO_TIME: Final[int] = 0  # epoch of records parsed with with_time=False
+
 # Allowed HTTP methods (immutable)
 ALLOWED_HTTP_METHODS: Final[frozenset[str]] = frozenset({
     "GET", "POST", "PUT", "DELETE", "HEAD", "OPTIONS", "PATCH", "CONNECT", "TRACE",
@@ -124,6 +173,108 @@ ALLOWED_HTTP_METHODS: Final[frozenset[str]] = frozenset({
 # Protocol validator: HTTP/1.0, HTTP/1.1, HTTP/2, HTTP/3
 PROTO_RE: Final[re.Pattern[str]] = re.compile(r"HTTP/\d(?:\.\d)?")
 
+# Canonical IPv4 (same alternation as in PRECOMPILED_COMBINED_RE), used by _parse_fast
+IPV4_RE: Final[re.Pattern[str]] = re.compile(
+    r"(?:25[0-5]|2[0-4]\d|1\d{2}|[1-9]?\d)(?:\.(?:25[0-5]|2[0-4]\d|1\d{2}|[1-9]?\d)){3}"
+)
+
+
+def _parse_fast(text: str, as_record: bool = False, with_time: bool = True) -> dict | LogRecord | None:
+    """
+    Fast path for the common, well-formed Combined line (no big regex, no TS_RE).
+
+    Accepted shape only: printable ASCII, single spaces between fields, exactly six quotes,
+    no backslash escapes and a fixed-width 26-char timestamp "DD/Mon/YYYY:HH:MM:SS ±HHMM".
+    Fields are cut with one split on '"', fixed positions, `partition` and short splits;
+    the timestamp goes through the memoized `_timestamp_utc` (`_timestamp_epoch_memo` for records).
+
+    Returns the same dict / LogRecord `parse_line` would return, or None when the line is unusual OR
+    any validation fails - the caller then takes the regex path, which produces the
+    result/error message. This keeps validation results identical between both paths.
+    """
+    # isascii() is O(1); isprintable() on ASCII rules out tabs/control chars, so ' ' is the only whitespace
+    if not (text.isascii() and text.isprintable()) or "\\" in text:
+        return None
+
+    parts = text.split('"')
+    if len(parts) != 7 or parts[4] != " " or parts[6]:
+        return None
+    prefix, request, middle, referrer, _, user_agent, _ = parts
+
+    # prefix: 'IP IDENTD USER [DD/Mon/YYYY:HH:MM:SS +HHMM] ' - timestamp at fixed offsets from the end
+    if prefix[-30:-28] != " [" or prefix[-2:] != "] ":
+        return None
+    try:
+        if not with_time:
+            _record_epoch(prefix[-28:-2])  # same validation as below, the value is not needed
+            timestamp = _NO_TIME if as_record else None
+        else:
+            timestamp = (_record_epoch if as_record else _timestamp_utc)(prefix[-28:-2])
+    except (ValueError, OverflowError):
+        return None
+
+    host_fields = prefix[:-30].split(" ")
+    if len(host_fields) != 3 or not (host_fields[1] and host_fields[2]):
+        return None
+    remote_host, identd, user = host_fields
+    if not IPV4_RE.fullmatch(remote_host):
+        return None
+
+    # request: 'METHOD PATH[ PROTOCOL]'
+    req = request.split(" ")
+    if len(req) == 2:
+        method, path = req
+        protocol = None
+    elif len(req) == 3:
+        method, path, protocol = req
+        if not PROTO_RE.fullmatch(protocol):
+            return None
+    else:
+        return None
+    method = method.upper()
+    if method not in ALLOWED_HTTP_METHODS or not path:
+        return None
+
+    # middle: ' STATUS SIZE '
+    if middle[:1] != " " or middle[-1:] != " ":
+        return None
+    status, sep, size = middle[1:-1].partition(" ")
+    if not (sep and len(status) == 3 and status.isdigit()):
+        return None
+    status_code = int(status)
+    if not (100 <= status_code <= 599):
+        return None
+    if size == "-":
+        size_value = None
+    elif size.isdigit():
+        size_value = int(size)
+    else:
+        return None
+
+    identd = None if identd == "-" else identd
+    user = None if user == "-" else user
+    referrer = None if referrer == "-" else referrer
+    user_agent = None if user_agent == "-" else user_agent
+    if as_record:
+        return LogRecord(
+            remote_host, identd, user, timestamp, method, path,
+            protocol, status_code, size_value, referrer, user_agent,
+        )
+    return {
+        "remote_host": remote_host,
+        "identd": identd,
+        "user": user,
+        "ts": timestamp,
+        "method": method,
+        "path": path,
+        "protocol": protocol,
+        "status": status_code,
+        "size": size_value,
+        "referrer": referrer,
+        "user_agent": user_agent,
+    }
+
+
 def is_ipv4(text: str) -> bool:
     """
     Return True iff `text` is a canonical IPv4 address.
@@ -195,6 +346,8 @@ def parse_timestamp(raw: str) -> datetime:
       - Validates shape, month token, time ranges, and timezone offset ranges.
       - Builds a fixed-offset local datetime and converts it to UTC.
       - Returns tz-aware datetime in UTC.
+      - Memoized: raw string -> datetime (LRU, TS_CACHE_SIZE entries), minute prefix ->
+        base epoch, offset -> interned timezone. Invalid input is never cached.
 
     Raises:
       ValueError:
@@ -208,7 +361,44 @@ def parse_timestamp(raw: str) -> datetime:
       >>> parse_timestamp("10/Oct/2023:13:55:36 +0200")
       datetime.datetime(2023, 10, 10, 11, 55, 36, tzinfo=datetime.timezone.utc)
     """
-    s = raw.strip()
+    return _timestamp_utc(raw.strip())
+
+
+def parse_timestamp_epoch(raw: str) -> int:
+    """
+    Like `parse_timestamp`, but returns UTC epoch seconds (int) without creating a datetime.
+    Same validation and the same ValueError messages.
+
+    Examples:
+      >>> parse_timestamp_epoch("10/Oct/2023:13:55:36 +0200")
+      1696938936
+    """
+    return _timestamp_epoch_memo(raw.strip())
+
+
+def _tz_for_offset(offset_minutes: int) -> timezone:
+    """Interned fixed-offset tzinfo (at most ~1700 distinct offsets exist)."""
+    tz = _TZ_BY_OFFSET.get(offset_minutes)
+    if tz is None:
+        tz = _TZ_BY_OFFSET[offset_minutes] = timezone(timedelta(minutes=offset_minutes))
+    return tz
+
+
+def _timestamp_epoch(s: str) -> int:
+    """
+    Core of timestamp parsing: stripped "DD/Mon/YYYY:HH:MM:SS ±HHMM" -> UTC epoch seconds.
+
+    Lines of one log share the minute prefix, so the validated "DD/Mon/YYYY:HH:MM ±HHMM"
+    part is cached as a base epoch (_MINUTE_BASE) and only the seconds are checked per call.
+    Errors are never cached: invalid input always goes through the full validation below.
+    """
+    if len(s) == 26:
+        base = _MINUTE_BASE.get(s[:17] + s[20:])
+        if base is not None:
+            sec = s[18:20]
+            # isdecimal() == what TS_RE's \d accepts (and what int() parses)
+            if s[17] == ":" and sec.isdecimal() and int(sec) <= 59:
+                return base + int(sec)
 
     m = TS_RE.fullmatch(s)
     if not m:
@@ -239,16 +429,130 @@ def parse_timestamp(raw: str) -> datetime:
     if gd["sign"] == "-":
         offset_minutes = -offset_minutes
 
-    tz = timezone(timedelta(minutes=offset_minutes))
+    tz = _tz_for_offset(offset_minutes)
     try:
         local_dt = datetime(year, month, day, hour, minutes, seconds, tzinfo=tz)
     except ValueError as _:
         # e.g. 31/Feb, 29/Feb in a non-leap year
         raise ValueError("ts: invalid calendar date") from None
 
-    return local_dt.astimezone(timezone.utc)
+    epoch = (local_dt - _EPOCH) // _ONE_SECOND
+
+    if len(s) == 26:
+        if len(_MINUTE_BASE) >= TS_CACHE_SIZE:
+            _MINUTE_BASE.clear()  # simple bound; logs revisit old minutes rarely
+        _MINUTE_BASE[s[:17] + s[20:]] = epoch - seconds
+
+    return epoch
+
+
+@lru_cache(maxsize=TS_CACHE_SIZE)
+def _timestamp_utc(s: str) -> datetime:
+    """Raw (stripped) timestamp -> UTC datetime; memoized, exceptions are not cached."""
+    # Same value as local_dt.astimezone(timezone.utc), including OverflowError at year 1/9999
+    return _EPOCH + timedelta(seconds=_timestamp_epoch(s))
+
+
+@lru_cache(maxsize=TS_CACHE_SIZE)
+def _timestamp_epoch_memo(s: str) -> int:
+    """Raw (stripped) timestamp -> UTC epoch seconds; memoized like `_timestamp_utc`."""
+    return _timestamp_epoch(s)
 
-def parse_line(line: str, fail_policy: str = "skip") -> dict | None:
+
+def _record_epoch(s: str) -> int:
+    """Epoch for LogRecord; raises OverflowError exactly where `_timestamp_utc` would."""
+    epoch = _timestamp_epoch_memo(s)
+    if not (_EPOCH_MIN <= epoch <= _EPOCH_MAX):
+        raise OverflowError("date value out of range")
+    return epoch
+
+
+def _build_record(
+    remote_host: str,
+    identd: str,
+    user: str,
+    ts: str,
+    method: str,
+    path: str,
+    protocol: str | None,
+    status: str,
+    size: str,
+    referrer: str,
+    user_agent: str,
+    as_record: bool = False,
+    with_time: bool = True,
+) -> dict | LogRecord:
+    """
+    Validate and normalize the raw Combined fields (in regex group order), as captured
+    by the regex or by the fast path. Shared by the str and bytes entry points.
+    Returns a LogRecord (epoch int timestamp) instead of a dict when `as_record` is set.
+    With `with_time=False` the timestamp is validated but not converted (see `parse_line`).
+    Raises ValueError with a short diagnostic.
+    """
+    # Remote host
+    # NOTE: Combined regex (and the fast path) already enforce canonical IPv4. If you plan to
+    #       support hostnames/IPv6 later, relax them and validate here.
+
+    # Identifiers ("-" -> None)
+    identd = None if identd == "-" else identd
+    user = None if user == "-" else user
+
+    # Timestamp (tz-aware UTC; epoch seconds for records)
+    if not with_time:
+        _record_epoch(ts.strip())  # validated anyway: ok/bad counts must not depend on with_time
+        timestamp = _NO_TIME if as_record else None
+    else:
+        timestamp = _record_epoch(ts.strip()) if as_record else parse_timestamp(ts)
+
+    # Request-line fields
+    method = method.upper()  # regex enforces [A-Za-z]+
+    if method not in ALLOWED_HTTP_METHODS:
+        raise ValueError("method: not allowed")
+
+    if not path or " " in path:
+        raise ValueError("path: invalid")
+
+    if protocol is not None and not PROTO_RE.fullmatch(protocol):
+        raise ValueError("protocol: invalid")
+
+    # Status code
+    status = int(status)
+    if not (100 <= status <= 599):
+        raise ValueError("status: out of range")
+
+    # Size
+    try:
+        size = parse_size(size)  # int | None
+    except ValueError:
+        raise ValueError("size: invalid")
+
+    # Referrer / User-Agent ("-" -> None), de-escape \" -> "
+    referrer = None if referrer == "-" else referrer.replace(r'\"', '"')
+    user_agent = None if user_agent == "-" else user_agent.replace(r'\"', '"')
+
+    if as_record:
+        return LogRecord(
+            remote_host, identd, user, timestamp, method, path,
+            protocol, status, size, referrer, user_agent,
+        )
+    return {
+        "remote_host": remote_host,
+        "identd": identd,
+        "user": user,
+        "ts": timestamp,
+        "method": method,
+        "path": path,
+        "protocol": protocol,
+        "status": status,
+        "size": size,
+        "referrer": referrer,
+        "user_agent": user_agent,
+    }
+
+
+def parse_line(
+    line: str, fail_policy: str = "skip", as_record: bool = False, with_time: bool = True
+) -> dict | LogRecord | None:
     """
     Parse a single Apache Combined log line into a normalized dict.
 
@@ -259,10 +563,17 @@ def parse_line(line: str, fail_policy: str = "skip") -> dict | None:
     fail_policy : {"skip", "strict"}
         - "skip": return None and log a warning on invalid input.
         - "strict": raise ValueError with a short diagnostic message.
+    as_record : bool
+        Return a compact `LogRecord` instead of a dict (same fields, same dict-style access;
+        the timestamp is stored as int epoch seconds and `ts` is created on access).
+    with_time : bool
+        False skips timestamp conversion (for reports that ignore time, e.g. --time-bucket none):
+        "ts" is None in dicts and `epoch` is 0 in records. The timestamp is still validated
+        (memoized), so the same lines are rejected as with `with_time=True`.
 
     Returns
     -------
-    dict | None
+    dict | LogRecord | None
         On success, a dictionary with fields:
         {
           "remote_host": str,          # validated IPv4 (0..255 per octet)
@@ -292,68 +603,234 @@ def parse_line(line: str, fail_policy: str = "skip") -> dict | None:
         # Keep leading spaces intact; drop only line endings
         text = line.rstrip("\r\n")
 
+        # Common well-formed lines skip the big regex; anything unusual takes the regex path
+        record = _parse_fast(text, as_record, with_time)
+        if record is not None:
+            return record
+
         match = PRECOMPILED_COMBINED_RE.fullmatch(text)
         if not match:
             raise ValueError("line: bad shape")
 
-        groups = match.groupdict()
+        return _build_record(*match.groups(), as_record=as_record, with_time=with_time)
 
-        # Remote host
-        remote_host = groups["remote_host"]
-        # NOTE: Combined regex already enforces canonical IPv4. If you plan to
-        #       support hostnames/IPv6 later, relax the regex and validate here.
+    except ValueError as exc:
+        if fail_policy == "strict":
+            raise
+        logger.warning(f"parse_line skipped: {exc}")
+        return None
+
+
+def _decode_field(raw: bytes | None, encoding: str) -> str | None:
+    """Decode one captured field; on a decode error fall back to latin-1 (never fails)."""
+    if raw is None:
+        return None
+    try:
+        return raw.decode(encoding)
+    except UnicodeDecodeError:
+        return raw.decode("latin-1")
+
+
+def _parse_fast_bytes(text: bytes, as_record: bool = False, with_time: bool = True) -> dict | LogRecord | None:
+    """
+    `_parse_fast` for raw bytes. An ASCII line decodes to the same text in every ASCII-compatible
+    encoding, so it is decoded once as a whole and cut by `_parse_fast` - no regex and no per-field
+    decode calls. Non-ASCII lines return None (regex on bytes + `_decode_fields`).
+    """
+    if not text.isascii():
+        return None
+    return _parse_fast(text.decode("ascii"), as_record, with_time)
+
+
+def _decode_fields(fields: tuple, encoding: str) -> list[str | None]:
+    """Decode captured byte fields; on a decode error every field goes through `_decode_field`."""
+    try:
+        return [None if f is None else f.decode(encoding) for f in fields]
+    except UnicodeDecodeError:
+        return [_decode_field(f, encoding) for f in fields]
+
+
+def parse_line_bytes(
+    line: bytes, fail_policy: str = "skip", encoding: str = "utf-8", as_record: bool = False,
+    with_time: bool = True,
+) -> dict | LogRecord | None:
+    """
+    Parse a single Apache Combined log line given as raw bytes (e.g. from the mmap reader).
+
+    Well-formed ASCII lines (nearly all) take the `_parse_fast` path after one whole-line decode
+    (`_parse_fast_bytes`). Other lines are matched without decoding them first; only the captured
+    fields are decoded with `encoding` (per field fallback to "latin-1", like `read_log_lines`).
+    Result contract, validations and `fail_policy` are the same as in `parse_line`.
+
+    Parameters
+    ----------
+    line : bytes
+        Raw log line (bytes-like; may include a trailing newline).
+    fail_policy : {"skip", "strict"}
+        Same as in `parse_line`.
+    encoding : str
+        Text encoding of the field values.
+    as_record, with_time : bool
+        Same as in `parse_line`.
+
+    Raises
+    ------
+    ValueError
+        Only when fail_policy="strict".
+    """
+    try:
+        if len(line) > MAX_LINE_LEN:
+            raise ValueError("line: too long")
 
-        # Identifiers ("-" -> None)
-        identd = None if groups["identd"] == "-" else groups["identd"]
-        user = None if groups["user"] == "-" else groups["user"]
+        text = line.rstrip(b"\r\n")
 
-        # Timestamp (tz-aware UTC)
-        timestamp = parse_timestamp(groups["ts"])
+        record = _parse_fast_bytes(text, as_record, with_time)
+        if record is not None:
+            return record
 
-        # Request-line fields
-        method = groups["method"].upper()  # regex enforces [A-Za-z]+
-        if method not in ALLOWED_HTTP_METHODS:
-            raise ValueError("method: not allowed")
+        match = PRECOMPILED_COMBINED_BYTES_RE.fullmatch(text)
+        if not match:
+            raise ValueError("line: bad shape")
 
-        path = groups["path"]
-        if not path or " " in path:
-            raise ValueError("path: invalid")
+        return _build_record(*_decode_fields(match.groups(), encoding), as_record=as_record, with_time=with_time)
 
-        protocol = groups["protocol"]
-        if protocol is not None and not PROTO_RE.fullmatch(protocol):
-            raise ValueError("protocol: invalid")
+    except ValueError as exc:
+        if fail_policy == "strict":
+            raise
+        logger.warning(f"parse_line skipped: {exc}")
+        return None
+
+
+def parse_line_timed(
+    line: str | bytes,
+    timings: StageTimings,
+    fail_policy: str = "skip",
+    encoding: str = "utf-8",
+    as_record: bool = False,
+    with_time: bool = True,
+) -> dict | LogRecord | None:
+    """
+    `parse_line` (str) / `parse_line_bytes` (bytes) with per-stage timing (--stats-json, --profile).
+
+    Runs the same steps (`_parse_fast` / `_parse_fast_bytes`, the regex, `_decode_fields`,
+    `_build_record`), so results, errors and `fail_policy` handling cannot drift from the untimed
+    parsers; only clock reads are added around them: "match" (fast path incl. its timestamp and the
+    ASCII decode of bytes lines, or the big regex; one call per line), "decode" (bytes fields) and
+    "validate" (`_build_record` incl. the timestamp). Used only when stats are enabled, so the
+    untimed entry points stay free of clock calls.
+    """
+    clock = time.perf_counter_ns
+    ns, calls = timings.ns, timings.calls
+    try:
+        if len(line) > MAX_LINE_LEN:
+            raise ValueError("line: too long")
 
-        # Status code
-        status = int(groups["status"])
-        if not (100 <= status <= 599):
-            raise ValueError("status: out of range")
+        started = clock()
+        record = match = None
+        if isinstance(line, str):
+            text = line.rstrip("\r\n")
+            record = _parse_fast(text, as_record, with_time)
+            if record is None:
+                match = PRECOMPILED_COMBINED_RE.fullmatch(text)
+        else:
+            text = line.rstrip(b"\r\n")
+            record = _parse_fast_bytes(text, as_record, with_time)
+            if record is None:
+                match = PRECOMPILED_COMBINED_BYTES_RE.fullmatch(text)
+        matched = clock()
+        ns["match"] += matched - started
+        calls["match"] += 1
+        if record is not None:
+            return record
+        if not match:
+            raise ValueError("line: bad shape")
 
-        # Size
+        values = match.groups()
+        if not isinstance(line, str):
+            values = _decode_fields(values, encoding)
+            decoded = clock()
+            ns["decode"] += decoded - matched
+            calls["decode"] += 1
+            matched = decoded
         try:
-            size = parse_size(groups["size"])  # int | None
-        except ValueError:
-            raise ValueError("size: invalid")
-
-        # Referrer / User-Agent ("-" -> None), de-escape \" -> "
-        referrer = None if groups["referrer"] == "-" else groups["referrer"].replace(r'\"', '"')
-        user_agent = None if groups["user_agent"] == "-" else groups["user_agent"].replace(r'\"', '"')
-
-        return {
-            "remote_host": remote_host,
-            "identd": identd,
-            "user": user,
-            "ts": timestamp,
-            "method": method,
-            "path": path,
-            "protocol": protocol,
-            "status": status,
-            "size": size,
-            "referrer": referrer,
-            "user_agent": user_agent,
-        }
+            return _build_record(*values, as_record=as_record, with_time=with_time)
+        finally:
+            ns["validate"] += clock() - matched
+            calls["validate"] += 1
 
     except ValueError as exc:
         if fail_policy == "strict":
             raise
         logger.warning(f"parse_line skipped: {exc}")
         return None
+
+
+def parse_batch(
+    lines: Iterable[str | bytes],
+    encoding: str = "utf-8",
+    dictionaries: dict[str, Dictionary] | None = None,
+    on_error: Callable[[int, str | bytes, Exception], None] | None = None,
+) -> ColumnBatch:
+    """
+    Parse a batch of lines into column arrays (see `columns.ColumnBatch`).
+
+    Row i of every column belongs to input line i. Invalid lines get their bit set in
+    `batch.bad` and zero placeholders in the columns; no per-line warning is logged.
+    Validation is exactly `parse_line` / `parse_line_bytes` (bytes lines use `encoding`).
+
+    Parameters
+    ----------
+    lines : Iterable[str | bytes]
+        Raw log lines (str from `read_log_lines`, bytes from `read_log_lines_mmap`).
+    encoding : str
+        Text encoding of bytes lines.
+    dictionaries : dict[str, Dictionary], optional
+        Dictionaries for the encoded columns (`columns.new_dictionaries()`); pass the same
+        object to consecutive batches to keep codes comparable between them.
+    on_error : callable, optional
+        Called as `on_error(row, line, exc)` for every invalid line (e.g. to count reasons
+        and keep a sample of bad lines, see `errors.py`).
+    """
+    batch = ColumnBatch(dictionaries)
+    ip, ts, status, size, bad = batch.ip, batch.ts, batch.status, batch.size, batch.bad
+    method_codes, path_codes = batch.method, batch.path
+    referrer_codes, user_agent_codes = batch.referrer, batch.user_agent
+    encode_method = batch.dictionaries["method"].encode
+    encode_path = batch.dictionaries["path"].encode
+    encode_referrer = batch.dictionaries["referrer"].encode
+    encode_user_agent = batch.dictionaries["user_agent"].encode
+
+    row = -1
+    for row, line in enumerate(lines):
+        if not row & 7:
+            bad.append(0)
+        try:
+            if isinstance(line, str):
+                rec = parse_line(line, fail_policy="strict", as_record=True)
+            else:
+                rec = parse_line_bytes(line, fail_policy="strict", encoding=encoding, as_record=True)
+        except (ValueError, OverflowError) as exc:
+            if on_error is not None:
+                on_error(row, line, exc)
+            bad[row >> 3] |= 1 << (row & 7)
+            ip.append(0)
+            ts.append(0)
+            status.append(0)
+            size.append(SIZE_MISSING)
+            method_codes.append(NULL_CODE)
+            path_codes.append(NULL_CODE)
+            referrer_codes.append(NULL_CODE)
+            user_agent_codes.append(NULL_CODE)
+            continue
+
+        ip.append(int.from_bytes(inet_aton(rec.remote_host), "big"))
+        ts.append(rec.epoch)
+        status.append(rec.status)
+        size.append(SIZE_MISSING if rec.size is None else rec.size)
+        method_codes.append(encode_method(rec.method))
+        path_codes.append(encode_path(rec.path))
+        referrer_codes.append(encode_referrer(rec.referrer))
+        user_agent_codes.append(encode_user_agent(rec.user_agent))
+
+    batch.rows = row + 1
+    return batch
@@ -0,0 +1,387 @@
+"""
+Module: pipeline.py
+Cel: Wspólna pętla "linia -> parse_line -> liczniki" dla trybu szeregowego i równoległego.
+Public API:
+  - class ChunkResult
+      Wynik przetworzenia jednego fragmentu wejścia (plik, zakres bajtów):
+        lines / ok / bad  - liczniki linii (lines = ok + bad + filtered),
+        filtered          - linie odrzucone przez filtry (--since/--until, filters.LineFilter),
+        fallback_lines    - linie zdekodowane awaryjnie w latin-1 (uzupełnia wywołujący z ReadStats),
+        bad_reasons       - błędne linie wg przyczyny (errors.error_reason: "line", "ts", ...),
+        bad_samples       - pierwsze błędne linie (nr lokalny, komunikat, treść), maks. `error_samples`,
+        events            - zdarzenia do wypisania przez CLI (podgląd, błąd krytyczny), w kolejności,
+        failed            - True, gdy fail_policy="strict" przerwała przetwarzanie,
+        aggregator        - Aggregator z rekordami fragmentu (gdy podano agregator / fabrykę),
+        timings           - profiling.StageTimings fragmentu (gdy włączono pomiar etapów).
+  - def process_lines(lines, fail_policy="skip", preview_cap=0, quiet=False, emit=None,
+                      parse=parse_line, aggregator=None, time_range=None, sink=None,
+                      line_filter=None, timings=None, error_samples=ERROR_SAMPLES_DEFAULT) -> ChunkResult
+  - def process_file(path, encoding="utf-8", limit=None, reader="text",
+                     aggregator_factory=None, time_range=None, byte_range=None, cache=None,
+                     sink=None, line_filter=None, stage_timings=False, error_samples=..., **opcje)
+                     -> ChunkResult
+      Cały plik: wybór readera (skompresowane zawsze strumieniowo) + process_lines.
+      Z `time_range` czytany jest tylko zakres bajtów z timeindex.byte_range_for;
+      `byte_range` (start, end) podaje zakres wprost (np. przyrost od offsetu z --state-file).
+      Z `cache` (parse_cache.ParseCache, --cache-dir) rekordy czytane są z kolumn wpisu
+      pamięci podręcznej (budowanego przy pierwszym przebiegu) zamiast z parse_line.
+      `stage_timings=True` (--stats-json, --profile): czasy etapów w `ChunkResult.timings`.
+      Wejście strumieniowe (io_reader.is_stream_input: "-" = stdin, potok) czytane jest
+      blokami `read_size` (--read-size) od początku do końca - bez indeksu czasu, cache i mmap.
+  - def resolve_byte_range(path, time_range, byte_range) -> (start, end | None)
+      Zakres bajtów pliku dla process_file / parallel.parse_parallel.
+  - def select_parse(reader, encoding, as_record=False, with_time=True, timings=None) -> parse
+      Funkcja parsująca dla linii readera (str / bytes); z `timings` - parser.parse_line_timed.
+  - def needs_time(aggregator, time_range, sink, preview_cap) -> bool
+      Czy rekordy muszą mieć czas; False -> parsowanie z with_time=False (timestamp tylko walidowany).
+      `aggregator_factory` (np. functools.partial(Aggregator, "hour")) jest picklowalna,
+      więc ten sam parametr trafia do procesów roboczych (parallel.py).
+Zdarzenia (krotki (kind, n, text)) niosą numery LOKALNE dla fragmentu:
+  - ("line", n, line)       - n-ta linia fragmentu (tylko n <= preview_cap),
+  - ("parsed", k, repr)     - k-ty poprawny rekord fragmentu (tylko k <= preview_cap),
+  - ("fatal", n, msg)       - błąd w linii n przy fail_policy="strict"; ostatnie zdarzenie.
+Przy fail_policy="skip" błędne linie nie dają zdarzeń (ani ostrzeżeń loggera) - tylko liczniki
+`bad_reasons` i próbkę `bad_samples` (patrz errors.py).
+CLI przelicza numery (także w próbce) na globalne, znając liczniki wcześniejszych fragmentów,
+dzięki czemu wyjście trybu równoległego jest identyczne z szeregowym.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Optional, Union
+
+from .aggregator import Aggregator
+from .columns import ColumnBatch
+from .errors import ERROR_SAMPLES_DEFAULT, ErrorSample, count_reason, error_reason
+from .io_reader import (
+    STREAM_READ_BYTES, ReadStats, detect_compression, is_stream_input, read_log_lines, read_log_lines_mmap,
+)
+from .parser import parse_line, parse_line_bytes, parse_line_timed
+from .record import LogRecord
+from .timeindex import byte_range_for
+
+if TYPE_CHECKING:
+    from .filters import LineFilter
+    from .parse_cache import ParseCache
+    from .profiling import StageTimings
+
+Event = tuple[str, int, str]
+Line = Union[str, bytes]
+
+
+@dataclass
+class ChunkResult:
+    """Liczniki i zdarzenia jednego fragmentu wejścia (picklowalne - wraca z procesów roboczych)."""
+
+    lines: int = 0
+    ok: int = 0
+    bad: int = 0
+    fallback_lines: int = 0
+    events: list[Event] = field(default_factory=list)
+    failed: bool = False
+    aggregator: Optional[Aggregator] = None
+    filtered: int = 0
+    timings: Optional[StageTimings] = None
+    bad_reasons: dict[str, int] = field(default_factory=dict)
+    bad_samples: list[ErrorSample] = field(default_factory=list)
+
+
+TimeRange = tuple[Optional[int], Optional[int]]  # [since, until) w epoch UTC; None = bez ograniczenia
+ByteRange = tuple[int, Optional[int]]  # [start, end) w bajtach; end=None = do końca pliku
+
+
+def _preview_text(line: Line) -> str:
+    """Tekst linii do podglądu (linie z readera mmap są bajtami)."""
+    if isinstance(line, str):
+        return line
+    return bytes(line).decode("utf-8", errors="replace")
+
+
+def _preview_record(rec: dict | LogRecord) -> str:
+    """Podgląd rekordu: zawsze w postaci dict z parse_line (niezależnie od as_record)."""
+    return repr(rec.to_dict() if isinstance(rec, LogRecord) else rec)
+
+
+def select_parse(
+    reader: str, encoding: str, as_record: bool = False, with_time: bool = True,
+    timings: Optional[StageTimings] = None,
+) -> Callable[..., Optional[dict]]:
+    """Funkcja parsująca dla linii danego readera: str (parse_line) albo bytes (mmap)."""
+    if timings is not None:
+        return partial(
+            parse_line_timed, timings=timings, encoding=encoding, as_record=as_record, with_time=with_time
+        )
+    if reader == "mmap":
+        return partial(parse_line_bytes, encoding=encoding, as_record=as_record, with_time=with_time)
+    if as_record or not with_time:
+        return partial(parse_line, as_record=as_record, with_time=with_time)
+    return parse_line
+
+
+def needs_time(
+    aggregator: Optional[Aggregator], time_range: Optional[TimeRange], sink: Optional[Callable], preview_cap: int
+) -> bool:
+    """Czas rekordu potrzebny jest do kubełków, filtra czasu, zapisu (sink) i podglądu rekordów."""
+    return (
+        aggregator is None or aggregator.time_bucket != "none"
+        or time_range is not None or sink is not None or preview_cap > 0
+    )
+
+
+def resolve_byte_range(path: Path, time_range: Optional[TimeRange], byte_range: Optional[ByteRange]) -> ByteRange:
+    """Zakres bajtów pliku do przeczytania: jawny, z indeksu czasu albo cały plik."""
+    if byte_range is not None:
+        return byte_range
+    if time_range is not None:
+        return byte_range_for(path, *time_range)
+    return 0, None
+
+
+def _record_epoch(rec: dict | LogRecord) -> int:
+    if isinstance(rec, LogRecord):
+        return rec.epoch
+    return int(rec["ts"].timestamp())
+
+
+def process_lines(
+    lines: Iterable[Line],
+    fail_policy: str = "skip",
+    preview_cap: int = 0,
+    quiet: bool = False,
+    emit: Optional[Callable[[Event], None]] = None,
+    parse: Callable[..., Optional[dict]] = parse_line,
+    aggregator: Optional[Aggregator] = None,
+    time_range: Optional[TimeRange] = None,
+    sink: Optional[Callable[[dict | LogRecord], None]] = None,
+    line_filter: Optional[LineFilter] = None,
+    timings: Optional[StageTimings] = None,
+    error_samples: int = ERROR_SAMPLES_DEFAULT,
+) -> ChunkResult:
+    """
+    Parsuje linie i zlicza wyniki.
+
+    Parametry:
+    ----------
+    lines : Iterable[str | bytes]
+        Linie wejścia (np. z `read_log_lines`, `read_line_range` albo bajty z `read_log_lines_mmap`).
+    fail_policy : {"skip", "strict"}
+        Przy "strict" pierwszy błąd kończy przetwarzanie (zdarzenie "fatal"); przy "skip" błędne
+        linie są liczone wg przyczyny (`bad_reasons`), a pierwsze `error_samples` trafiają do
+        `bad_samples`. `parse` wołana jest zawsze z fail_policy="strict" - bez ostrzeżenia
+        loggera na każdą błędną linię.
+    preview_cap : int
+        Ile pierwszych linii / rekordów zgłosić jako zdarzenia podglądu (0 = brak).
+    quiet : bool
+        Tryb cichy: bez zdarzeń podglądu.
+    emit : callable, opcjonalnie
+        Odbiorca zdarzeń; domyślnie zdarzenia trafiają do `ChunkResult.events`.
+    parse : callable
+        Funkcja parsująca `parse(line, fail_policy="strict")` (wyjątek = błędna linia);
+        dla bajtów `parser.parse_line_bytes`.
+    aggregator : Aggregator, opcjonalnie
+        Każdy poprawny rekord trafia do `aggregator.add`; agregator zwracany w `ChunkResult.aggregator`.
+    time_range : (since, until), opcjonalnie
+        Rekordy z czasem poza [since, until) liczone są jako `filtered` (nie ok) i pomijane.
+    sink : callable, opcjonalnie
+        Dostaje każdy poprawny rekord (po filtrach), np. `SqliteSink.add` (--sqlite).
+    line_filter : filters.LineFilter, opcjonalnie
+        Linie, które na pewno nie spełniają filtra (`may_match` na surowej linii), nie są
+        parsowane; pozostałe po parsowaniu sprawdza `matches`. Odrzucone liczone są jako `filtered`.
+    timings : profiling.StageTimings, opcjonalnie
+        Czas `aggregator.add` (etap "aggregate"); zwracany w `ChunkResult.timings`. Czasy odczytu
+        i parsowania mierzą reader i `parse` (select_parse z tym samym `timings`).
+    error_samples : int
+        Limit próbki błędnych linii fragmentu (0 = tylko liczniki).
+    """
+    result = ChunkResult(aggregator=aggregator, timings=timings)
+    if emit is None:
+        emit = result.events.append
+
+    show_preview = not quiet and preview_cap > 0
+    since, until = time_range if time_range is not None else (None, None)
+    check_time = since is not None or until is not None
+    if not line_filter:
+        line_filter = None
+    may_match = None if line_filter is None else line_filter.may_match
+    add = None if aggregator is None else aggregator.add
+    if add is not None and timings is not None:
+        add = timings.wrap("aggregate", add)
+
+    for line in lines:
+        result.lines += 1
+
+        if show_preview and result.lines <= preview_cap:
+            emit(("line", result.lines, _preview_text(line)))
+
+        if may_match is not None and not may_match(line):
+            result.filtered += 1
+            continue
+
+        try:
+            rec = parse(line, fail_policy="strict")
+        except Exception as e:
+            result.bad += 1
+            count_reason(result.bad_reasons, error_reason(e))
+            if fail_policy == "strict":
+                emit(("fatal", result.lines, str(e)))
+                result.failed = True
+                break
+            if len(result.bad_samples) < error_samples:
+                result.bad_samples.append((result.lines, str(e), _preview_text(line)))
+            continue
+
+        if rec is None:  # własna funkcja `parse` może zwrócić None zamiast wyjątku
+            result.bad += 1
+            count_reason(result.bad_reasons, "other")
+            continue
+
+        if check_time:
+            epoch = _record_epoch(rec)
+            if (since is not None and epoch < since) or (until is not None and epoch >= until):
+                result.filtered += 1
+                continue
+
+        if line_filter is not None and not line_filter.matches(rec):
+            result.filtered += 1
+            continue
+
+        result.ok += 1
+        if add is not None:
+            add(rec)
+        if sink is not None:
+            sink(rec)
+        if show_preview and result.ok <= preview_cap:
+            # !r → używa repr(rec) (techniczny, „debugowy” zapis obiektu)
+            emit(("parsed", result.ok, _preview_record(rec)))
+
+    return result
+
+
+def _process_cached(
+    path: Path, cache: ParseCache, encoding: str, aggregator: Aggregator, time_range: Optional[TimeRange],
+    line_filter: Optional[LineFilter] = None,
+    timings: Optional[StageTimings] = None,
+    error_samples: int = ERROR_SAMPLES_DEFAULT,
+) -> ChunkResult:
+    """
+    Agregacja z kolumn wpisu --cache-dir (przy braku wpisu: parse_batch całego pliku i zapis).
+    Przyczyny i próbka błędnych linii pochodzą z wpisu (próbka maks. parse_cache.CACHED_ERROR_SAMPLES).
+    Z `timings`: wczytanie / budowa wpisu i partie kolumn jako "read", add_batch jako "aggregate".
+    """
+    load, add_batch = cache.load, aggregator.add_batch
+    if timings is not None:
+        load, add_batch = timings.wrap("read", load), timings.wrap("aggregate", add_batch)
+    cached = load(path, encoding)
+    if cached is None:
+        cached = (cache.build if timings is None else timings.wrap("read", cache.build))(path, encoding)
+    try:  # mapa wpisu zamykana także po wyjątku z filtra / agregatora
+        result = ChunkResult(lines=cached.rows, bad=cached.bad_count, fallback_lines=cached.fallback_lines,
+                             aggregator=aggregator, timings=timings, bad_reasons=dict(cached.bad_reasons),
+                             bad_samples=cached.bad_samples[:error_samples])
+        since, until = time_range if time_range is not None else (None, None)
+        batches = cached.batches() if timings is None else timings.wrap_iter("read", cached.batches())
+        for batch in batches:
+            if since is not None or until is not None or line_filter:
+                result.filtered += _mark_filtered(batch, since, until, line_filter)
+            add_batch(batch)
+    finally:
+        cached.close()
+    result.ok = result.lines - result.bad - result.filtered
+    return result
+
+
+def _mark_filtered(
+    batch: ColumnBatch, since: Optional[int], until: Optional[int], line_filter: Optional[LineFilter] = None
+) -> int:
+    """
+    Oznacza w (skopiowanej) bitmapie `bad` poprawne wiersze spoza [since, until) albo
+    niespełniające `line_filter`; zwraca ich liczbę.
+    """
+    bad = bytearray(batch.bad)
+    low = since if since is not None else -(2**63)
+    high = until if until is not None else 2**63
+    match = line_filter.row_matcher(batch) if line_filter else None
+    marked = 0
+    for row, ts in enumerate(batch.ts):
+        bit = 1 << (row & 7)
+        if bad[row >> 3] & bit:
+            continue
+        if not low <= ts < high or (match is not None and not match(row)):
+            bad[row >> 3] |= bit
+            marked += 1
+    batch.bad = bad
+    return marked
+
+
+def process_file(
+    path: Path,
+    encoding: str = "utf-8",
+    limit: Optional[int] = None,
+    reader: str = "text",
+    fail_policy: str = "skip",
+    preview_cap: int = 0,
+    quiet: bool = False,
+    emit: Optional[Callable[[Event], None]] = None,
+    aggregator_factory: Optional[Callable[[], Aggregator]] = None,
+    time_range: Optional[TimeRange] = None,
+    byte_range: Optional[ByteRange] = None,
+    cache: Optional[ParseCache] = None,
+    sink: Optional[Callable[[dict | LogRecord], None]] = None,
+    line_filter: Optional[LineFilter] = None,
+    stage_timings: bool = False,
+    error_samples: int = ERROR_SAMPLES_DEFAULT,
+    read_size: int = STREAM_READ_BYTES,
+) -> ChunkResult:
+    """
+    Przetwarza cały plik: `read_log_lines` (albo `read_log_lines_mmap` dla reader="mmap")
+    -> `process_lines`. Pliki skompresowane zawsze czytane są strumieniowo.
+    Pozostałe parametry jak w `process_lines`; `limit` jak w `read_log_lines`.
+    Z `aggregator_factory` rekordy parsowane są jako LogRecord i agregowane.
+    Z `time_range` plik nieskompresowany czytany jest od offsetu z indeksu czasu / bisekcji;
+    `byte_range` ma pierwszeństwo (rekordy i tak są filtrowane wg `time_range`).
+    `cache` działa dla agregacji całego pliku (bez limit / byte_range / podglądu, fail_policy="skip");
+    wtedy błędne linie są tylko liczone - bez zdarzeń "skip". `sink` (jak w `process_lines`)
+    wyłącza `cache` - rekordy muszą powstać z parsowania. `line_filter` jak w `process_lines`
+    (z `cache` - na kolumnach wpisu). Gdy czas rekordu nie jest potrzebny (`needs_time`),
+    linie parsowane są bez timestampu. `stage_timings=True` mierzy etapy (profiling.StageTimings
+    w `ChunkResult.timings`); domyślnie żaden etap nie woła zegara. `error_samples` jak
+    w `process_lines` (z `cache` - przyczyny i próbka zapisane we wpisie). Wejście strumieniowe
+    ("-" = stdin, potok; `read_size` - porcja odczytu) nie ma rozmiaru ani seek: czytane jest
+    readerem "text" w całości (filtr czasu tylko na rekordach), bez `cache`.
+    """
+    stats = ReadStats()
+    timings = None
+    if stage_timings:
+        from .profiling import StageTimings
+
+        timings = StageTimings()
+    aggregator = None if aggregator_factory is None else aggregator_factory()
+    streamed = is_stream_input(path)
+    if (cache is not None and aggregator is not None and sink is None and not limit and byte_range is None
+            and preview_cap == 0 and fail_policy == "skip" and not streamed):
+        return _process_cached(path, cache, encoding, aggregator, time_range, line_filter, timings, error_samples)
+    start, end = (0, None) if streamed and byte_range is None else resolve_byte_range(path, time_range, byte_range)
+    if reader == "mmap" and not streamed and detect_compression(path) is None:
+        lines: Iterable[Line] = read_log_lines_mmap(path, limit=limit, start=start, end=end)
+        if timings is not None:
+            lines = timings.wrap_iter("read", lines)
+    else:
+        reader = "text"
+        lines = read_log_lines(
+            path, encoding=encoding, limit=limit, stats=stats, start=start, end=end, timings=timings,
+            read_size=read_size,
+        )
+
+    result = process_lines(
+        lines, fail_policy=fail_policy, preview_cap=preview_cap, quiet=quiet, emit=emit,
+        parse=select_parse(
+            reader, encoding, as_record=aggregator is not None,
+            with_time=needs_time(aggregator, time_range, sink, preview_cap), timings=timings,
+        ),
+        aggregator=aggregator, time_range=time_range, sink=sink, line_filter=line_filter, timings=timings,
+        error_samples=error_samples,
+    )
+    result.fallback_lines = stats.fallback_lines
+    return result
@@ -0,0 +1,237 @@
+"""
+Module: profiling.py
+Cel: Liczniki i czasy etapów przetwarzania (--stats-json) oraz profil cProfile/tracemalloc (--profile).
+Public API:
+  - STAGES: etapy w kolejności przepływu danych:
+      read      - odczyt surowej linii (plik / dekompresja / mmap),
+      decode    - dekodowanie bajtów na tekst (read_log_lines; pola w parse_line_bytes),
+      match     - podział linii na pola: szybka ścieżka parsera (podział razem z walidacją pól
+                  i timestampu) albo duży regex,
+      validate  - walidacja i normalizacja pól po regexie, z timestampem (parser._build_record),
+      aggregate - Aggregator.add / add_batch,
+      report    - stdout i pliki raportu (--format).
+  - class StageTimings
+      Czasy [ns] i liczby wywołań na etap. Picklowalne (wraca z procesów --workers), scalane przez merge.
+      wrap(stage, func) / wrap_iter(stage, iterable) - wersje mierzone czasu wywołania / next().
+  - def peak_rss_mb(children=False) -> float | None
+  - def build_stats(...) -> dict / write_stats_json(path, stats)    (dokument --stats-json)
+  - class RunProfiler(outdir)
+      start() / stop() / dump(stats) -> [profile.pstats, profile.txt] - cProfile + tracemalloc
+      procesu głównego (procesy --workers nie są profilowane).
+Koszt: przy wyłączonych statystykach żadna pętla nie woła zegara - readery, parser i pipeline
+dostają `timings=None` i wykonują dotychczasowy kod. Włączone czasy kosztują kilka wywołań
+time.perf_counter_ns na linię (przebieg ok. 20-30% dłuższy; --profile wielokrotnie więcej). Etapy z wątków (scheduler plików) i procesów
+(--workers) sumują się, więc suma etapów może przekroczyć czas całkowity (`wall_seconds`).
+"""
+from __future__ import annotations
+
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Final, Iterable, Iterator, Optional, TypeVar
+
+from .errors import sorted_reasons
+
+STAGES: Final[tuple[str, ...]] = ("read", "decode", "match", "validate", "aggregate", "report")
+STATS_VERSION: Final[int] = 2  # 2: bez etapu "timestamp" (liczony w match / validate)
+PROFILE_TOP_FUNCTIONS: Final[int] = 30
+PROFILE_TOP_ALLOCATIONS: Final[int] = 20
+
+T = TypeVar("T")
+
+
+class StageTimings:
+    """Czasy i wywołania etapów (patrz STAGES) jednego fragmentu wejścia."""
+
+    __slots__ = ("ns", "calls")
+
+    def __init__(self) -> None:
+        self.ns: dict[str, int] = dict.fromkeys(STAGES, 0)
+        self.calls: dict[str, int] = dict.fromkeys(STAGES, 0)
+
+    def add(self, stage: str, ns: int, calls: int = 1) -> None:
+        self.ns[stage] += ns
+        self.calls[stage] += calls
+
+    def merge(self, other: StageTimings) -> None:
+        for stage in STAGES:
+            self.ns[stage] += other.ns[stage]
+            self.calls[stage] += other.calls[stage]
+
+    def wrap(self, stage: str, func: Callable[..., T]) -> Callable[..., T]:
+        """`func` z czasem każdego wywołania doliczanym do etapu `stage`."""
+        ns, calls, clock = self.ns, self.calls, time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            started = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                ns[stage] += clock() - started
+                calls[stage] += 1
+
+        return timed
+
+    def wrap_iter(self, stage: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Elementy `iterable` z czasem każdego next() doliczanym do etapu `stage`."""
+        clock = time.perf_counter_ns
+        iterator = iter(iterable)
+        spent = count = 0
+        try:
+            while True:
+                started = clock()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    spent += clock() - started
+                    return
+                spent += clock() - started
+                count += 1
+                yield item
+        finally:
+            self.add(stage, spent, count)
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    def to_dict(self, wall_seconds: Optional[float] = None) -> dict:
+        """Etap -> {seconds, calls[, share]} (share = ułamek `wall_seconds`)."""
+        stages = {}
+        for stage in STAGES:
+            seconds = self.ns[stage] / 1e9
+            entry = {"seconds": round(seconds, 6), "calls": self.calls[stage]}
+            if wall_seconds:
+                entry["share"] = round(seconds / wall_seconds, 4)
+            stages[stage] = entry
+        return stages
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """Szczyt RSS procesu (children=True: zakończonych procesów potomnych) [MB]; None bez `resource`."""
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    scale = 1024**2 if sys.platform == "darwin" else 1024  # macOS: bajty, Linux: KiB
+    return round(usage.ru_maxrss / scale, 1)
+
+
+def build_stats(
+    inputs: list[Path],
+    lines: int,
+    ok: int,
+    bad: int,
+    filtered: int,
+    fallback_lines: int,
+    wall_seconds: float,
+    timings: StageTimings,
+    bad_reasons: dict[str, int],
+    tracemalloc_peak: Optional[int] = None,
+) -> dict:
+    """Dokument --stats-json (stała struktura - do zbierania przez dashboardy); przyczyny jak w errors.py."""
+    input_bytes = 0
+    for path in inputs:
+        try:
+            input_bytes += path.stat().st_size
+        except OSError:
+            pass
+    wall = max(wall_seconds, 1e-9)
+    reasons = sorted_reasons(bad_reasons)
+    unclassified = bad - sum(reasons.values())
+    if unclassified > 0:  # np. błędne linie policzone przy budowie wpisu --cache-dir
+        reasons["unclassified"] = unclassified
+    stats = {
+        "version": STATS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "inputs": [str(path) for path in inputs],
+        "input_bytes": input_bytes,
+        "lines": lines,
+        "ok": ok,
+        "bad": bad,
+        "filtered": filtered,
+        "fallback_lines": fallback_lines,
+        "wall_seconds": round(wall_seconds, 6),
+        "lines_per_s": round(lines / wall, 1),
+        "bytes_per_s": round(input_bytes / wall, 1),
+        "bad_reasons": reasons,
+        "stages": timings.to_dict(wall_seconds),
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_children_mb": peak_rss_mb(children=True),
+    }
+    if tracemalloc_peak is not None:
+        stats["tracemalloc_peak_mb"] = round(tracemalloc_peak / 1024**2, 1)
+    return stats
+
+
+def write_stats_json(path: Path, stats: dict) -> None:
+    """Zapis atomowy (reporter.atomic_writer) - scraper nie zobaczy pliku w połowie."""
+    from .reporter import atomic_writer
+
+    with atomic_writer(path) as out:
+        json.dump(stats, out, ensure_ascii=False, indent=2)
+        out.write("\n")
+
+
+class RunProfiler:
+    """cProfile + tracemalloc dla przebiegu CLI (--profile); wyniki w `outdir`."""
+
+    def __init__(self, outdir: Path):
+        import cProfile
+
+        self.outdir = outdir
+        self.profile = cProfile.Profile()
+        self.snapshot = None
+        self.traced_peak: Optional[int] = None
+
+    def start(self) -> None:
+        import tracemalloc
+
+        tracemalloc.start()
+        self.profile.enable()
+
+    def stop(self) -> None:
+        import tracemalloc
+
+        self.profile.disable()
+        if tracemalloc.is_tracing():
+            self.snapshot = tracemalloc.take_snapshot()
+            self.traced_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def dump(self, stats: Optional[dict] = None) -> list[Path]:
+        """profile.pstats (dla pstats / snakeviz) i profile.txt (etapy, top funkcji i alokacji)."""
+        import io
+        import pstats
+
+        from .reporter import atomic_writer
+
+        self.outdir.mkdir(parents=True, exist_ok=True)
+        pstats_path = self.outdir / "profile.pstats"
+        text_path = self.outdir / "profile.txt"
+        self.profile.dump_stats(pstats_path)
+
+        with atomic_writer(text_path) as out:
+            if stats is not None:
+                out.write(f"Czas: {stats['wall_seconds']:.3f} s, {stats['lines_per_s']:,.0f} linii/s, "
+                          f"{stats['bytes_per_s'] / 1e6:,.1f} MB/s\n")
+                out.write("Etapy (suma z wątków / procesów):\n")
+                for stage, entry in stats["stages"].items():
+                    out.write(f"  {stage:<10} {entry['seconds']:>10.3f} s  {entry.get('share', 0):>6.1%}"
+                              f"  wywołań {entry['calls']}\n")
+                if stats["bad_reasons"]:
+                    reasons = ", ".join(f"{reason}={count}" for reason, count in stats["bad_reasons"].items())
+                    out.write(f"Błędne linie wg przyczyny: {reasons}\n")
+            if self.traced_peak is not None:
+                out.write(f"Szczyt pamięci (tracemalloc): {self.traced_peak / 1024**2:.1f} MB\n")
+            out.write(f"\nTop {PROFILE_TOP_FUNCTIONS} funkcji (cProfile, czas łączny):\n")
+            buffer = io.StringIO()
+            pstats.Stats(self.profile, stream=buffer).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+            out.write(buffer.getvalue())
+            if self.snapshot is not None:
+                out.write(f"Top {PROFILE_TOP_ALLOCATIONS} miejsc alokacji (tracemalloc, stan na koniec):\n")
+                for stat in self.snapshot.statistics("lineno")[:PROFILE_TOP_ALLOCATIONS]:
+                    out.write(f"  {stat}\n")
+        return [pstats_path, text_path]
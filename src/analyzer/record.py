@@ -0,0 +1,102 @@
+"""
+Module: record.py
+Cel: Zwarty rekord sparsowanej linii (LogRecord) zamiast 11-kluczowego dict na każdą linię.
+Public API:
+  - class LogRecord
+      Te same pola co dict z parser.parse_line, ale w __slots__ (bez __dict__ na instancję):
+        remote_host, identd, user, epoch, method, path, protocol, status, size, referrer, user_agent
+      - `epoch`  : int - czas UTC w sekundach od 1970-01-01 (tak przechowywany),
+      - `ts`     : datetime (UTC) tworzony leniwie przy odczycie, z `epoch`.
+      Dostęp jak do słownika działa dalej (Mapping): rec["ts"], rec.get("size"), "path" in rec,
+      dict(rec), rec.to_dict(); porównanie z dict z parse_line daje True przy tych samych polach.
+  - RECORD_FIELDS: klucze w kolejności dict z parse_line.
+Tworzenie: parser.parse_line(..., as_record=True) / parser.parse_line_bytes(..., as_record=True).
+Pamięć: zob. benchmarks/bench_record_memory.py (dict + datetime vs LogRecord + int).
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Final, Iterator
+
+RECORD_FIELDS: Final[tuple[str, ...]] = (
+    "remote_host", "identd", "user", "ts", "method", "path",
+    "protocol", "status", "size", "referrer", "user_agent",
+)
+
+_EPOCH: Final[datetime] = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@lru_cache(maxsize=4096)
+def _utc_from_epoch(epoch: int) -> datetime:
+    """Epoch seconds -> UTC datetime (memoized: kolejne linie logu mają zwykle ten sam czas)."""
+    return _EPOCH + timedelta(seconds=epoch)
+
+
+class LogRecord(Mapping):
+    """
+    Rekord jednej linii Apache Combined; `__slots__`, więc ~1/3 pamięci dict z parse_line.
+
+    Pola są zwykłymi atrybutami (rec.path, rec.status, ...); `rec.ts` / `rec["ts"]`
+    zwraca datetime UTC liczony z `rec.epoch`. Instancje traktuj jako niezmienne.
+    """
+
+    __slots__ = (
+        "remote_host", "identd", "user", "epoch", "method", "path",
+        "protocol", "status", "size", "referrer", "user_agent",
+    )
+
+    def __init__(
+        self,
+        remote_host: str,
+        identd: str | None,
+        user: str | None,
+        epoch: int,
+        method: str,
+        path: str,
+        protocol: str | None,
+        status: int,
+        size: int | None,
+        referrer: str | None,
+        user_agent: str | None,
+    ) -> None:
+        self.remote_host = remote_host
+        self.identd = identd
+        self.user = user
+        self.epoch = epoch
+        self.method = method
+        self.path = path
+        self.protocol = protocol
+        self.status = status
+        self.size = size
+        self.referrer = referrer
+        self.user_agent = user_agent
+
+    @property
+    def ts(self) -> datetime:
+        """Czas żądania jako tz-aware datetime (UTC), tworzony leniwie."""
+        return _utc_from_epoch(self.epoch)
+
+    # --- Mapping: zgodność z dict zwracanym przez parse_line ---
+    def __getitem__(self, key: str) -> Any:
+        if key not in RECORD_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(RECORD_FIELDS)
+
+    def __len__(self) -> int:
+        return len(RECORD_FIELDS)
+
+    def to_dict(self) -> dict:
+        """Ten sam dict, który zwraca parse_line (z `ts` jako datetime)."""
+        return {key: getattr(self, key) for key in RECORD_FIELDS}
+
+    def __reduce__(self):
+        # Krotka pól zamiast domyślnego stanu slotów: mniejszy pickle (wyniki z procesów roboczych)
+        return (LogRecord, tuple(getattr(self, name) for name in LogRecord.__slots__))
+
+    def __repr__(self) -> str:
+        return f"LogRecord({self.to_dict()!r})"
@@ -0,0 +1,224 @@
+"""
+Module: reporter.py
+Cel: Raporty TXT/CSV/JSON ze stanu Aggregatora zapisywane strumieniowo i atomowo (--format, --outdir).
+Public API:
+  - def write_report(aggregator, outdir, fmt="txt", top=10, compress=False) -> list[Path]
+      Zapisuje raport(y) do `outdir` (tworzony w razie potrzeby) i zwraca ścieżki plików:
+        txt  -> report.txt          (jak podsumowanie na stdout),
+        csv  -> report.csv          (section,key,metric,value: top listy, statusy, metody, sumy)
+                report_buckets.csv  (jeden wiersz na kubełek czasu: żądania, unikalne, rozmiary),
+        json -> report.json         (jak Aggregator.summary(top)).
+      compress=True: pliki gzip z rozszerzeniem .gz.
+  - def render_txt(aggregator, top, out) / render_csv(aggregator, top, out)
+    def render_buckets_csv(aggregator, out) / render_json(aggregator, top, out)
+      Renderują do dowolnego strumienia tekstowego (np. sys.stdout).
+  - def atomic_writer(path, compress=False) -> ContextManager[TextIO]
+      Plik tymczasowy w katalogu docelowym, fsync i os.replace dopiero po udanym zapisie;
+      po błędzie plik tymczasowy jest usuwany, a poprzedni raport zostaje nietknięty.
+Wiersze powstają z generatorów (Aggregator.iter_histogram, summary(lazy=True)) i trafiają prosto
+do bufora pliku - żadna sekcja nie jest składana w liście ani w jednym napisie, więc raport per
+kubełek czasu z milionami wierszy nie zwiększa zużycia pamięci ponad stan samego agregatora.
+"""
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Final, Iterator, TextIO
+
+from .aggregator import TOP_FIELDS, Aggregator, quantile_label
+
+REPORT_FORMATS: Final[tuple[str, ...]] = ("txt", "csv", "json")
+REPORT_STEM: Final[str] = "report"
+WRITE_BUFFER_BYTES: Final[int] = 1024 * 1024
+GZIP_LEVEL: Final[int] = 6  # 9 jest kilka razy wolniejszy przy niewiele lepszej kompresji tekstu
+
+_TOP_TITLES: Final[dict[str, str]] = {
+    "remote_host": "adresów IP", "path": "ścieżek", "referrer": "referrerów", "user_agent": "user agentów",
+}
+_TOP_SECTIONS: Final[dict[str, str]] = {
+    "remote_host": "top_ips", "path": "top_paths", "referrer": "top_referrers", "user_agent": "top_user_agents",
+}
+
+
+@contextmanager
+def atomic_writer(path: Path, compress: bool = False) -> Iterator[TextIO]:
+    """Strumień tekstowy (UTF-8, newline='') do `path`; plik pojawia się dopiero po udanym zapisie."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb", buffering=WRITE_BUFFER_BYTES) as raw:
+            stream = (
+                gzip.GzipFile(filename=path.name, mode="wb", fileobj=raw, compresslevel=GZIP_LEVEL, mtime=0)
+                if compress else raw
+            )
+            out = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+            yield out
+            out.flush()
+            out.detach()  # bez zamykania `raw` - potrzebny jeszcze do fsync
+            if compress:
+                stream.close()  # stopka gzip; nie zamyka `raw`
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp, path)
+    finally:
+        try:
+            tmp.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def report_paths(outdir: Path, fmt: str, compress: bool = False) -> list[Path]:
+    """Pliki, które write_report zapisze dla formatu `fmt`."""
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Nieznany format raportu: {fmt!r} (dozwolone: {', '.join(REPORT_FORMATS)})")
+    suffix = ".gz" if compress else ""
+    names = [f"{REPORT_STEM}.{fmt}"]
+    if fmt == "csv":
+        names.append(f"{REPORT_STEM}_buckets.csv")
+    return [outdir / (name + suffix) for name in names]
+
+
+def write_report(aggregator: Aggregator, outdir: Path, fmt: str = "txt", top: int = 10, compress: bool = False) -> list[Path]:
+    """Zapisuje raport w formacie `fmt` (patrz opis modułu); zwraca ścieżki zapisanych plików."""
+    paths = report_paths(outdir, fmt, compress)
+    renderers = {
+        "txt": [lambda out: render_txt(aggregator, top, out)],
+        "csv": [lambda out: render_csv(aggregator, top, out), lambda out: render_buckets_csv(aggregator, out)],
+        "json": [lambda out: render_json(aggregator, top, out)],
+    }[fmt]
+    for path, render in zip(paths, renderers):
+        with atomic_writer(path, compress) as out:
+            render(out)
+    return paths
+
+
+# ===== TXT =====
+def _approx_note(aggregator: Aggregator, field: str) -> str:
+    """Dopisek do tytułu listy top w trybie approx: o ile liczby mogą być zawyżone."""
+    if aggregator.top_mode != "approx":
+        return ""
+    return f" (przybliżone, zawyżenie <= {aggregator.top_error(field)})"
+
+
+def render_txt(aggregator: Aggregator, top: int, out: TextIO) -> None:
+    """Listy top, statusy, metody, histogram, unikalne i kwantyle rozmiaru - jak na stdout."""
+    write = out.write
+
+    def section(title: str, rows) -> None:
+        write(title + "\n")
+        for key, count in rows:
+            write(f"  {key}  {count}\n")
+
+    for field in TOP_FIELDS:
+        section(f"Top {top} {_TOP_TITLES[field]}{_approx_note(aggregator, field)}:", aggregator.top(field, top))
+    section("Klasy statusów:", aggregator.status_classes().items())
+    section("Metody HTTP:", aggregator.method_counts())
+    section(f"Histogram czasu ({aggregator.time_bucket}, UTC):", aggregator.iter_histogram())
+    for field in aggregator.uniques:
+        error = aggregator.unique_relative_error()
+        write(f"Unikalne {field} (HyperLogLog, błąd ~{error:.1%}):\n")
+        write(f"  łącznie  {aggregator.unique_total(field)}\n")
+        for label, count in aggregator.iter_unique_per_bucket(field):
+            write(f"  {label}  {count}\n")
+    if aggregator.size_quantiles:
+        _render_size_quantiles(aggregator, top, write)
+
+
+def _render_size_quantiles(aggregator: Aggregator, top: int, write) -> None:
+    """Kwantyle rozmiaru odpowiedzi: całość, klasy statusów, top ścieżki, kubełki czasu."""
+    labels = [quantile_label(q) for q in aggregator.size_quantiles]
+
+    def row(label: object, stats: dict) -> None:
+        values = " ".join(f"{name}={stats[name]}" for name in labels)
+        write(f"  {label}  n={stats['count']} brak={stats['missing']} {values}\n")
+
+    write("Rozmiar odpowiedzi [B] (DDSketch, błąd względny <= 1%; brak = size '-'):\n")
+    row("wszystkie", aggregator.size_stats("all"))
+    for group in aggregator.size_groups("status"):
+        row(group, aggregator.size_stats("status", group))
+    write(f"Rozmiar odpowiedzi wg ścieżki (top {top}):\n")
+    for path, _ in aggregator.top_paths(top):
+        row(path, aggregator.size_stats("path", path))
+    write(f"Rozmiar odpowiedzi wg czasu ({aggregator.time_bucket}, UTC):\n")
+    for start in aggregator.size_groups("bucket"):
+        row(aggregator.bucket_label(start), aggregator.size_stats("bucket", start))
+
+
+# ===== CSV =====
+def render_csv(aggregator: Aggregator, top: int, out: TextIO) -> None:
+    """Format długi: section,key,metric,value (dane per kubełek czasu: render_buckets_csv)."""
+    writerow = csv.writer(out, lineterminator="\n").writerow
+    writerow(("section", "key", "metric", "value"))
+    writerow(("requests", "", "count", aggregator.requests))
+    for field in TOP_FIELDS:
+        for key, count in aggregator.top(field, top):
+            writerow((_TOP_SECTIONS[field], key, "count", count))
+    if aggregator.top_mode == "approx":
+        for field in TOP_FIELDS:
+            writerow(("top_max_error", field, "count", aggregator.top_error(field)))
+    for cls, count in aggregator.status_classes().items():
+        writerow(("status_classes", cls, "count", count))
+    for method, count in aggregator.method_counts():
+        writerow(("methods", method, "count", count))
+    for field in aggregator.uniques:
+        writerow(("unique", field, "total", aggregator.unique_total(field)))
+    if aggregator.size_quantiles:
+        groups = [("size_all", "", aggregator.size_stats("all"))]
+        groups += [("size_status", g, aggregator.size_stats("status", g)) for g in aggregator.size_groups("status")]
+        groups += [("size_path", p, aggregator.size_stats("path", p)) for p, _ in aggregator.top_paths(top)]
+        for section, key, stats in groups:
+            for metric, value in stats.items():
+                writerow((section, key, metric, "" if value is None else value))
+
+
+def render_buckets_csv(aggregator: Aggregator, out: TextIO) -> None:
+    """Jeden wiersz na kubełek czasu: bucket,requests[,unique_<pole>...][,size_count,size_missing,size_p50...]."""
+    writerow = csv.writer(out, lineterminator="\n").writerow
+    fields = list(aggregator.uniques)
+    labels = [quantile_label(q) for q in aggregator.size_quantiles]
+    header = ["bucket", "requests", *(f"unique_{field}" for field in fields)]
+    if labels:
+        header += ["size_count", "size_missing", *(f"size_{label}" for label in labels)]
+    writerow(header)
+    buckets = aggregator.buckets
+    uniques = [aggregator.uniques[field] for field in fields]
+    for start in sorted(buckets):
+        row = [aggregator.bucket_label(start), buckets[start]]
+        for per_bucket in uniques:
+            hll = per_bucket.get(start)
+            row.append(0 if hll is None else hll.estimate())
+        if labels:
+            stats = aggregator.size_stats("bucket", start)
+            row += [stats["count"], stats["missing"], *("" if stats[label] is None else stats[label] for label in labels)]
+        writerow(row)
+
+
+# ===== JSON =====
+def render_json(aggregator: Aggregator, top: int, out: TextIO) -> None:
+    """Aggregator.summary(top) jako JSON; listy per kubełek zapisywane element po elemencie."""
+    _dump(aggregator.summary(top, lazy=True), out.write)
+    out.write("\n")
+
+
+def _dump(value: object, write) -> None:
+    """json.dump z obsługą iteratorów (tablica pisana po jednym elemencie - wierszu - na linię)."""
+    if isinstance(value, dict):
+        write("{")
+        for i, (key, item) in enumerate(value.items()):
+            write(f'{", " if i else ""}{json.dumps(str(key), ensure_ascii=False)}: ')
+            _dump(item, write)
+        write("}")
+    elif isinstance(value, Iterator):
+        dumps = json.JSONEncoder(ensure_ascii=False).encode
+        write("[")
+        for i, item in enumerate(value):
+            write(",\n" if i else "\n")
+            write(dumps(item))
+        write("]")
+    else:
+        write(json.dumps(value, ensure_ascii=False))
@@ -0,0 +1,76 @@
+"""
+Module: scheduler.py
+Cel: Przetwarzanie wielu plików wejścia (--input z globem / katalogiem) z ograniczoną współbieżnością.
+Public API:
+  - def process_files(paths, max_open_files=4, limit=None, **opcje) -> Iterator[ChunkResult]
+Zasada działania:
+  - każdy plik przechodzi przez pipeline.process_file (read_log_lines -> parse_line),
+  - pliki są zlecane od NAJWIĘKSZEGO, żeby duży plik nie został na końcu sam (długi ogon),
+  - naraz otwartych jest co najwyżej `max_open_files` plików (rozmiar puli wątków),
+  - wyniki zwracane są w kolejności `paths`, więc CLI scala je deterministycznie.
+Wątki dają współbieżność odczytu i dekompresji (zwalniają GIL); równoległość parsowania
+zapewnia --workers (parallel.py).
+Limit (--limit) jest globalny: pliki czytane są wtedy po kolei, każdy z limitem równym
+pozostałej puli linii - wynik nie zależy od kolejności kończenia się wątków.
+"""
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from .pipeline import ChunkResult, process_file
+
+
+def _size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def process_files(
+    paths: list[Path],
+    max_open_files: int = 4,
+    limit: Optional[int] = None,
+    **options: Any,
+) -> Iterator[ChunkResult]:
+    """
+    Przetwarza pliki i zwraca po jednym ChunkResult na plik, w kolejności `paths`.
+
+    Parametry:
+    ----------
+    paths : list[Path]
+        Pliki wejścia (np. z `io_reader.expand_inputs`).
+    max_open_files : int
+        Maksymalna liczba plików przetwarzanych (otwartych) jednocześnie (>= 1).
+    limit : Optional[int]
+        Globalny limit linii dla wszystkich plików razem (None = bez limitu).
+    **options
+        Przekazywane do `pipeline.process_file` (encoding, reader, fail_policy, preview_cap, quiet,
+        aggregator_factory, time_range, byte_range, line_filter, stage_timings, error_samples).
+
+    Przerwanie iteracji (np. po wyniku z `failed=True`) anuluje pliki, które jeszcze nie wystartowały.
+    """
+    if max_open_files < 1:
+        raise ValueError(f"Parametr 'max_open_files' musi być >= 1, otrzymano: {max_open_files}")
+
+    if limit is not None and limit > 0:
+        remaining = limit
+        for path in paths:
+            result = process_file(path, limit=remaining, **options)
+            remaining -= result.lines
+            yield result
+            if result.failed or remaining <= 0:
+                return
+        return
+
+    pool = ThreadPoolExecutor(max_workers=max_open_files, thread_name_prefix="log-file")
+    try:
+        futures: dict[Path, Future] = {}
+        for path in sorted(paths, key=_size, reverse=True):
+            futures[path] = pool.submit(process_file, path, **options)
+        for path in paths:
+            yield futures[path].result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,183 @@
+"""
+Module: sqlite_sink.py
+Cel: Zapis sparsowanych rekordów do SQLite (--sqlite out.db) do zapytań ad-hoc w SQL.
+Public API:
+  - class SqliteSink(path, batch_rows=DEFAULT_BATCH_ROWS)
+      Menedżer kontekstu; add(rec) buforuje wiersz (LogRecord albo dict z parse_line),
+      close() dopisuje resztę, tworzy indeksy i przywraca bezpieczne ustawienia bazy.
+      rows - liczba zapisanych wierszy.
+Schemat:
+  - requests(id, remote_host, identd, user, ts [epoch UTC], method, path_id, protocol, status,
+             size, referrer, user_agent_id)
+  - paths(id, path UNIQUE), user_agents(id, user_agent UNIQUE) - tabele wymiarów: każdy napis raz.
+  - widok requests_v - requests z dołączonymi path / user_agent i czasem ISO 8601 (ts_utc).
+Wydajność ładowania:
+  - wiersze trafiają do executemany partiami `batch_rows` w jednej transakcji na partię
+    (sqlite3 przygotowuje zapytanie raz i trzyma je w cache instrukcji połączenia),
+  - journal_mode=WAL, synchronous=OFF i temp_store=MEMORY na czas ładowania (po close:
+    synchronous=NORMAL) - przerwanie procesu w trakcie ładowania może zgubić ostatnie partie,
+  - id wymiarów nadawane w Pythonie (dict napis -> id), bez zapytania do bazy na wiersz,
+  - indeksy tworzone dopiero po załadowaniu (jedno sortowanie zamiast aktualizacji na wiersz).
+Ponowny zapis do istniejącej bazy dopisuje wiersze (wymiary są wczytywane i współdzielone).
+Indeksy takiej bazy już istnieją, więc dopisywanie aktualizuje je wiersz po wierszu - wolniej niż
+pierwsze ładowanie, ale bez przebudowy indeksów całej (być może dużej) tabeli przy małym dopisku.
+Partia, której zapis się nie powiódł (ROLLBACK), jest odrzucana razem z nadanymi w niej id wymiarów:
+kolejne partie nie wskazują na wiersze paths / user_agents, których nie ma w bazie.
+"""
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Final, Optional
+
+from .record import LogRecord
+
+DEFAULT_BATCH_ROWS: Final[int] = 50_000
+
+_SCHEMA: Final[str] = """
+CREATE TABLE IF NOT EXISTS paths (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS user_agents (id INTEGER PRIMARY KEY, user_agent TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS requests (
+    id INTEGER PRIMARY KEY,
+    remote_host TEXT NOT NULL,
+    identd TEXT,
+    user TEXT,
+    ts INTEGER NOT NULL,
+    method TEXT NOT NULL,
+    path_id INTEGER NOT NULL REFERENCES paths(id),
+    protocol TEXT,
+    status INTEGER NOT NULL,
+    size INTEGER,
+    referrer TEXT,
+    user_agent_id INTEGER REFERENCES user_agents(id)
+);
+CREATE VIEW IF NOT EXISTS requests_v AS
+    SELECT r.id, r.remote_host, r.identd, r.user, r.ts, datetime(r.ts, 'unixepoch') AS ts_utc,
+           r.method, p.path, r.protocol, r.status, r.size, r.referrer, u.user_agent
+    FROM requests r JOIN paths p ON p.id = r.path_id LEFT JOIN user_agents u ON u.id = r.user_agent_id;
+"""
+_INDEXES: Final[tuple[str, ...]] = (
+    "CREATE INDEX IF NOT EXISTS requests_ts ON requests(ts)",
+    "CREATE INDEX IF NOT EXISTS requests_status ON requests(status)",
+    "CREATE INDEX IF NOT EXISTS requests_remote_host ON requests(remote_host)",
+    "CREATE INDEX IF NOT EXISTS requests_path_id ON requests(path_id)",
+)
+_INSERT_REQUEST: Final[str] = (
+    "INSERT INTO requests (remote_host, identd, user, ts, method, path_id, protocol, status, size, referrer,"
+    " user_agent_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_INSERT_PATH: Final[str] = "INSERT INTO paths (id, path) VALUES (?, ?)"
+_INSERT_USER_AGENT: Final[str] = "INSERT INTO user_agents (id, user_agent) VALUES (?, ?)"
+
+
+class SqliteSink:
+    """Strumieniowy zapis rekordów do SQLite partiami (patrz opis modułu)."""
+
+    def __init__(self, path: Path, batch_rows: int = DEFAULT_BATCH_ROWS):
+        if batch_rows < 1:
+            raise ValueError(f"Parametr 'batch_rows' musi być >= 1, otrzymano: {batch_rows}")
+        self.path = path
+        self.batch_rows = batch_rows
+        self.rows = 0
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(path, isolation_level=None)
+        conn = self._conn
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.executescript(_SCHEMA)
+        self._paths: dict[str, int] = {p: i for i, p in conn.execute("SELECT id, path FROM paths")}
+        self._user_agents: dict[str, int] = {u: i for i, u in conn.execute("SELECT id, user_agent FROM user_agents")}
+        self._next_path = max(self._paths.values(), default=0) + 1
+        self._next_user_agent = max(self._user_agents.values(), default=0) + 1
+        self._rows: list[tuple] = []
+        self._new_paths: list[tuple[int, str]] = []
+        self._new_user_agents: list[tuple[int, str]] = []
+
+    def __enter__(self) -> SqliteSink:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _path_id(self, path: str) -> int:
+        pid = self._paths.get(path)
+        if pid is None:
+            pid = self._paths[path] = self._next_path
+            self._next_path += 1
+            self._new_paths.append((pid, path))
+        return pid
+
+    def _user_agent_id(self, user_agent: Optional[str]) -> Optional[int]:
+        if user_agent is None:
+            return None
+        uid = self._user_agents.get(user_agent)
+        if uid is None:
+            uid = self._user_agents[user_agent] = self._next_user_agent
+            self._next_user_agent += 1
+            self._new_user_agents.append((uid, user_agent))
+        return uid
+
+    def add(self, rec: dict | LogRecord) -> None:
+        """Dodaje rekord do bieżącej partii (zapis przy `batch_rows` wierszach)."""
+        if isinstance(rec, LogRecord):
+            row = (
+                rec.remote_host, rec.identd, rec.user, rec.epoch, rec.method, self._path_id(rec.path),
+                rec.protocol, rec.status, rec.size, rec.referrer, self._user_agent_id(rec.user_agent),
+            )
+        else:
+            row = (
+                rec["remote_host"], rec["identd"], rec["user"], int(rec["ts"].timestamp()), rec["method"],
+                self._path_id(rec["path"]), rec["protocol"], rec["status"], rec["size"], rec["referrer"],
+                self._user_agent_id(rec["user_agent"]),
+            )
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Zapisuje bufor (nowe wymiary + wiersze) w jednej transakcji; przy błędzie partia jest odrzucana."""
+        if not self._rows and not self._new_paths and not self._new_user_agents:
+            return
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(_INSERT_PATH, self._new_paths)
+            conn.executemany(_INSERT_USER_AGENT, self._new_user_agents)
+            conn.executemany(_INSERT_REQUEST, self._rows)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            self._discard_batch()
+            raise
+        self.rows += len(self._rows)
+        self._rows.clear()
+        self._new_paths.clear()
+        self._new_user_agents.clear()
+
+    def _discard_batch(self) -> None:
+        """Po ROLLBACK: usuwa wiersze partii i cofa id wymiarów nadane w niej (dict + _next_*)."""
+        for _, path in self._new_paths:
+            del self._paths[path]
+        for _, user_agent in self._new_user_agents:
+            del self._user_agents[user_agent]
+        if self._new_paths:
+            self._next_path = self._new_paths[0][0]
+        if self._new_user_agents:
+            self._next_user_agent = self._new_user_agents[0][0]
+        self._rows.clear()
+        self._new_paths.clear()
+        self._new_user_agents.clear()
+
+    def close(self) -> None:
+        """Zapisuje resztę, tworzy indeksy (istniejące zostają), ANALYZE i przywraca synchronous=NORMAL."""
+        if self._conn is None:
+            return
+        try:
+            self.flush()
+            for statement in _INDEXES:
+                self._conn.execute(statement)
+            self._conn.execute("ANALYZE")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        finally:
+            self._conn.close()
+            self._conn = None
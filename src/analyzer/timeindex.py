@@ -0,0 +1,286 @@
+"""
+Module: timeindex.py
+Cel: Szybkie --since/--until na dużych plikach: skok do zakresu czasu zamiast czytania od początku.
+Public API:
+  - INDEX_SUFFIX = ".idx", def index_path(path) -> Path
+      Indeks leży obok logu: access.log -> access.log.idx.
+  - def build_index(path, every_bytes=DEFAULT_EVERY_BYTES, every_lines=0) -> TimeIndex
+      Jeden przebieg po pliku; wpis (offset początku bloku, min/max czasu w bloku) co
+      `every_bytes` bajtów albo co `every_lines` linii (co nastąpi pierwsze).
+  - class TimeIndex
+      save(path) / load(path) / is_fresh(log_path) / byte_range(since, until) -> (start, end)
+  - def bisect_offset(path, target, slack=BISECT_SLACK_SECONDS) -> (lo, hi)
+      Bez indeksu: bisekcja po offsetach bajtów, czas linii z parse_timestamp_epoch.
+  - def byte_range_for(path, since, until) -> (start, end | None)
+      Zakres bajtów do przeczytania: z indeksu (gdy aktualny), inaczej bisekcją.
+Zakres jest NADMIAROWY (granularność bloku / okno bisekcji) - dokładny filtr czasu robi
+pipeline.process_lines. Linie logu bywają lekko nieposortowane, dlatego indeks trzyma min i max
+bloku, a bisekcja cofa cel o `slack` sekund. Pliki skompresowane nie są indeksowane (brak seek).
+Format pliku .idx: nagłówek (_HEADER) + trzy tablice int64: offsets, block_min, block_max.
+Nagłówek opisuje plik z chwili budowy: rozmiar, mtime, inode i odcisk (hash początku pierwszego
+i końca ostatniego bloku) - plik podmieniony albo nadpisany w miejscu nie przejdzie `is_fresh`.
+"""
+from __future__ import annotations
+
+import os
+import struct
+from hashlib import blake2b
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from pathlib import Path
+from typing import Final, Optional
+
+from .io_reader import detect_compression
+from .parser import parse_timestamp_epoch
+
+INDEX_SUFFIX: Final[str] = ".idx"
+DEFAULT_EVERY_BYTES: Final[int] = 1024 * 1024  # 1MiB
+BISECT_SLACK_SECONDS: Final[int] = 300
+BISECT_WINDOW_BYTES: Final[int] = 64 * 1024  # poniżej tego bisekcja kończy się (resztę czyta filtr)
+FINGERPRINT_BYTES: Final[int] = 64 * 1024  # ile bajtów z początku i z końca zaindeksowanej części hashować
+
+_MAGIC: Final[bytes] = b"LAIDX2\0\0"
+_HEADER: Final[struct.Struct] = struct.Struct("<8sqqqqq")  # magic, file_size, mtime_ns, inode, fingerprint, entries
+_NO_MIN: Final[int] = 2**63 - 1  # blok bez poprawnego znacznika czasu
+_NO_MAX: Final[int] = -(2**63)
+
+
+def index_path(path: Path) -> Path:
+    """Ścieżka indeksu dla pliku logu (plik obok, z przyrostkiem .idx)."""
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def _line_epoch(raw: bytes) -> Optional[int]:
+    """Czas linii (epoch UTC) z pola [..] albo None, gdy linia go nie ma / jest błędny."""
+    start = raw.find(b"[")
+    if start < 0:
+        return None
+    end = raw.find(b"]", start)
+    if end < 0:
+        return None
+    try:
+        return parse_timestamp_epoch(raw[start + 1:end].decode("ascii"))
+    except (ValueError, OverflowError):
+        return None
+
+
+def _fingerprint(file, size: int) -> int:
+    """
+    Odcisk pierwszych `size` bajtów pliku: blake2b (64 bit, int64) z początku pierwszego
+    i końca ostatniego bloku, po FINGERPRINT_BYTES - stały koszt niezależnie od rozmiaru pliku.
+    """
+    digest = blake2b(size.to_bytes(8, "little"), digest_size=8)
+    file.seek(0)
+    digest.update(file.read(min(size, FINGERPRINT_BYTES)))
+    file.seek(max(0, size - FINGERPRINT_BYTES))
+    digest.update(file.read(min(size, FINGERPRINT_BYTES)))
+    return int.from_bytes(digest.digest(), "little", signed=True)
+
+
+def _require_plain(path: Path) -> None:
+    compression = detect_compression(path)
+    if compression is not None:
+        raise ValueError(f"Pliku skompresowanego ({compression}) nie można indeksować ani przeszukiwać: {path}")
+
+
+class TimeIndex:
+    """
+    Rzadki indeks czasu pliku logu: blok i zaczyna się od bajtu offsets[i] i zawiera linie
+    o czasach z [block_min[i], block_max[i]]. file_size / mtime_ns / inode / fingerprint opisują
+    plik z chwili budowy (fingerprint - patrz `_fingerprint`).
+    """
+
+    def __init__(
+        self, file_size: int, mtime_ns: int, inode: int, fingerprint: int,
+        offsets: array, block_min: array, block_max: array,
+    ):
+        if not (len(offsets) == len(block_min) == len(block_max)):
+            raise ValueError("Niespójny indeks: tablice różnej długości")
+        self.file_size = file_size
+        self.mtime_ns = mtime_ns
+        self.inode = inode
+        self.fingerprint = fingerprint
+        self.offsets = offsets
+        self.block_min = block_min
+        self.block_max = block_max
+        # prefix_max[i] = max czasu w blokach 0..i, suffix_min[i] = min w blokach i..; oba niemalejące
+        self._prefix_max = list(accumulate(block_max, max))
+        self._suffix_min = list(accumulate(reversed(block_min), min))[::-1]
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def save(self, path: Path) -> None:
+        """Zapis atomowy (plik tymczasowy + os.replace)."""
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, self.file_size, self.mtime_ns, self.inode, self.fingerprint, len(self)))
+            for column in (self.offsets, self.block_min, self.block_max):
+                column.tofile(file)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> TimeIndex:
+        """Wczytuje indeks; ValueError, gdy plik nie jest indeksem albo jest ucięty."""
+        with open(path, "rb") as file:
+            header = file.read(_HEADER.size)
+            if len(header) != _HEADER.size or header[:8] != _MAGIC:
+                raise ValueError(f"To nie jest plik indeksu: {path}")
+            _, file_size, mtime_ns, inode, fingerprint, entries = _HEADER.unpack(header)
+            columns = []
+            for _ in range(3):
+                column = array("q")
+                try:
+                    column.fromfile(file, entries)
+                except EOFError:
+                    raise ValueError(f"Ucięty plik indeksu: {path}") from None
+                columns.append(column)
+        return cls(file_size, mtime_ns, inode, fingerprint, *columns)
+
+    def is_fresh(self, log_path: Path) -> bool:
+        """
+        Czy indeks opisuje obecny plik: ten sam inode, a do tego ten sam mtime i rozmiar albo plik
+        tylko dopisywany - większy, z niezmienioną zaindeksowaną częścią (ten sam odcisk). Dopisany
+        ogon czytany jest bez indeksu (koniec zakresu = EOF). Plik po rotacji (nowy inode) albo
+        nadpisany w miejscu i dłuższy nie jest aktualny - `byte_range_for` przechodzi na bisekcję.
+        """
+        st = log_path.stat()
+        if st.st_ino != self.inode:
+            return False
+        if st.st_size == self.file_size and st.st_mtime_ns == self.mtime_ns:
+            return True
+        if st.st_size <= self.file_size:
+            return False
+        with open(log_path, "rb") as file:
+            return _fingerprint(file, self.file_size) == self.fingerprint
+
+    def byte_range(self, since: Optional[int], until: Optional[int]) -> tuple[int, Optional[int]]:
+        """
+        Zakres bajtów [start, end) z liniami o czasie w [since, until); end=None = do końca pliku.
+        Start: pierwszy blok, przed którym wszystkie linie są < since; end: pierwszy blok, od
+        którego wszystkie linie są >= until.
+        """
+        start, end = 0, None
+        if since is not None:
+            i = bisect_left(self._prefix_max, since)
+            start = self.offsets[i] if i < len(self) else self.file_size
+        if until is not None:
+            j = bisect_left(self._suffix_min, until)
+            if j < len(self):
+                end = max(self.offsets[j], start)
+        return start, end
+
+
+def build_index(path: Path, every_bytes: int = DEFAULT_EVERY_BYTES, every_lines: int = 0) -> TimeIndex:
+    """
+    Buduje indeks czasu pliku (bez zapisu - patrz `TimeIndex.save` / `index_path`).
+
+    Parametry:
+    ----------
+    every_bytes : int
+        Nowy blok co tyle bajtów (>= 1; domyślnie 1 MiB).
+    every_lines : int
+        Nowy blok co tyle linii (0 = tylko wg bajtów).
+
+    Linie bez poprawnego znacznika czasu są pomijane; pliki skompresowane -> ValueError.
+    """
+    if every_bytes < 1 or every_lines < 0:
+        raise ValueError(f"Niepoprawny krok indeksu: every_bytes={every_bytes}, every_lines={every_lines}")
+    _require_plain(path)
+
+    st = path.stat()
+    offsets, block_min, block_max = array("q"), array("q"), array("q")
+    pos = block_start = lines = 0
+    low, high = _NO_MIN, _NO_MAX
+    with open(path, "rb") as file:
+        for raw in file:
+            if pos - block_start >= every_bytes or (every_lines and lines >= every_lines):
+                offsets.append(block_start)
+                block_min.append(low)
+                block_max.append(high)
+                block_start, lines, low, high = pos, 0, _NO_MIN, _NO_MAX
+            pos += len(raw)
+            lines += 1
+            epoch = _line_epoch(raw)
+            if epoch is not None:
+                if epoch < low:
+                    low = epoch
+                if epoch > high:
+                    high = epoch
+        if lines:
+            offsets.append(block_start)
+            block_min.append(low)
+            block_max.append(high)
+        fingerprint = _fingerprint(file, pos)
+    return TimeIndex(pos, st.st_mtime_ns, st.st_ino, fingerprint, offsets, block_min, block_max)
+
+
+def _probe(file, offset: int, limit: int) -> tuple[int, Optional[int]]:
+    """
+    Pierwsza pełna linia od `offset` (offset > 0: po najbliższym '\\n') z poprawnym czasem,
+    szukana do bajtu `limit`. Zwraca (początek linii wyrównany do granicy, czas | None).
+    """
+    file.seek(offset - 1 if offset else 0)
+    if offset:
+        file.readline()  # dokończ linię, w której wypadł offset
+    aligned = pos = file.tell()
+    while pos < limit:
+        raw = file.readline()
+        if not raw:
+            break
+        epoch = _line_epoch(raw)
+        if epoch is not None:
+            return aligned, epoch
+        pos += len(raw)
+    return aligned, None
+
+
+def bisect_offset(path: Path, target: int, slack: int = BISECT_SLACK_SECONDS) -> tuple[int, int]:
+    """
+    Bisekcja po bajtach pliku posortowanego (z dokładnością do `slack` s) po czasie.
+    Zwraca (lo, hi) - początki linii: przed `lo` wszystkie linie są < target - slack,
+    od `hi` wszystkie >= target - slack; hi - lo <= BISECT_WINDOW_BYTES (+ długość linii).
+    """
+    _require_plain(path)
+    goal = target - slack
+    lo, hi = 0, path.stat().st_size
+    with open(path, "rb") as file:
+        while hi - lo > BISECT_WINDOW_BYTES:
+            mid = (lo + hi) // 2
+            aligned, epoch = _probe(file, mid, hi)
+            if aligned >= hi or epoch is None or epoch >= goal:
+                if aligned >= hi:  # brak granicy linii w (mid, hi) - dalej się nie da
+                    break
+                hi = aligned
+            else:
+                lo = aligned
+    return lo, hi
+
+
+def byte_range_for(path: Path, since: Optional[int], until: Optional[int]) -> tuple[int, Optional[int]]:
+    """
+    Zakres bajtów do przeczytania dla --since/--until (start na początku linii, end=None = EOF).
+    Aktualny indeks (`index_path`) ma pierwszeństwo; bez niego - `bisect_offset`.
+    Pliki skompresowane i brak ograniczeń czasu -> (0, None), czyli cały plik.
+    """
+    if (since is None and until is None) or detect_compression(path) is not None:
+        return 0, None
+    idx = index_path(path)
+    if idx.is_file():
+        try:
+            index = TimeIndex.load(idx)
+        except ValueError:
+            index = None
+        if index is not None and index.is_fresh(path):
+            return index.byte_range(since, until)
+
+    start, end = 0, None
+    if since is not None:
+        start = bisect_offset(path, since)[0]
+    if until is not None:
+        # linie >= until + slack na pewno są poza zakresem (z tolerancją nieposortowania)
+        hi = bisect_offset(path, until + 2 * BISECT_SLACK_SECONDS)[1]
+        if hi < path.stat().st_size:
+            end = max(hi, start)
+    return start, end
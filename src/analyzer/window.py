@@ -0,0 +1,97 @@
+"""
+Module: window.py
+Cel: Statystyki "ostatnich N sekund" dla trybu --follow: koszt O(1) na linię, stała pamięć na szczelinę.
+Public API:
+  - class RollingWindow(seconds=60, resolution=1)
+      Bufor cykliczny ceil(seconds / resolution) szczelin czasu; każda szczelina trzyma liczbę
+      żądań, liczbę 5xx i Counter adresów IP, a okno - sumy bieżące tych wartości.
+      add(epoch, status, ip)       - rekord do jego szczeliny (starsze niż okno: `late`),
+      advance(epoch)               - przesuwa koniec okna, wygaszając szczeliny spoza niego,
+      snapshot(now, top=5) -> dict - requests, rate (req/s), error_ratio (5xx), top_ips.
+Wygaszenie szczeliny odejmuje jej liczniki od sum bieżących - każdy rekord jest dodany i odjęty
+dokładnie raz, więc koszt jest zamortyzowany O(1) na linię niezależnie od długości okna.
+Czas to epoch UTC z rekordów (koniec okna = najnowsza szczelina); `snapshot(now)` pozwala
+przesunąć okno zegarem, gdy nowe linie nie przychodzą.
+"""
+from __future__ import annotations
+
+import math
+from collections import Counter
+from heapq import nsmallest
+from typing import Optional
+
+
+class RollingWindow:
+    """Przesuwne okno czasu z szczelinami w buforze cyklicznym."""
+
+    def __init__(self, seconds: int = 60, resolution: int = 1):
+        if seconds < 1 or resolution < 1 or resolution > seconds:
+            raise ValueError(f"Niepoprawne okno: seconds={seconds}, resolution={resolution}")
+        self.seconds = seconds
+        self.resolution = resolution
+        self.slots = math.ceil(seconds / resolution)
+        self._stamp: list[Optional[int]] = [None] * self.slots  # numer szczeliny (epoch // resolution)
+        self._requests = [0] * self.slots
+        self._errors = [0] * self.slots
+        self._ips: list[Counter] = [Counter() for _ in range(self.slots)]
+        self.head: Optional[int] = None  # numer najnowszej szczeliny
+        self.requests = 0
+        self.errors = 0
+        self.ips: Counter = Counter()
+        self.late = 0  # rekordy starsze niż okno (pominięte)
+
+    def _expire(self, i: int) -> None:
+        self.requests -= self._requests[i]
+        self.errors -= self._errors[i]
+        ips = self.ips
+        for ip, count in self._ips[i].items():
+            left = ips[ip] - count
+            if left:
+                ips[ip] = left
+            else:
+                del ips[ip]
+        self._requests[i] = self._errors[i] = 0
+        self._ips[i].clear()
+        self._stamp[i] = None
+
+    def advance(self, epoch: int) -> None:
+        """Przesuwa koniec okna do `epoch` (nie cofa go)."""
+        slot = epoch // self.resolution
+        head = self.head
+        if head is not None and slot <= head:
+            return
+        if head is not None:
+            for s in range(max(head + 1, slot - self.slots + 1), slot + 1):
+                if self._stamp[s % self.slots] is not None:
+                    self._expire(s % self.slots)
+        self.head = slot
+
+    def add(self, epoch: int, status: int, ip: str) -> None:
+        slot = epoch // self.resolution
+        if self.head is None or slot > self.head:
+            self.advance(epoch)
+        elif slot <= self.head - self.slots:
+            self.late += 1
+            return
+        i = slot % self.slots
+        self._stamp[i] = slot
+        self._requests[i] += 1
+        self.requests += 1
+        if status >= 500:
+            self._errors[i] += 1
+            self.errors += 1
+        self._ips[i][ip] += 1
+        self.ips[ip] += 1
+
+    def snapshot(self, now: Optional[int] = None, top: int = 5) -> dict:
+        """Statystyki okna kończącego się w `now` (domyślnie: najnowszy rekord)."""
+        if now is not None:
+            self.advance(now)
+        return {
+            "window": self.seconds,
+            "requests": self.requests,
+            "rate": self.requests / self.seconds,
+            "error_ratio": self.errors / self.requests if self.requests else 0.0,
+            "top_ips": nsmallest(top, self.ips.items(), key=lambda item: (-item[1], item[0])),
+            "late": self.late,
+        }
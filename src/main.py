@@ -2,12 +2,33 @@
 # Cel: punkt startowy aplikacji, uruchamia CLI:
 #   python -m src.main [OPCJE]
 #
+# Lekki start: sam `--version` nie importuje Typera ani modułów analizy (wersja z _version.py),
+# pozostałe wywołania importują analyzer.cli dopiero tutaj. Importy przy starcie pilnuje
+# tests/test_startup.py (python -X importtime).
+#
 # TODO:
-# [ ] NIE dodawaj logiki biznesowej tutaj
-# [ ] Cała logika w analyzer/cli.py i dalszych modułach
-# [ ] Ten plik ma tylko wywołać app()
+# [x] NIE dodawaj logiki biznesowej tutaj
+# [x] Cała logika w analyzer/cli.py i dalszych modułach
+# [x] Ten plik ma tylko wywołać app()
+
+import sys
+
+
+def run(argv: "list[str] | None" = None) -> None:
+    args = sys.argv[1:] if argv is None else argv
+    if args == ["--version"]:
+        if __package__:
+            from .analyzer._version import __version__
+        else:  # python src/main.py
+            from analyzer._version import __version__
+        print(f"python-log-analyzer {__version__}")
+        return
+    if __package__:
+        from .analyzer.cli import app
+    else:  # python src/main.py
+        from analyzer.cli import app
+    app(args=args)
 
-from analyzer.cli import app  # import z pakietu 'analyzer' (wewnątrz src)
 
 if __name__ == "__main__":
-    app()
+    run()
@@ -0,0 +1,106 @@
+# === TESTY AGREGATORA ===
+# Cel: strumieniowa agregacja (top IP / ścieżek, statusy, metody, histogram) i scalanie stanu.
+#
+# WYMAGANIA:
+# - add(LogRecord) == add(dict z parse_line) == add_batch(parse_batch(...)).
+# - merge: podział wejścia na fragmenty nie zmienia wyniku.
+# - Remisy w top rozstrzygane po kluczu; --top i --time-bucket działają w CLI.
+
+from functools import partial
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from src.analyzer.aggregator import Aggregator
+from src.analyzer.cli import app
+from src.analyzer.parser import parse_batch, parse_line
+from src.analyzer.pipeline import process_file
+
+runner = CliRunner()
+
+BIG = Path("data/access_big.log")
+CORRUPTED = Path("data/corrupted.log")
+
+
+def _line(ip="10.0.0.1", ts="10/Oct/2023:13:55:36 +0200", method="GET", path="/", status=200):
+    return f'{ip} - - [{ts}] "{method} {path} HTTP/1.1" {status} 10 "-" "ua"'
+
+
+@pytest.fixture(scope="module")
+def lines() -> list[str]:
+    return BIG.read_text(encoding="utf-8").splitlines() + CORRUPTED.read_text(encoding="utf-8").splitlines()
+
+
+def _aggregate(lines, time_bucket="hour", as_record=True) -> Aggregator:
+    agg = Aggregator(time_bucket)
+    for line in lines:
+        rec = parse_line(line, as_record=as_record)
+        if rec is not None:
+            agg.add(rec)
+    return agg
+
+
+def test_records_dicts_and_batches_agree(lines):
+    expected = _aggregate(lines).summary(top=5)
+    assert _aggregate(lines, as_record=False).summary(top=5) == expected
+
+    batched = Aggregator("hour")
+    for start in range(0, len(lines), 1000):
+        batched.add_batch(parse_batch(lines[start:start + 1000]))
+    assert batched.summary(top=5) == expected
+
+
+def test_merge_equals_single_pass(lines):
+    whole = _aggregate(lines, "minute")
+    parts = [_aggregate(lines[i:i + 700], "minute") for i in range(0, len(lines), 700)]
+    merged = Aggregator("minute")
+    for part in reversed(parts):
+        merged.merge(part)
+    assert merged.summary(top=10) == whole.summary(top=10)
+    assert merged.requests == whole.requests == len(lines) - 6
+
+
+def test_counts_classes_and_histogram():
+    agg = _aggregate([
+        _line(ip="10.0.0.2", path="/b", status=404),
+        _line(ip="10.0.0.1", path="/a", status=500, method="POST"),
+        _line(ip="10.0.0.2", path="/a", ts="10/Oct/2023:14:05:00 +0200"),
+        _line(ip="10.0.0.1", path="/b", ts="11/Oct/2023:00:30:00 +0000", status=201),
+    ])
+    assert agg.top_ips(1) == [("10.0.0.1", 2)]  # remis 2:2 -> mniejszy klucz
+    assert agg.top_paths(5) == [("/a", 2), ("/b", 2)]
+    assert agg.status_classes() == {"2xx": 2, "4xx": 1, "5xx": 1}
+    assert agg.method_counts() == [("GET", 3), ("POST", 1)]
+    assert agg.histogram() == [("2023-10-10 11:00", 2), ("2023-10-10 12:00", 1), ("2023-10-11 00:00", 1)]
+
+
+def test_invalid_bucket_and_merge_mismatch():
+    with pytest.raises(ValueError):
+        Aggregator("week")
+    with pytest.raises(ValueError):
+        Aggregator("hour").merge(Aggregator("day"))
+
+
+def test_process_file_returns_aggregator():
+    result = process_file(BIG, quiet=True, aggregator_factory=partial(Aggregator, "day"))
+    assert result.aggregator.requests == result.ok == 5511
+    assert result.aggregator.histogram() == [("2023-10-10", 5511)]
+
+
+def test_cli_top_and_time_bucket(tmp_path):
+    result = runner.invoke(app, ["main", "--input", str(BIG), "--outdir", str(tmp_path), "--quiet", "--top", "2", "--time-bucket", "day"])
+    assert result.exit_code == 0, result.output
+    out = result.stdout
+    assert "Top 2 adresów IP:\n  203.0.113.5  2120\n  198.51.100.22  1696\n" in out
+    assert "Top 2 ścieżek:" in out
+    assert "Histogram czasu (day, UTC):\n  2023-10-10  5511\n" in out
+    assert "  5xx  424\n" in out
+
+
+def test_cli_report_same_with_workers_and_mmap(tmp_path):
+    base = ["main", "--input", str(BIG), "--outdir", str(tmp_path), "--quiet", "--time-bucket", "minute"]
+    serial = runner.invoke(app, base)
+    parallel = runner.invoke(app, base + ["--workers", "2", "--reader", "mmap"])
+    assert serial.exit_code == parallel.exit_code == 0
+    assert parallel.stdout == serial.stdout
@@ -0,0 +1,119 @@
+# === TESTY PRZETWARZANIA PRZYROSTOWEGO (--state-file) ===
+# Cel: kolejne uruchomienie czyta tylko dopisane bajty i daje ten sam raport co pełny przebieg.
+#
+# WYMAGANIA:
+# - Wznowienie od offsetu; niedopisana ostatnia linia zostaje na następne uruchomienie.
+# - Rotacja (inny inode) i obcięcie (plik krótszy niż offset) -> czytanie od początku.
+# - Stan z innymi opcjami agregacji / uszkodzony plik stanu -> błąd parametru (exit 2).
+
+import os
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from src.analyzer.checkpoint import complete_lines_end, load_checkpoint, resume_offset
+from src.analyzer.cli import app
+
+runner = CliRunner()
+
+BIG = Path("data/access_big.log")
+
+
+def _report(stdout: str) -> str:
+    """Część wyjścia od list top (bez liczników bieżącego uruchomienia)."""
+    return stdout[stdout.index("Top "):]
+
+
+def _run(log: Path, state: Path, *extra: str):
+    result = runner.invoke(app, ["main", "--input", str(log), "--outdir", str(log.parent), "--quiet",
+                                 "--state-file", str(state), *extra])
+    assert result.exit_code == 0, result.output
+    return result
+
+
+def test_resume_reads_only_appended_lines(tmp_path):
+    lines = BIG.read_text(encoding="utf-8").splitlines(keepends=True)
+    log, state = tmp_path / "access.log", tmp_path / "state" / "access.state"
+    log.write_text("".join(lines[:3000]), encoding="utf-8")
+
+    first = _run(log, state)
+    assert "nowy stan" in first.stdout and "Wczytano 3000 linii" in first.stdout
+
+    with open(log, "a", encoding="utf-8") as file:
+        file.write("".join(lines[3000:]))
+    second = _run(log, state, "--workers", "2")
+    offset = len("".join(lines[:3000]).encode())
+    assert f"wznowiono od bajtu {offset}" in second.stdout
+    assert f"Wczytano {len(lines) - 3000} linii" in second.stdout
+    assert f"Łącznie (--state-file): wczytano {len(lines)} linii" in second.stdout
+
+    full = runner.invoke(app, ["main", "--input", str(BIG), "--outdir", str(tmp_path), "--quiet"])
+    assert _report(second.stdout) == _report(full.stdout)
+
+    third = _run(log, state)
+    assert "Wczytano 0 linii" in third.stdout and _report(third.stdout) == _report(full.stdout)
+
+
+def test_partial_last_line_waits_for_next_run(tmp_path):
+    line = BIG.read_text(encoding="utf-8").splitlines(keepends=True)[1]
+    log, state = tmp_path / "a.log", tmp_path / "a.state"
+    log.write_text(line + line[:20], encoding="utf-8")
+    assert "Wczytano 1 linii" in _run(log, state).stdout
+    assert load_checkpoint(state).offset == len(line.encode())
+
+    with open(log, "a", encoding="utf-8") as file:
+        file.write(line[20:])
+    result = _run(log, state)
+    assert "Wczytano 1 linii" in result.stdout and "Poprawnie sparsowane: 1" in result.stdout
+    assert load_checkpoint(state).ok == 2
+
+
+def test_rotation_and_truncation_restart_from_zero(tmp_path):
+    line = BIG.read_text(encoding="utf-8").splitlines(keepends=True)[1]
+    log, state = tmp_path / "r.log", tmp_path / "r.state"
+    log.write_text(line * 5, encoding="utf-8")
+    _run(log, state)
+
+    log.write_text(line * 2, encoding="utf-8")  # ten sam inode, krótszy
+    assert resume_offset(load_checkpoint(state), log)[1] == "truncated"
+    assert "obcięty" in _run(log, state).stdout
+
+    os.rename(log, tmp_path / "r.log.1")
+    log.write_text(line * 3, encoding="utf-8")  # logrotate: nowy plik pod tą samą nazwą
+    result = _run(log, state)
+    assert "zrotowany" in result.stdout and "Wczytano 3 linii" in result.stdout
+    assert load_checkpoint(state).ok == 10  # 5 + 2 + 3: stan narastający
+
+
+def test_state_errors(tmp_path):
+    log, state = tmp_path / "e.log", tmp_path / "e.state"
+    log.write_bytes(b"x\n" * 3 + b"tail")
+    assert complete_lines_end(log, log.stat().st_size) == 6
+    assert complete_lines_end(log, 1) == 0
+
+    _run(log, state, "--time-bucket", "day")
+    mismatch = runner.invoke(app, ["main", "--input", str(log), "--outdir", str(tmp_path), "--state-file", str(state)])
+    assert mismatch.exit_code == 2
+
+
+def test_state_precision_mismatch_is_bad_parameter(tmp_path):
+    """Stan zapisany z domyślną precyzją HLL, wznowienie z inną: błąd parametru przed czytaniem, bez tracebacku."""
+    log, state = tmp_path / "p.log", tmp_path / "p.state"
+    log.write_bytes(BIG.read_bytes())
+    _run(log, state, "--unique", "remote_host")
+    with log.open("ab") as f:
+        f.write(BIG.read_bytes())
+    result = runner.invoke(app, ["main", "--input", str(log), "--outdir", str(tmp_path), "--quiet", "--state-file", str(state),
+                                 "--unique", "remote_host", "--hll-precision", "10"])
+    assert result.exit_code == 2 and isinstance(result.exception, SystemExit)  # bez tracebacku z HyperLogLog.merge
+    assert "hll_precision: 12 -> 10" in " ".join(result.output.replace("│", " ").split())
+    assert "Wczytano" not in result.output
+    assert load_checkpoint(state).lines == len(BIG.read_text(encoding="utf-8").splitlines())
+
+    state.write_bytes(b"not a pickle")
+    with pytest.raises(ValueError):
+        load_checkpoint(state)
+    assert runner.invoke(app, ["main", "--input", str(log), "--outdir", str(tmp_path), "--state-file", str(state)]).exit_code == 2
+    assert runner.invoke(app, ["main", "--input", str(log), "--outdir", str(tmp_path), "--state-file", str(tmp_path / "n"),
+                               "--limit", "1"]).exit_code == 2
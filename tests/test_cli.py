@@ -7,6 +7,7 @@
 # - main --input <plik>: exit 0 + "Wczytano N linii"
 # - main --input <brak_pliku>: exit 2 (walidacja Click) + komunikat błędu
 # - main --limit 3: exit 0 + "Wczytano 3 linii"
+# - main --input - (stdin): to samo podsumowanie co z pliku; '-' razem z innym --input -> exit 2
 #
 # TODO:
 # [x] test_help_ok
@@ -38,7 +39,7 @@ def test_cli_success(tmp_path):
     file_path.write_text("line1\nline2\nline3\nline4")
 
     # 2. Uruchom CLI
-    result = runner.invoke(app, ["main", "--input", str(file_path)])
+    result = runner.invoke(app, ["main", "--input", str(file_path), "--outdir", str(tmp_path)])
 
     # 3. Sprawdź wynik
     assert result.exit_code == 0
@@ -53,14 +54,14 @@ def test_limit_3(tmp_path):
     file_path = tmp_path / "test_limit.log"
     file_path.write_text("a\nb\nc\nd\ne\nf")
 
-    result = runner.invoke(app, ["main", "--input", str(file_path), "--limit", "3"])
+    result = runner.invoke(app, ["main", "--input", str(file_path), "--outdir", str(tmp_path), "--limit", "3"])
 
     assert result.exit_code == 0
     assert "Wczytano 3 linii" in result.stdout
 
-def test_file_missing():
+def test_file_missing(tmp_path):
     path = Path("data/__nope__.log")
-    result = runner.invoke(app, ["main", "--input", str(path)])
+    result = runner.invoke(app, ["main", "--input", str(path), "--outdir", str(tmp_path)])
 
     assert result.exit_code == 2
 
@@ -68,3 +69,50 @@ def test_file_missing():
     assert re.search(r"(does not exist|Invalid value.*--input|nie istnieje|File not found)", msg)
     # stderr w CliRunner trafia do .stderr ORAZ często do .output — sprawdź lokalnie co zwraca
 
+
+def test_reader_mmap_same_summary_as_text(tmp_path):
+    base = ["main", "--input", "data/access_big.log", "--outdir", str(tmp_path), "--quiet"]
+    text = runner.invoke(app, base)
+    mm = runner.invoke(app, base + ["--reader", "mmap"])
+    assert mm.exit_code == 0
+    assert mm.stdout == text.stdout
+
+def test_fallback_lines_reported_once(tmp_path):
+    file_path = tmp_path / "fallback.log"
+    file_path.write_bytes(b"a\nb\n\xe9\nc\n")
+    result = runner.invoke(app, ["main", "--input", str(file_path), "--outdir", str(tmp_path), "--quiet"])
+    assert result.exit_code == 0
+    assert "Wczytano 4 linii" in result.stdout
+    assert "Linie zdekodowane awaryjnie (latin-1): 1" in result.stdout
+
+def test_gzip_input_with_workers_falls_back_to_stream(tmp_path):
+    import gzip
+    file_path = tmp_path / "access.log.1.gz"
+    file_path.write_bytes(gzip.compress(Path("data/access_big.log").read_bytes()))
+    plain = runner.invoke(app, ["main", "--input", "data/access_big.log", "--outdir", str(tmp_path), "--quiet"])
+    result = runner.invoke(app, ["main", "--input", str(file_path), "--outdir", str(tmp_path), "--quiet", "--workers", "2", "--reader", "mmap"])
+    assert result.exit_code == 0
+    assert result.stdout.splitlines()[1:] == plain.stdout.splitlines()[1:]
+
+def test_stdin_input_same_summary_as_file(tmp_path):
+    data = Path("data/access_big.log").read_bytes() + Path("data/corrupted.log").read_bytes()
+    file_path = tmp_path / "mixed.log"
+    file_path.write_bytes(data)
+    base = ["main", "--quiet", "--outdir", str(tmp_path / "out")]
+    from_file = runner.invoke(app, base + ["--input", str(file_path)])
+    from_stdin = runner.invoke(app, base + ["--input", "-", "--read-size", "4KB", "--workers", "2"], input=data)
+    assert from_stdin.exit_code == 0, from_stdin.output
+    assert from_stdin.stdout.splitlines()[0].endswith(" linii z: stdin")
+    assert from_stdin.stdout.splitlines()[1:] == from_file.stdout.splitlines()[1:]
+
+    mixed = runner.invoke(app, base + ["--input", "-", "--input", str(file_path)], input=data)
+    assert mixed.exit_code == 2
+
+
+def test_utf16_encoding_is_bad_parameter(tmp_path):
+    file_path = tmp_path / "wide.log"
+    file_path.write_bytes(Path("data/access_small.log").read_text(encoding="utf-8").encode("utf-16"))
+    result = runner.invoke(app, ["main", "--input", str(file_path), "--outdir", str(tmp_path), "--quiet", "--encoding", "utf-16"])
+    assert result.exit_code == 2
+    msg = " ".join(strip_ansi(result.output).replace("│", " ").split())
+    assert "--encoding" in msg and "nie jest zgodne z ASCII" in msg
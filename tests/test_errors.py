@@ -0,0 +1,75 @@
+# === TESTY RAPORTOWANIA BŁĘDNYCH LINII (errors, errors.log, --error-samples) ===
+# Cel: jedna linia podsumowania i ograniczona próbka zamiast ostrzeżenia na każdą błędną linię.
+#
+# WYMAGANIA:
+# - Przyczyna = prefiks komunikatu ("line", "ts", "status", ...); OverflowError -> "ts".
+# - CLI: brak rekordów loggera na linię; liczniki wg przyczyny w linii "Błędnie sparsowane".
+# - errors.log: pierwsze --error-samples linii z globalnymi numerami; identyczny szeregowo,
+#   z --workers i z --cache-dir; bez próbki (brak błędów albo --error-samples 0) plik nie jest
+#   tworzony ani usuwany - errors.log z wcześniejszego przebiegu zostaje nietknięty.
+
+import logging
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from src.analyzer.cli import app
+from src.analyzer.errors import error_reason, format_reasons
+
+runner = CliRunner()
+
+BIG = Path("data/access_big.log")
+CORRUPTED = Path("data/corrupted.log")
+
+
+def test_error_reason():
+    assert error_reason(ValueError("ts: bad month token")) == "ts"
+    assert error_reason(ValueError("status: out of range")) == "status"
+    assert error_reason(OverflowError("date value out of range")) == "ts"
+    assert error_reason(ValueError("something odd")) == "other"
+    assert format_reasons({"ts": 1, "line": 4, "method": 1}) == "line=4, method=1, ts=1"
+
+
+def _errors_log(tmp_path, *extra):
+    outdir = tmp_path / "out"
+    result = runner.invoke(app, ["main", "--input", str(BIG), "--input", str(CORRUPTED), "--quiet",
+                                 "--outdir", str(outdir), "--error-samples", "3", *extra])
+    assert result.exit_code == 0, result.output
+    return result, (outdir / "errors.log").read_text(encoding="utf-8")
+
+
+def test_cli_errors_summary_and_sample(tmp_path, caplog):
+    with caplog.at_level(logging.WARNING):
+        serial, log = _errors_log(tmp_path)
+    assert not any("parse_line skipped" in rec.message for rec in caplog.records)
+    assert "Błędnie sparsowane: 6 (line=5, ts=1)\n" in serial.stdout
+    assert "Błędne linie (pierwsze 3 z 6): " in serial.stderr
+
+    header, rows = log.splitlines()[:2], log.splitlines()[2:]
+    assert header[0] == "# błędne linie: 6; wg przyczyny: line=5, ts=1"
+    all_lines = BIG.read_text(encoding="utf-8").splitlines() + CORRUPTED.read_text(encoding="utf-8").splitlines()
+    assert len(rows) == 3
+    for row in rows:
+        number, message, text = row.split("\t", 2)
+        assert all_lines[int(number) - 1] == text and ":" in message
+
+    for extra in (["--workers", "2"], ["--cache-dir", str(tmp_path / "cache")], ["--cache-dir", str(tmp_path / "cache")]):
+        result, other = _errors_log(tmp_path, *extra)
+        assert other == log
+        assert "Błędnie sparsowane: 6 (line=5, ts=1)\n" in result.stdout
+
+
+def test_errors_log_only_written_with_samples(tmp_path):
+    outdir = tmp_path / "out"
+    result = runner.invoke(app, ["main", "--input", str(CORRUPTED), "--quiet", "--outdir", str(outdir),
+                                 "--error-samples", "0"])
+    assert result.exit_code == 0 and "Błędnie sparsowane: 5 (" in result.stdout
+    assert not (outdir / "errors.log").exists()
+
+    runner.invoke(app, ["main", "--input", str(CORRUPTED), "--quiet", "--outdir", str(outdir)])
+    previous = (outdir / "errors.log").read_text(encoding="utf-8")
+    # czysty przebieg i --error-samples 0 nie usuwają ani nie nadpisują pliku z wcześniejszego przebiegu
+    for extra in (["--input", "data/access_small.log"], ["--input", str(CORRUPTED), "--error-samples", "0"]):
+        result = runner.invoke(app, ["main", "--quiet", "--outdir", str(outdir), *extra])
+        assert result.exit_code == 0, result.output
+        assert (outdir / "errors.log").read_text(encoding="utf-8") == previous
@@ -0,0 +1,130 @@
+# === TESTY FILTRÓW PRZED PARSOWANIEM (--status / --method / --path-prefix, --time-bucket none) ===
+# Cel: tani test surowej linii odrzuca tylko linie, które na pewno nie pasują; wynik jak po parsowaniu.
+#
+# WYMAGANIA:
+# - may_match(line) == False => linia jest błędna albo jej rekord nie spełnia filtra (str i bytes).
+# - Agregat z filtrem == agregat z rekordów przefiltrowanych po parsowaniu (tryby: szeregowy,
+#   --workers, --reader mmap, --cache-dir); lines = ok + bad + filtered.
+# - --time-bucket none: rekordy bez czasu, jeden kubełek "całość"; złe --status/--method -> exit 2.
+# - --time-bucket none i hour: te same liczniki ok/bad (zły timestamp to zawsze błąd) w każdym
+#   trybie odczytu (szeregowy, --reader mmap, --workers, --cache-dir).
+
+from functools import partial
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from src.analyzer.aggregator import Aggregator
+from src.analyzer.cli import app
+from src.analyzer.filters import LineFilter, parse_status_filter
+from src.analyzer.parse_cache import ParseCache
+from src.analyzer.parser import parse_line
+from src.analyzer.pipeline import process_file
+
+runner = CliRunner()
+
+BIG = Path("data/access_big.log")
+CORRUPTED = Path("data/corrupted.log")
+
+FILTERS = [
+    LineFilter(statuses=("5xx",)),
+    LineFilter(statuses=("404", "2xx")),
+    LineFilter(methods=("post", "PUT")),
+    LineFilter(path_prefixes=("/api/",)),
+    LineFilter(statuses=("4xx",), methods=("GET",), path_prefixes=("/api/", "/static")),
+]
+
+
+def _lines():
+    tricky = [
+        '1.2.3.4 - - [10/Oct/2023:13:55:36 +0000] "get /api/x HTTP/1.1" 500 1 "-" "-"',
+        '1.2.3.4 - - [10/Oct/2023:13:55:36 +0000] "GET /api/\\"x\\" HTTP/1.1" 404 1 "-" "-"',
+        '1.2.3.4 - - [10/Oct/2023:13:55:36 +0000] "GET\t/api/x HTTP/1.1"  503 1 "-" "-"',
+        '1.2.3.4 - - [10/Oct/2023:13:55:36 +0000] "POST /a HTTP/1.1" 201 1 "ref \\" 404 x" "-"',
+    ]
+    return BIG.read_text(encoding="utf-8").splitlines() + CORRUPTED.read_text(encoding="utf-8").splitlines() + tricky
+
+
+@pytest.mark.parametrize("line_filter", FILTERS)
+def test_prefilter_never_rejects_matching_line(line_filter):
+    rejected = 0
+    for line in _lines():
+        rec = parse_line(line, fail_policy="skip", as_record=True)
+        for raw in (line, line.encode("utf-8")):
+            if not line_filter.may_match(raw):
+                rejected += 1
+                assert rec is None or not line_filter.matches(rec), line
+    assert rejected > 0
+
+
+@pytest.mark.parametrize("options", [{}, {"reader": "mmap"}, {"cache": True}])
+def test_filtered_aggregate_equals_post_filter(tmp_path, options):
+    line_filter = FILTERS[-1]
+    expected = Aggregator("hour")
+    for line in BIG.read_text(encoding="utf-8").splitlines():
+        rec = parse_line(line, fail_policy="skip", as_record=True)
+        if rec is not None and line_filter.matches(rec):
+            expected.add(rec)
+
+    if options.get("cache"):
+        options = {"cache": ParseCache(tmp_path / "cache")}
+    chunk = process_file(BIG, aggregator_factory=partial(Aggregator, "hour"), line_filter=line_filter, **options)
+    assert chunk.aggregator.summary(10) == expected.summary(10)
+    assert chunk.lines == chunk.ok + chunk.bad + chunk.filtered and chunk.ok == expected.requests
+
+
+def test_cli_filters_and_time_bucket_none(tmp_path):
+    common = ["main", "--input", str(BIG), "--quiet", "--outdir", str(tmp_path), "--status", "5xx", "--method", "GET"]
+    serial = runner.invoke(app, common)
+    parallel = runner.invoke(app, common + ["--workers", "2"])
+    assert serial.exit_code == 0 and "Odfiltrowane (--status, --method): " in serial.stdout
+    assert serial.stdout == parallel.stdout
+
+    result = runner.invoke(app, ["main", "--input", str(BIG), "--quiet", "--outdir", str(tmp_path), "--time-bucket", "none"])
+    assert result.exit_code == 0
+    ok = int(result.stdout.split("Poprawnie sparsowane: ")[1].split()[0])
+    assert f"Histogram czasu (none, UTC):\n  całość  {ok}\n" in result.stdout
+
+    rec = parse_line(BIG.read_text(encoding="utf-8").splitlines()[1], as_record=True, with_time=False)
+    assert rec.epoch == 0
+
+
+def test_time_bucket_none_rejects_same_bad_timestamps(tmp_path):
+    bad_timestamps = [
+        "10/Oct/2023 13:55:36 +0000",   # kształt
+        "31/Feb/2023:13:55:36 +0000",   # data kalendarzowa
+        "10/Xyz/2023:13:55:36 +0000",   # miesiąc
+        "10/Oct/2023:25:55:36 +0000",   # godzina
+        "01/Jan/0001:00:00:00 +0100",   # poza zakresem datetime
+    ]
+    lines = BIG.read_text(encoding="utf-8").splitlines()[:200]
+    good = sum(parse_line(line) is not None for line in lines)
+    for ts in bad_timestamps:
+        lines.append(f'1.2.3.4 - - [{ts}] "GET /a HTTP/1.1" 200 1 "-" "-"')
+        lines.append(f'1.2.3.4 - - [{ts}] "GET /\\"a\\" HTTP/1.1" 200 1 "-" "-"')  # ścieżka regex
+    log = tmp_path / "bad_ts.log"
+    log.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def counts(bucket, *extra):
+        result = runner.invoke(app, ["main", "--input", str(log), "--quiet", "--outdir", str(tmp_path),
+                                     "--time-bucket", bucket, *extra])
+        assert result.exit_code == 0, result.output
+        return [row for row in result.stdout.splitlines() if row.startswith(("Poprawnie", "Błędnie"))]
+
+    expected = counts("hour")
+    assert expected[0] == f"Poprawnie sparsowane: {good}"
+    assert expected[1].startswith(f"Błędnie sparsowane: {len(lines) - good} (ts={2 * len(bad_timestamps)}")
+    modes = [(), ("--reader", "mmap"), ("--workers", "2"), ("--workers", "2", "--reader", "mmap")]
+    for extra in modes:
+        assert counts("none", *extra) == expected, extra
+    for bucket in ("none", "hour"):
+        cache = ["--cache-dir", str(tmp_path / f"cache-{bucket}")]
+        assert counts(bucket, *cache) == counts(bucket, *cache) == expected  # budowa + odczyt .lcol
+
+
+def test_bad_filter_options(tmp_path):
+    assert parse_status_filter("5XX, 404") == ("5xx", "404")
+    for args in (["--status", "6xx"], ["--method", "FETCH"]):
+        result = runner.invoke(app, ["main", "--input", str(BIG), "--outdir", str(tmp_path), *args])
+        assert result.exit_code == 2
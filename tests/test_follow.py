@@ -0,0 +1,116 @@
+# === TESTY TRYBU --follow ===
+# Cel: tail -F (dopisywanie, rotacja, obcięcie) i statystyki z przesuwnego okna czasu.
+#
+# WYMAGANIA:
+# - follow_log_lines: niedokończona linia czeka na '\n'; po rotacji nowy plik od początku.
+# - RollingWindow: wygaszanie szczelin, rekordy spóźnione pomijane, sumy zgodne z brute force.
+# - CLI --follow --follow-for kończy się kodem 0 i wypisuje statystyki okna.
+
+import os
+import random
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from src.analyzer.cli import app
+from src.analyzer.io_reader import follow_log_lines
+from src.analyzer.live import follow_stats
+from src.analyzer.parser import parse_line
+from src.analyzer.window import RollingWindow
+
+runner = CliRunner()
+
+BIG = Path("data/access_big.log")
+
+
+def _drain(lines) -> list[str]:
+    """Linie do najbliższego "pustego" sprawdzenia pliku (None)."""
+    out = []
+    for line in lines:
+        if line is None:
+            return out
+        out.append(line)
+    return out
+
+
+def test_follow_appends_rotation_and_truncation(tmp_path):
+    path = tmp_path / "live.log"
+    path.write_text("old\n", encoding="utf-8")
+    lines = follow_log_lines(path, poll_interval=0.001)
+    assert _drain(lines) == []  # start od końca pliku
+
+    with open(path, "a", encoding="utf-8") as file:
+        file.write("a\nb")
+    assert _drain(lines) == ["a"]
+    with open(path, "a", encoding="utf-8") as file:
+        file.write("c\n")
+    assert _drain(lines) == ["bc"]
+
+    os.rename(path, tmp_path / "live.log.1")
+    assert _drain(lines) == []  # brak pliku: czekanie
+    with open(tmp_path / "live.log.1", "a", encoding="utf-8") as file:
+        file.write("late\n")  # zapis do starego pliku przed przełączeniem
+    path.write_bytes(b"new1\nnew2\xff\n")
+    # stary plik doczytany do końca, potem nowy od początku (z fallbackiem latin-1)
+    assert _drain(lines) == ["late", "new1", "new2\xff"]
+
+    path.write_text("t\n", encoding="utf-8")  # copytruncate: ten sam inode, krótszy plik
+    assert _drain(lines) == ["t"]
+    lines.close()
+
+
+def test_rolling_window_matches_brute_force():
+    rng = random.Random(5)
+    window = RollingWindow(seconds=30, resolution=2)
+    accepted, late, head, t = [], 0, None, 1_000_000
+    for _ in range(5_000):
+        t += rng.choice((0, 0, 1, 3))
+        epoch = t - rng.choice((0, 0, 0, 5, 40))  # część spóźniona, część starsza niż okno
+        ip, status = f"10.0.0.{rng.randrange(20)}", rng.choice((200, 200, 404, 500, 503))
+        window.add(epoch, status, ip)
+        slot = epoch // 2
+        head = slot if head is None else max(head, slot)
+        if slot <= head - window.slots:
+            late += 1
+        else:
+            accepted.append((slot, status, ip))
+
+        if rng.random() < 0.01:
+            inside = [(st, ip) for sl, st, ip in accepted if sl > head - window.slots]
+            snap = window.snapshot(top=3)
+            assert snap["requests"] == len(inside) and window.late == late
+            assert window.errors == sum(1 for st, _ in inside if st >= 500)
+            expected = Counter(ip for _, ip in inside)
+            assert window.ips == expected
+            assert snap["top_ips"] == sorted(expected.items(), key=lambda kv: (-kv[1], kv[0]))[:3]
+
+    window.snapshot(now=t + 1000)  # przestój dłuższy niż okno: wszystko wygasa
+    assert window.requests == window.errors == 0 and not window.ips
+    with pytest.raises(ValueError):
+        RollingWindow(0)
+
+
+def test_follow_stats_replays_window():
+    recs = [r for r in map(parse_line, BIG.read_text(encoding="utf-8").splitlines()) if r]
+    epochs = [int(r["ts"].timestamp()) for r in recs]
+    latest = max(epochs)
+    expected = sum(1 for e in epochs if e > latest - 60)
+    out: list[str] = []
+    follow_stats(BIG, window=60, interval=0.05, from_start=True, emit=out.append,
+                 duration=0.3, poll_interval=0.01)
+    # pierwsza emisja może paść w trakcie doczytywania pliku (wolna maszyna) - liczy się ostatnia
+    assert out and f"ostatnie 60s: {expected} żądań" in out[-1]
+    assert "top IP: " in out[-1] and "5xx " in out[-1]
+
+
+def test_cli_follow_for(tmp_path):
+    path = tmp_path / "c.log"
+    path.write_bytes(BIG.read_bytes()[:2000])
+    result = runner.invoke(app, ["main", "--input", str(path), "--outdir", str(tmp_path), "--follow", "--follow-for", "0.3",
+                                 "--interval", "0.1", "--window", "10"])
+    assert result.exit_code == 0, result.output
+    assert "ostatnie 10s: 0 żądań, 0.00 req/s, 5xx 0.0%, top IP: -" in result.stdout
+    gz = runner.invoke(app, ["main", "--input", str(path), "--outdir", str(tmp_path), str(path), "--follow"])
+    assert gz.exit_code == 2
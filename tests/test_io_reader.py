@@ -1,7 +1,18 @@
 # tests/test_io_reader.py
+import bz2
+import gzip
+import io
+import lzma
+import os
+import sys
+import threading
+import time
+
 import pytest
 from pathlib import Path
-from src.analyzer.io_reader import read_log_lines
+from src.analyzer.io_reader import (
+    ReadStats, check_encoding, detect_compression, expand_inputs, read_line_range, read_log_lines, read_log_lines_mmap,
+)
 
 
 def test_lines_are_in_same_order():
@@ -99,3 +110,234 @@ def test_encoding_fallback_utf8_to_latin1(tmp_path):
     assert len(lines) == 3
     assert "Simple line" == lines[0]
     assert "End line" == lines[2]
+
+
+def test_fallback_deep_in_file_does_not_reyield(tmp_path):
+    """Sprawdza, że błąd UTF-8 w środku pliku nie powoduje ponownego zwrócenia wcześniejszych linii."""
+    file_path = tmp_path / "deep_error.log"
+    good = [f"line {i} zażółć".encode("utf-8") for i in range(100)]
+    content = b"\n".join(good[:50] + [b"caf\xe9 latin1"] + good[50:]) + b"\n"
+    file_path.write_bytes(content)
+
+    stats = ReadStats()
+    lines = list(read_log_lines(file_path, encoding="utf-8", stats=stats))
+    assert len(lines) == 101
+    assert lines[0] == "line 0 zażółć"  # linie UTF-8 nadal dekodowane w UTF-8
+    assert lines[50] == "café latin1"
+    assert lines[100] == "line 99 zażółć"
+    assert stats.lines == 101
+    assert stats.fallback_lines == 1
+
+
+def test_fallback_respects_limit(tmp_path):
+    """Sprawdza, że limit liczy linie raz, także po fallbacku."""
+    file_path = tmp_path / "limit_fallback.log"
+    file_path.write_bytes(b"a\n\xff\nb\nc\n")
+    assert list(read_log_lines(file_path, limit=3)) == ["a", "\xff", "b"]
+
+
+# === READER MMAP ===
+
+def test_mmap_lines_equal_text_lines():
+    """Sprawdza, że reader mmap zwraca te same linie (jako bajty) co read_log_lines."""
+    path = Path("data/access_big.log")
+    expected = [line.encode("utf-8") for line in read_log_lines(path)]
+    assert list(read_log_lines_mmap(path)) == expected
+
+
+@pytest.mark.parametrize("limit", [None, 0, 1, 2, 1000])
+def test_mmap_limit_same_as_text(limit):
+    """Sprawdza, że limit w mmap ma tę samą semantykę co w read_log_lines."""
+    path = Path("data/access_small.log")
+    assert len(list(read_log_lines_mmap(path, limit=limit))) == len(list(read_log_lines(path, limit=limit)))
+
+
+def test_mmap_empty_file(tmp_path):
+    """Sprawdza, że pusty plik (którego nie da się zmapować) daje pustą listę."""
+    empty_file = tmp_path / "empty.log"
+    empty_file.write_bytes(b"")
+    assert list(read_log_lines_mmap(empty_file)) == []
+
+
+def test_mmap_errors():
+    """Sprawdza błędy mmap: brak pliku i ujemny limit."""
+    with pytest.raises(FileNotFoundError):
+        _ = list(read_log_lines_mmap(Path("data/__no_such__.log")))
+    with pytest.raises(ValueError):
+        _ = list(read_log_lines_mmap(Path("data/access_small.log"), limit=-1))
+
+
+def test_mmap_last_line_without_newline(tmp_path):
+    """Sprawdza, że ostatnia linia bez '\\n' oraz CRLF są obsłużone jak w trybie tekstowym."""
+    file_path = tmp_path / "crlf.log"
+    file_path.write_bytes(b"a\r\n\nb  \nc")
+    assert list(read_log_lines_mmap(file_path)) == [b"a", b"", b"b", b"c"]
+
+
+# === KOŃCE LINII I KODOWANIE (readery bajtowe) ===
+
+BARE_CR_DATA = b"a\rb\r\nc\n\rd\r\re"  # samotne '\r', CRLF, '\n' i ostatnia linia bez końca
+
+
+def test_bare_cr_splits_like_text_mode(tmp_path):
+    """Samotne '\r' dzieli linie jak tryb tekstowy (universal newlines) we wszystkich readerach."""
+    file_path = tmp_path / "mac.log"
+    file_path.write_bytes(BARE_CR_DATA)
+    with file_path.open(encoding="utf-8") as f:
+        expected = [line.rstrip() for line in f]
+    gz_path = tmp_path / "mac.log.gz"
+    gz_path.write_bytes(_compress("gzip", BARE_CR_DATA))
+
+    assert expected == ["a", "b", "c", "", "d", "", "e"]
+    assert list(read_log_lines(file_path)) == expected
+    assert list(read_log_lines(gz_path)) == expected
+    assert list(read_line_range(file_path, 0, len(BARE_CR_DATA))) == expected
+    assert list(read_log_lines_mmap(file_path)) == [line.encode() for line in expected]
+    assert list(read_log_lines(file_path, limit=3)) == expected[:3]
+    assert list(read_log_lines_mmap(file_path, limit=3)) == [b"a", b"b", b"c"]
+
+
+@pytest.mark.parametrize("encoding", ["utf-16", "utf-16-le", "utf-32", "cp037"])
+def test_non_ascii_compatible_encoding_rejected(tmp_path, encoding):
+    """Kodowania niezgodne z ASCII (podział na b"\\n" przed dekodowaniem) -> czytelny ValueError."""
+    file_path = tmp_path / "wide.log"
+    file_path.write_bytes("a\nb\n".encode(encoding))
+    with pytest.raises(ValueError, match="nie jest zgodne z ASCII"):
+        _ = list(read_log_lines(file_path, encoding=encoding))
+
+
+def test_ascii_compatible_and_unknown_encodings():
+    for encoding in ("utf-8", "utf-8-sig", "latin-1", "cp1250", "ascii"):
+        check_encoding(encoding)
+    with pytest.raises(ValueError, match="Nieznane kodowanie"):
+        check_encoding("no-such-codec")
+
+
+# === WEJŚCIE SKOMPRESOWANE ===
+
+def _compress(kind: str, data: bytes) -> bytes:
+    if kind == "gzip":
+        return gzip.compress(data)
+    if kind == "bz2":
+        return bz2.compress(data)
+    if kind == "xz":
+        return lzma.compress(data)
+    zstandard = pytest.importorskip("zstandard")
+    return zstandard.ZstdCompressor().compress(data)
+
+
+@pytest.mark.parametrize("kind", ["gzip", "bz2", "xz", "zstd"])
+def test_compressed_file_same_lines_as_plain(tmp_path, kind):
+    """Sprawdza, że plik skompresowany (rozpoznany po magicznych bajtach) daje te same linie."""
+    plain = Path("data/access_big.log")
+    file_path = tmp_path / "access.log.1"  # celowo bez rozszerzenia .gz itd.
+    file_path.write_bytes(_compress(kind, plain.read_bytes()))
+
+    assert detect_compression(file_path) == kind
+    assert list(read_log_lines(file_path)) == list(read_log_lines(plain))
+
+
+def test_compressed_lines_split_across_blocks(tmp_path, monkeypatch):
+    """Sprawdza składanie linii przeciętych granicą bloku dekompresji + limit."""
+    import src.analyzer.io_reader as io_reader
+    monkeypatch.setattr(io_reader, "DECOMPRESS_BLOCK_BYTES", 7)
+    file_path = tmp_path / "small.log.gz"
+    file_path.write_bytes(_compress("gzip", b"alpha\nbeta\n\ngamma delta\nomega"))
+
+    assert list(read_log_lines(file_path)) == ["alpha", "beta", "", "gamma delta", "omega"]
+    assert list(read_log_lines(file_path, limit=2)) == ["alpha", "beta"]
+
+
+def test_truncated_gzip_raises_oserror(tmp_path):
+    """Sprawdza, że ucięty plik .gz kończy się OSError (CLI: kod 5), a nie zawieszeniem."""
+    file_path = tmp_path / "truncated.log.gz"
+    file_path.write_bytes(_compress("gzip", Path("data/access_big.log").read_bytes())[:2000])
+    with pytest.raises(OSError):
+        _ = list(read_log_lines(file_path))
+
+
+@pytest.mark.parametrize("kind", ["gzip", "zstd"])
+def test_corrupt_compressed_stream_raises_not_truncates(tmp_path, kind):
+    """Błąd dekompresora w wątku (zlib.error, ZstdError) nie może wyglądać jak koniec pliku."""
+    blob = bytearray(_compress(kind, Path("data/access_big.log").read_bytes()))
+    if kind == "gzip":
+        blob[10] ^= 0xA5  # początek strumienia deflate -> zlib.error (nie CRC / EOF)
+    else:
+        blob[len(blob) // 2:len(blob) // 2 + 64] = bytes(64)  # -> zstandard.ZstdError
+    file_path = tmp_path / f"corrupt.{kind}"
+    file_path.write_bytes(bytes(blob))
+    with pytest.raises(OSError):
+        _ = list(read_log_lines(file_path))
+
+
+def test_read_ahead_close_does_not_hang_on_blocked_read(monkeypatch):
+    """Konsument kończy wcześniej, a producent wisi w read (potok bez danych) - close() nie czeka w nieskończoność."""
+    import src.analyzer.io_reader as io_reader
+    monkeypatch.setattr(io_reader, "READ_AHEAD_JOIN_SECONDS", 0.2)
+    release = threading.Event()
+
+    class BlockingStream:
+        def __init__(self):
+            self.calls = 0
+
+        def read(self, size):
+            self.calls += 1
+            if self.calls == 1:
+                return b"first\n"
+            release.wait(30)
+            return b""
+
+    blocks = io_reader._ReadAheadBlocks(BlockingStream())
+    assert next(iter(blocks)) == b"first\n"
+    started = time.monotonic()
+    blocks.close()
+    assert time.monotonic() - started < 5
+    release.set()
+
+
+def test_plain_file_not_detected_as_compressed():
+    assert detect_compression(Path("data/access_small.log")) is None
+
+
+# === WEJŚCIE STRUMIENIOWE (stdin "-", potok nazwany) ===
+
+def _fake_stdin(monkeypatch, data: bytes) -> None:
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(data)))
+
+
+@pytest.mark.parametrize("kind", [None, "gzip"])
+def test_stdin_same_lines_as_file(tmp_path, monkeypatch, kind):
+    """Sprawdza, że stdin (małe bloki, kompresja po peek) daje te same linie i ten sam fallback co plik."""
+    data = Path("data/access_big.log").read_bytes() + b"\xe9 latin\r\nlast line without newline"
+    file_path = tmp_path / "access.log"
+    file_path.write_bytes(data)
+    _fake_stdin(monkeypatch, data if kind is None else _compress(kind, data))
+
+    file_stats, stdin_stats = ReadStats(), ReadStats()
+    expected = list(read_log_lines(file_path, stats=file_stats))
+    assert list(read_log_lines(Path("-"), stats=stdin_stats, read_size=7)) == expected
+    assert stdin_stats.fallback_lines == file_stats.fallback_lines == 1
+    assert detect_compression(Path("-")) is None  # nie czyta (i nie zabiera) danych ze strumienia
+
+
+def test_stream_rejects_byte_range(monkeypatch):
+    _fake_stdin(monkeypatch, b"a\nb\n")
+    with pytest.raises(ValueError):
+        _ = list(read_log_lines(Path("-"), start=2))
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="potoki nazwane tylko w POSIX")
+def test_named_pipe_lines_and_expand(tmp_path):
+    """Sprawdza odczyt potoku nazwanego (pisarz w wątku) i akceptację przez expand_inputs."""
+    fifo = tmp_path / "access.pipe"
+    os.mkfifo(fifo)
+    data = Path("data/access_small.log").read_bytes()
+    assert expand_inputs([str(fifo), "-"]) == [fifo.resolve(), Path("-")]
+
+    writer = threading.Thread(target=fifo.write_bytes, args=(data,))
+    writer.start()
+    try:
+        lines = list(read_log_lines(fifo, read_size=64))
+    finally:
+        writer.join()
+    assert lines == list(read_log_lines(Path("data/access_small.log")))
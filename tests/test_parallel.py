@@ -0,0 +1,107 @@
+# === TESTY TRYBU RÓWNOLEGŁEGO ===
+# Cel: --workers N daje dokładnie te same wyniki co tryb szeregowy.
+#
+# WYMAGANIA:
+# - split_byte_ranges: zakresy rozłączne, pokrywają plik, granice tuż za '\n'.
+# - read_line_range: suma linii z zakresów == read_log_lines (ta sama kolejność).
+# - parse_parallel: zsumowane ok/bad == process_lines na całym pliku.
+# - CLI: podsumowanie z --workers 2 identyczne jak bez --workers.
+
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from src.analyzer.cli import app
+from src.analyzer.io_reader import (
+    read_line_range,
+    read_log_lines,
+    read_log_lines_mmap,
+    split_byte_ranges,
+)
+from src.analyzer.parallel import parse_parallel
+from src.analyzer.pipeline import process_lines
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def mixed_log(tmp_path) -> Path:
+    """access_big.log przeplatany błędnymi liniami z corrupted.log."""
+    good = Path("data/access_big.log").read_text(encoding="utf-8").splitlines()
+    bad = Path("data/corrupted.log").read_text(encoding="utf-8").splitlines()
+    lines = []
+    for i, line in enumerate(good):
+        lines.append(line)
+        if i % 500 == 0:
+            lines.append(bad[i % len(bad)])
+    path = tmp_path / "mixed.log"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("parts", [1, 2, 7, 64])
+def test_ranges_cover_file_and_align_to_newlines(mixed_log: Path, parts: int):
+    data = mixed_log.read_bytes()
+    ranges = split_byte_ranges(mixed_log, parts)
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert data[start - 1:start] == b"\n"
+
+
+def test_ranges_of_empty_file(tmp_path):
+    path = tmp_path / "empty.log"
+    path.write_bytes(b"")
+    assert split_byte_ranges(path, 4) == []
+
+
+def test_range_lines_equal_serial_lines(mixed_log: Path):
+    expected = list(read_log_lines(mixed_log))
+    got = []
+    for start, end in split_byte_ranges(mixed_log, 9):
+        got.extend(read_line_range(mixed_log, start, end))
+    assert got == expected
+
+
+def test_mmap_range_lines_equal_serial_lines(mixed_log: Path):
+    expected = list(read_log_lines_mmap(mixed_log))
+    got = []
+    for start, end in split_byte_ranges(mixed_log, 9):
+        got.extend(read_log_lines_mmap(mixed_log, start=start, end=end))
+    assert got == expected
+
+
+def test_parse_parallel_counts_match_serial(mixed_log: Path):
+    serial = process_lines(read_log_lines(mixed_log))
+    chunks = list(parse_parallel(mixed_log, workers=2))
+    assert sum(c.lines for c in chunks) == serial.lines
+    assert sum(c.ok for c in chunks) == serial.ok
+    assert sum(c.bad for c in chunks) == serial.bad
+    assert serial.bad > 0
+
+
+def test_cli_workers_summary_matches_serial(tmp_path, mixed_log: Path):
+    serial = runner.invoke(app, ["main", "--input", str(mixed_log), "--outdir", str(tmp_path), "--quiet"])
+    parallel = runner.invoke(app, ["main", "--input", str(mixed_log), "--outdir", str(tmp_path), "--quiet", "--workers", "2"])
+    assert serial.exit_code == 0
+    assert parallel.exit_code == 0
+    assert parallel.stdout == serial.stdout
+
+
+def test_cli_workers_mmap_summary_matches_serial(tmp_path, mixed_log: Path):
+    serial = runner.invoke(app, ["main", "--input", str(mixed_log), "--outdir", str(tmp_path), "--quiet"])
+    parallel = runner.invoke(
+        app, ["main", "--input", str(mixed_log), "--outdir", str(tmp_path), "--quiet", "--workers", "2", "--reader", "mmap"]
+    )
+    assert parallel.exit_code == 0
+    assert parallel.stdout == serial.stdout
+
+
+def test_cli_workers_strict_stops_on_first_bad_line(tmp_path, mixed_log: Path):
+    args = ["main", "--input", str(mixed_log), "--outdir", str(tmp_path), "--fail-policy", "strict"]
+    serial = runner.invoke(app, args)
+    parallel = runner.invoke(app, args + ["--workers", "2"])
+    assert parallel.exit_code == serial.exit_code == 1
+    assert parallel.stderr == serial.stderr
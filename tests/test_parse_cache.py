@@ -0,0 +1,126 @@
+# === TESTY PAMIĘCI PODRĘCZNEJ PARSOWANIA (--cache-dir) ===
+# Cel: kolumny z wpisu .lcol dają ten sam raport co parsowanie; klucz i LRU działają.
+#
+# WYMAGANIA:
+# - Pierwszy przebieg buduje wpis, kolejny go mapuje (bez parse_line) - raport identyczny.
+# - Zmiana pliku (mtime / rozmiar) -> nowy wpis; uszkodzony wpis -> przebudowa.
+# - Suma rozmiarów wpisów <= limit; usuwane są najdawniej używane.
+
+import os
+from functools import partial
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from src.analyzer import parse_cache
+from src.analyzer.aggregator import Aggregator
+from src.analyzer.cli import app
+from src.analyzer.parse_cache import CACHE_SUFFIX, ParseCache
+from src.analyzer.pipeline import process_file
+
+runner = CliRunner()
+
+BIG = Path("data/access_big.log")
+CORRUPTED = Path("data/corrupted.log")
+
+
+def _factory():
+    return partial(Aggregator, "minute", unique_fields=("remote_host",), size_quantiles=(0.5, 0.99))
+
+
+def test_cached_columns_match_parsing(tmp_path, monkeypatch):
+    log = tmp_path / "mixed.log"
+    log.write_bytes(BIG.read_bytes() + CORRUPTED.read_bytes() + b"caf\xe9 not a log line\n")
+    expected = process_file(log, quiet=True, aggregator_factory=_factory())
+    cache = ParseCache(tmp_path / "cache")
+
+    built = process_file(log, cache=cache, aggregator_factory=_factory())
+    entries = list((tmp_path / "cache").glob("*" + CACHE_SUFFIX))
+    assert len(entries) == 1
+
+    monkeypatch.setattr(parse_cache, "parse_batch", None)  # trafienie nie może parsować
+    hit = process_file(log, cache=cache, aggregator_factory=_factory())
+    for result in (built, hit):
+        assert (result.lines, result.ok, result.bad, result.fallback_lines) == \
+               (expected.lines, expected.ok, expected.bad, expected.fallback_lines)
+        assert result.aggregator.summary(5) == expected.aggregator.summary(5)
+
+    since, until = 1696938960, 1696939000
+    filtered = process_file(log, cache=cache, aggregator_factory=_factory(), time_range=(since, until))
+    plain = process_file(log, quiet=True, aggregator_factory=_factory(), time_range=(since, until))
+    assert (filtered.ok, filtered.filtered) == (plain.ok, plain.filtered)
+    assert filtered.aggregator.summary(5) == plain.aggregator.summary(5)
+
+
+def test_key_invalidation_and_corruption(tmp_path):
+    log = tmp_path / "a.log"
+    log.write_bytes(BIG.read_bytes()[:5000])
+    cache = ParseCache(tmp_path / "c")
+    first = cache.entry_path(log, "utf-8")
+    cache.build(log, "utf-8").close()
+    assert cache.load(log, "utf-8") is not None
+
+    with open(log, "ab") as file:
+        file.write(BIG.read_bytes()[5000:6000])
+    assert cache.entry_path(log, "utf-8") != first and cache.load(log, "utf-8") is None
+
+    cache.build(log, "utf-8").close()
+    entry = cache.entry_path(log, "utf-8")
+    entry.write_bytes(entry.read_bytes()[:100])  # ucięty wpis
+    assert cache.load(log, "utf-8") is None and not entry.exists()
+
+
+def test_lru_eviction_respects_cap(tmp_path):
+    logs = []
+    for i in range(3):
+        log = tmp_path / f"{i}.log"
+        log.write_bytes(BIG.read_bytes()[: 20_000 * (i + 1)])
+        logs.append(log)
+    probe = ParseCache(tmp_path / "probe")
+    sizes = []
+    for log in logs:
+        probe.build(log).close()
+        sizes.append(probe.entry_path(log, "utf-8").stat().st_size)
+
+    cache = ParseCache(tmp_path / "lru", max_bytes=sizes[0] + sizes[1] + 10)
+    cache.build(logs[0]).close()
+    cache.build(logs[1]).close()
+    os.utime(cache.entry_path(logs[1], "utf-8"), ns=(1, 1))  # logs[1] najdawniej używany
+    cache.load(logs[0]).close()
+    cache.build(logs[2]).close()
+    remaining = {p.name for p in (tmp_path / "lru").iterdir()}
+    assert cache.entry_path(logs[1], "utf-8").name not in remaining
+    assert cache.entry_path(logs[2], "utf-8").name in remaining
+    assert sum(p.stat().st_size for p in (tmp_path / "lru").iterdir()) <= cache.max_bytes
+
+
+def test_cli_cache_dir_same_report(tmp_path):
+    base = ["main", "--input", str(BIG), "--outdir", str(tmp_path), "--quiet", "--top", "3", "--quantiles", "0.5"]
+    plain = runner.invoke(app, base)
+    cached = [runner.invoke(app, base + ["--cache-dir", str(tmp_path), "--workers", "2"]) for _ in range(2)]
+    for result in cached:
+        assert result.exit_code == 0, result.output
+        assert result.stdout == plain.stdout
+    assert runner.invoke(app, base + ["--cache-dir", str(tmp_path), "--cache-size", "big"]).exit_code == 2
+
+
+def test_cached_entry_closed_when_aggregation_fails(tmp_path, monkeypatch):
+    """Wyjątek z agregatora (albo filtra) nie zostawia otwartej mapy wpisu .lcol."""
+    cache = ParseCache(tmp_path)
+    process_file(BIG, aggregator_factory=_factory(), cache=cache)  # buduje wpis
+    closed = []
+    real_close = parse_cache.CachedColumns.close
+    monkeypatch.setattr(parse_cache.CachedColumns, "close", lambda self: (closed.append(True), real_close(self)))
+
+    def add_batch(batch):
+        raise RuntimeError("boom")
+
+    def failing():
+        aggregator = _factory()()
+        aggregator.add_batch = add_batch
+        return aggregator
+
+    with pytest.raises(RuntimeError, match="boom"):
+        process_file(BIG, aggregator_factory=failing, cache=cache)
+    assert closed == [True]
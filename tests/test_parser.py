@@ -7,7 +7,13 @@ import pytest
 from datetime import datetime, timezone
 from pathlib import Path
 
-from src.analyzer.parser import parse_line, MAX_LINE_LEN
+from src.analyzer.parser import (
+    MAX_LINE_LEN,
+    parse_line,
+    parse_line_bytes,
+    parse_timestamp,
+    parse_timestamp_epoch,
+)
 
 
 # === UTIL ====================================================================
@@ -255,3 +261,269 @@ def test_policy_strict_raises_valueerror():
     """Policy(strict): invalid method raises ValueError."""
     with pytest.raises(ValueError):
         parse_line(mk_line(method="TF"), fail_policy="strict")
+
+
+# === BYTES ENTRY POINT =======================================================
+
+def test_bytes_entry_point_matches_str_on_access_big(data_dir: Path):
+    """Bytes: parse_line_bytes gives the same result as parse_line for every sample line."""
+    raw_lines = (data_dir / "access_big.log").read_bytes().splitlines()
+    for raw in raw_lines:
+        assert parse_line_bytes(raw) == parse_line(raw.decode("utf-8"))
+
+
+def test_bytes_entry_point_latin1_fallback_for_field():
+    """Bytes: a field that is not valid UTF-8 is decoded with latin-1."""
+    raw = mk_line(user_agent="caf\u00e9").encode("latin-1")
+    out = parse_line_bytes(raw, fail_policy="strict")
+    assert out["user_agent"] == "caf\u00e9"
+
+
+def test_bytes_entry_point_errors_match_str():
+    """Bytes: validation errors are the same as in parse_line."""
+    with pytest.raises(ValueError, match="status: out of range"):
+        parse_line_bytes(mk_line(status="600").encode(), fail_policy="strict")
+    assert parse_line_bytes(b"BADLINE", fail_policy="skip") is None
+
+
+
+def test_bytes_ascii_line_skips_per_field_decoding(monkeypatch):
+    """Bytes: ASCII lines take the str fast path (no per-field decoding), others decode only fields."""
+    import src.analyzer.parser as parser_mod
+
+    decoded = []
+    decode_fields = parser_mod._decode_fields
+    monkeypatch.setattr(
+        parser_mod, "_decode_fields", lambda fields, enc: decoded.append(fields) or decode_fields(fields, enc)
+    )
+    ascii_line, utf8_line = mk_line(), mk_line(user_agent="Mozilla \u017c\u00f3\u0142w")
+    for line in (ascii_line, utf8_line):
+        for as_record in (False, True):
+            assert parse_line_bytes(line.encode(), as_record=as_record) == parse_line(line, as_record=as_record)
+    assert len(decoded) == 2  # only the UTF-8 line, once for the dict and once for the LogRecord
+
+# === FAST PATH ===============================================================
+
+def _regex_only(line: str):
+    """Reference result of the regex path (fast path disabled)."""
+    import src.analyzer.parser as parser_mod
+    text = line.rstrip("\r\n")
+    match = parser_mod.PRECOMPILED_COMBINED_RE.fullmatch(text)
+    if not match:
+        raise ValueError("line: bad shape")
+    return parser_mod._build_record(*match.groups())
+
+
+def _outcome(fn, line: str):
+    try:
+        return ("ok", fn(line))
+    except (ValueError, OverflowError) as exc:
+        return ("error", str(exc))
+
+
+FAST_PATH_VARIANTS = [
+    mk_line(),
+    mk_line(protocol=""),
+    mk_line(size="-", referrer="-", user_agent="-"),
+    mk_line(identd="ident", user="bob"),
+    mk_line(method="get"),
+    mk_line(method="GETS"),
+    mk_line(status="600"),
+    mk_line(status="099"),
+    mk_line(ts="10/Oct/2000:99:00:00 +0000"),
+    mk_line(ts="31/Feb/2000:10:00:00 +0000"),
+    mk_line(ts="10/Xyz/2000:10:00:00 +0000"),
+    mk_line(ts="10/Oct/2000:10:00:00 +1500"),
+    mk_line(ts="01/Jan/0001:00:00:00 +0100"),
+    mk_line(ts="10/Oct/2000:10:00:00  +0000"),
+    mk_line(ts="1/Oct/2000:10:00:00 +0000"),
+    mk_line(protocol="HTTP/2"),
+    mk_line(protocol="HTP/1.1"),
+    mk_line(remote_host="256.1.1.1"),
+    mk_line(remote_host="01.1.1.1"),
+    mk_line(user_agent='Mozilla \\"quoted\\"'),
+    mk_line(path="/a]b[c"),
+    mk_line(user="[x"),
+    mk_line(user_agent="zażółć"),
+    mk_line().replace(" 200 ", "  200 "),
+    mk_line().replace(" 200 ", "\t200 "),
+    mk_line().replace('" "', '"  "'),
+    mk_line() + " ",
+    mk_line(size="0012"),
+    mk_line(size="1_0"),
+    mk_line(status="2_0"),
+    "  " + mk_line(),
+]
+
+
+@pytest.mark.parametrize("line", FAST_PATH_VARIANTS)
+def test_fast_path_same_outcome_as_regex(line: str):
+    """Fast path: result or error message is identical to the regex path."""
+    assert _outcome(lambda text: parse_line(text, fail_policy="strict"), line) == _outcome(_regex_only, line)
+
+
+def test_fast_path_same_outcome_on_sample_files(data_dir: Path):
+    """Fast path: every line of the sample logs parses exactly like the regex path."""
+    for name in ("access_big.log", "access_small.log", "corrupted.log"):
+        for line in (data_dir / name).read_text(encoding="utf-8").splitlines():
+            assert _outcome(lambda text: parse_line(text, fail_policy="strict"), line) == _outcome(_regex_only, line)
+
+
+def test_fast_path_handles_common_lines(data_dir: Path):
+    """Fast path: well-formed sample lines do not need the regex fallback."""
+    from src.analyzer.parser import _parse_fast
+    lines = (data_dir / "access_big.log").read_text(encoding="utf-8").splitlines()
+    accepted = sum(_parse_fast(line) is not None for line in lines)
+    assert accepted >= len(lines) - 1  # first line has leading spaces (regex: bad shape)
+
+
+def test_fast_path_fuzz_same_outcome_as_regex():
+    """Fast path: random single-character mutations never diverge from the regex path."""
+    import random
+    rng = random.Random(1234)
+    alphabet = ' "\\[]-0159a/:+.\tZ'
+    base = mk_line(ts="29/Feb/2004:23:59:59 +1400", size="512", referrer="-")
+    for _ in range(3000):
+        chars = list(base)
+        for _ in range(rng.randint(1, 3)):
+            chars[rng.randrange(len(chars))] = rng.choice(alphabet)
+        line = "".join(chars)
+        assert _outcome(lambda text: parse_line(text, fail_policy="strict"), line) == _outcome(_regex_only, line), line
+
+
+# === TIMESTAMP MEMOIZATION ===================================================
+
+def test_ts_cache_does_not_hide_errors_for_same_minute():
+    """Memo: a cached minute prefix never turns an invalid seconds field into a valid timestamp."""
+    assert parse_timestamp("10/Oct/2023:13:55:36 +0200") == datetime(2023, 10, 10, 11, 55, 36, tzinfo=timezone.utc)
+    with pytest.raises(ValueError, match="ts: bad time component"):
+        parse_timestamp("10/Oct/2023:13:55:60 +0200")
+    with pytest.raises(ValueError, match="ts: bad timestamp format"):
+        parse_timestamp("10/Oct/2023:13:55:3x +0200")
+    with pytest.raises(ValueError, match="ts: bad timestamp format"):
+        parse_timestamp("10/Oct/2023:13:55-36 +0200")
+    # errors are not cached either: asking twice gives the same error
+    with pytest.raises(ValueError, match="ts: bad time component"):
+        parse_timestamp("10/Oct/2023:13:55:60 +0200")
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "10/Oct/2023:13:55:36 +0200",
+        "10/Oct/2023:13:55:37 +0200",
+        " 10/oct/2023:13:55:59 +0200 ",
+        "29/Feb/2004:23:59:59 +1400",
+        "01/Jan/1970:00:00:00 +0000",
+        "31/Dec/1969:23:59:59 -0000",
+        "15/Jun/1800:12:00:00 -0930",
+    ],
+)
+def test_ts_epoch_and_datetime_agree(raw: str):
+    """Memo: parse_timestamp_epoch and parse_timestamp describe the same instant (also pre-1970)."""
+    dt = parse_timestamp(raw)
+    assert dt.tzinfo is timezone.utc
+    assert parse_timestamp_epoch(raw) == int((dt - datetime(1970, 1, 1, tzinfo=timezone.utc)).total_seconds())
+
+
+def test_ts_epoch_errors_match_parse_timestamp():
+    """Memo: the epoch entry point raises the same diagnostics."""
+    with pytest.raises(ValueError, match="ts: invalid calendar date"):
+        parse_timestamp_epoch("31/Feb/2001:00:00:00 +0000")
+    with pytest.raises(ValueError, match="ts: bad tz offset"):
+        parse_timestamp_epoch("01/Feb/2001:00:00:00 +1500")
+
+
+# === COMPACT RECORDS =========================================================
+
+@pytest.mark.parametrize("line", FAST_PATH_VARIANTS)
+def test_record_same_outcome_as_dict(line: str):
+    """as_record=True: same fields (dict-style access) or the same error as the dict result."""
+    as_dict = _outcome(lambda text: parse_line(text, fail_policy="strict"), line)
+    as_record = _outcome(lambda text: parse_line(text, fail_policy="strict", as_record=True), line)
+    assert as_record == as_dict
+
+
+def test_record_matches_dict_on_sample_files(data_dir: Path):
+    """as_record=True: str and bytes entry points agree with the dict contract."""
+    for line in (data_dir / "access_big.log").read_text(encoding="utf-8").splitlines():
+        rec = parse_line(line, as_record=True)
+        assert rec == parse_line(line)
+        assert parse_line_bytes(line.encode("utf-8"), as_record=True) == rec
+
+
+def test_record_fields_and_lazy_ts():
+    """LogRecord: attributes, int epoch, datetime ts on access, Mapping helpers."""
+    from src.analyzer.record import LogRecord
+    rec = parse_line(mk_line(size="-"), as_record=True)
+    assert isinstance(rec, LogRecord)
+    assert not hasattr(rec, "__dict__")
+    assert rec.epoch == 971211336 and isinstance(rec.epoch, int)
+    assert rec.ts == rec["ts"] == datetime(2000, 10, 10, 20, 55, 36, tzinfo=timezone.utc)
+    assert rec.status == rec["status"] == 200
+    assert rec.get("size") is None and rec.get("missing", "x") == "x"
+    assert "path" in rec and "epoch" not in rec
+    assert rec.to_dict() == dict(rec) == parse_line(mk_line(size="-"))
+    with pytest.raises(KeyError):
+        rec["epoch"]
+
+
+def test_record_pickles_roundtrip():
+    """LogRecord: survives pickling (results returned from worker processes)."""
+    import pickle
+    rec = parse_line(mk_line(), as_record=True)
+    assert pickle.loads(pickle.dumps(rec)) == rec
+
+
+# === COLUMNAR BATCH ==========================================================
+
+def test_batch_columns_match_parse_line(data_dir: Path):
+    """parse_batch: every row decodes back to the parse_line record; bad bitmap marks failures."""
+    from src.analyzer.columns import SIZE_MISSING, ip_to_str
+    from src.analyzer.parser import parse_batch
+    lines = []
+    for name in ("access_big.log", "corrupted.log"):
+        lines += (data_dir / name).read_text(encoding="utf-8").splitlines()
+    batch = parse_batch(lines)
+
+    assert len(batch) == len(lines)
+    assert len(batch.bad) == (len(lines) + 7) // 8
+    for row, line in enumerate(lines):
+        rec = parse_line(line, as_record=True)
+        assert batch.is_bad(row) == (rec is None)
+        if rec is None:
+            continue
+        assert ip_to_str(batch.ip[row]) == rec.remote_host
+        assert batch.ts[row] == rec.epoch
+        assert batch.status[row] == rec.status
+        assert batch.size[row] == (SIZE_MISSING if rec.size is None else rec.size)
+        for column in ("method", "path", "referrer", "user_agent"):
+            assert batch.decode(column, row) == rec[column]
+    assert batch.bad_count == sum(1 for line in lines if parse_line(line) is None)
+    assert list(batch.good_rows()) == [r for r in range(len(lines)) if not batch.is_bad(r)]
+
+
+def test_batch_bytes_and_shared_dictionaries():
+    """parse_batch: bytes lines accepted; shared dictionaries keep codes stable across batches."""
+    from src.analyzer.columns import NULL_CODE, new_dictionaries
+    from src.analyzer.parser import parse_batch
+    dicts = new_dictionaries()
+    first = parse_batch([mk_line(path="/a"), "garbage"], dictionaries=dicts)
+    second = parse_batch([mk_line(path="/b").encode(), mk_line(path="/a", user_agent="-").encode()], dictionaries=dicts)
+
+    assert first.is_bad(1) and not first.is_bad(0) and first.path[1] == NULL_CODE
+    assert first.path[0] == second.path[1] == 0 and second.path[0] == 1
+    assert second.user_agent[1] == NULL_CODE
+    assert second.ip[0] == 0x7F000001
+    assert len(parse_batch([])) == 0
+
+
+def test_batch_to_numpy():
+    """parse_batch: numpy views share the arrays' data (numpy optional)."""
+    np = pytest.importorskip("numpy")
+    from src.analyzer.parser import parse_batch
+    batch = parse_batch([mk_line(status="404"), "bad", mk_line()])
+    cols = batch.to_numpy()
+    assert cols["status"].tolist() == [404, 0, 200]
+    assert cols["bad"].tolist() == [False, True, False]
+    assert cols["ts"].dtype == np.int64
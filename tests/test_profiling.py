@@ -0,0 +1,71 @@
+# === TESTY STATYSTYK I PROFILU (profiling, --stats-json / --profile) ===
+# Cel: pomiar etapów nie zmienia wyników, a statystyki przebiegu są kompletne i spójne.
+#
+# WYMAGANIA:
+# - parse_line_timed == parse_line / parse_line_bytes (str i bytes, dict i LogRecord, with_time).
+# - --stats-json: liczniki jak na stdout, suma przyczyn == błędne linie, te same liczby przy --workers.
+# - --profile: profile.pstats czytelny dla pstats, profile.txt z etapami.
+
+import json
+import pstats
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from src.analyzer.cli import app
+from src.analyzer.parser import parse_line, parse_line_bytes, parse_line_timed
+from src.analyzer.profiling import StageTimings
+
+runner = CliRunner()
+
+BIG = Path("data/access_big.log")
+CORRUPTED = Path("data/corrupted.log")
+
+
+@pytest.mark.parametrize("as_record,with_time", [(False, True), (True, True), (True, False)])
+def test_timed_parse_matches_untimed(as_record, with_time):
+    lines = BIG.read_text(encoding="utf-8").splitlines() + CORRUPTED.read_text(encoding="utf-8").splitlines()
+    timings = StageTimings()
+    bad = 0
+    for line in lines:
+        expected = parse_line(line, as_record=as_record, with_time=with_time)
+        assert parse_line_timed(line, timings, as_record=as_record, with_time=with_time) == expected
+        raw = line.encode("utf-8")
+        assert parse_line_timed(raw, timings, as_record=as_record, with_time=with_time) == parse_line_bytes(
+            raw, as_record=as_record, with_time=with_time
+        )
+        bad += 2 * (expected is None)
+    assert bad > 0
+    assert timings.calls["match"] == 2 * len(lines) and timings.ns["match"] > 0
+
+
+def test_cli_stats_json(tmp_path):
+    results = {}
+    for mode, extra in (("serial", []), ("workers", ["--workers", "2"])):
+        stats_path = tmp_path / f"{mode}.json"
+        result = runner.invoke(app, ["main", "--input", str(CORRUPTED), "--input", str(BIG), "--quiet",
+                                     "--outdir", str(tmp_path), "--stats-json", str(stats_path), *extra])
+        assert result.exit_code == 0, result.output
+        assert f"Statystyki (--stats-json): {stats_path}" in result.stdout
+        results[mode] = stats = json.loads(stats_path.read_text(encoding="utf-8"))
+        assert f"Wczytano {stats['lines']} linii" in result.stdout
+        assert f"Błędnie sparsowane: {stats['bad']} (" in result.stdout
+    serial, workers = results["serial"], results["workers"]
+    assert sum(serial["bad_reasons"].values()) == serial["bad"] > 0
+    assert serial["bad_reasons"] == workers["bad_reasons"]
+    assert serial["input_bytes"] == BIG.stat().st_size + CORRUPTED.stat().st_size
+    assert serial["lines_per_s"] > 0 and serial["peak_rss_mb"] > 0
+    assert serial["stages"]["match"]["calls"] == serial["lines"]
+    assert serial["stages"]["aggregate"]["calls"] == serial["ok"]
+    assert serial["stages"]["report"]["calls"] == 1
+
+
+def test_cli_profile(tmp_path):
+    result = runner.invoke(app, ["main", "--input", str(BIG), "--quiet", "--outdir", str(tmp_path), "--profile"])
+    assert result.exit_code == 0, result.output
+    assert "Profil (--profile): " in result.stdout
+    stats = pstats.Stats(str(tmp_path / "profile.pstats"))
+    assert any(name == "process_lines" for _, _, name in stats.stats)
+    text = (tmp_path / "profile.txt").read_text(encoding="utf-8")
+    assert "Etapy" in text and "Szczyt pamięci (tracemalloc)" in text
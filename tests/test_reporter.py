@@ -0,0 +1,79 @@
+# === TESTY RAPORTÓW (reporter, --format / --outdir / --gzip) ===
+# Cel: raporty TXT/CSV/JSON zapisywane strumieniowo i atomowo, opcjonalnie gzip.
+#
+# WYMAGANIA:
+# - report.json == Aggregator.summary(top) (także z unikalnymi i kwantylami rozmiaru).
+# - report_buckets.csv: jeden wiersz na kubełek czasu, zgodny z histogramem.
+# - report.txt == podsumowanie wypisane na stdout; --gzip -> poprawny plik .gz.
+# - Błąd w trakcie zapisu: poprzedni raport nietknięty, brak plików tymczasowych.
+
+import csv
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from src.analyzer.aggregator import Aggregator
+from src.analyzer.cli import app
+from src.analyzer.parser import parse_line
+from src.analyzer.reporter import atomic_writer, write_report
+
+runner = CliRunner()
+
+BIG = Path("data/access_big.log")
+
+
+@pytest.fixture(scope="module")
+def aggregator():
+    agg = Aggregator("minute", unique_fields=("remote_host",), size_quantiles=(0.5, 0.99))
+    for line in BIG.read_text(encoding="utf-8").splitlines():
+        rec = parse_line(line, as_record=True)
+        if rec is not None:
+            agg.add(rec)
+    return agg
+
+
+def test_json_equals_summary(tmp_path, aggregator):
+    (path,) = write_report(aggregator, tmp_path, "json", top=5)
+    assert path == tmp_path / "report.json"
+    assert json.loads(path.read_text(encoding="utf-8")) == aggregator.summary(5)
+
+
+def test_csv_and_buckets(tmp_path, aggregator):
+    report, buckets = write_report(aggregator, tmp_path, "csv", top=3, compress=True)
+    assert report.name == "report.csv.gz" and buckets.name == "report_buckets.csv.gz"
+
+    with gzip.open(report, "rt", encoding="utf-8", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [(r["key"], int(r["value"])) for r in rows if r["section"] == "top_ips"] == aggregator.top_ips(3)
+    assert {"size_all", "size_status", "size_path", "unique"} <= {r["section"] for r in rows}
+
+    with gzip.open(buckets, "rt", encoding="utf-8", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [(r["bucket"], int(r["requests"])) for r in rows] == aggregator.histogram()
+    assert [int(r["unique_remote_host"]) for r in rows] == [n for _, n in aggregator.unique_per_bucket("remote_host")]
+    assert {"size_count", "size_missing", "size_p50", "size_p99"} <= set(rows[0])
+
+
+def test_atomic_writer_keeps_previous_report(tmp_path):
+    target = tmp_path / "report.txt"
+    target.write_text("stary raport\n", encoding="utf-8")
+    with pytest.raises(RuntimeError):
+        with atomic_writer(target) as out:
+            out.write("niepełny")
+            raise RuntimeError("przerwany zapis")
+    assert target.read_text(encoding="utf-8") == "stary raport\n"
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_cli_writes_report(tmp_path):
+    outdir = tmp_path / "out"
+    result = runner.invoke(app, ["main", "--input", str(BIG), "--outdir", str(outdir), "--top", "3", "--gzip"])
+    assert result.exit_code == 0, result.output
+    report = outdir / "report.txt.gz"
+    assert f"Raport (txt): {report}" in result.stdout
+    text = gzip.open(report, "rt", encoding="utf-8").read()
+    assert text.startswith("Top 3 adresów IP:\n")
+    assert text in result.stdout
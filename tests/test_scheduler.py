@@ -0,0 +1,96 @@
+# === TESTY WIELU PLIKÓW WEJŚCIA ===
+# Cel: --input z globem / katalogiem i scheduler plików.
+#
+# WYMAGANIA:
+# - expand_inputs: plik, katalog, glob; kolejność deterministyczna; brak dopasowań -> FileNotFoundError.
+# - process_files: wyniki w kolejności wejścia niezależnie od kolejności zlecania (największe najpierw).
+# - Limit globalny: suma linii == limit, pliki czytane po kolei.
+# - CLI: liczniki = suma liczników pojedynczych plików.
+
+import gzip
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from src.analyzer.cli import app
+from src.analyzer.io_reader import expand_inputs
+from src.analyzer.scheduler import process_files
+
+runner = CliRunner()
+
+SMALL = Path("data/access_small.log")
+BIG = Path("data/access_big.log")
+CORRUPTED = Path("data/corrupted.log")
+
+
+@pytest.fixture
+def logs_dir(tmp_path) -> Path:
+    """Katalog z rotowanymi logami: zwykłe, .gz i jeden plik spoza wzorca."""
+    d = tmp_path / "logs"
+    d.mkdir()
+    (d / "access.log").write_bytes(SMALL.read_bytes())
+    (d / "access.log.1").write_bytes(CORRUPTED.read_bytes())
+    (d / "access.log.2.gz").write_bytes(gzip.compress(BIG.read_bytes()))
+    (d / "other.txt").write_text("nie log\n", encoding="utf-8")
+    return d
+
+
+def test_expand_glob_sorted(logs_dir: Path):
+    paths = expand_inputs([str(logs_dir / "access.log*")])
+    assert [p.name for p in paths] == ["access.log", "access.log.1", "access.log.2.gz"]
+    assert all(p.is_absolute() for p in paths)
+
+
+def test_expand_directory_and_dedupe(logs_dir: Path):
+    paths = expand_inputs([str(logs_dir / "access.log"), str(logs_dir)])
+    assert [p.name for p in paths] == ["access.log", "access.log.1", "access.log.2.gz", "other.txt"]
+
+
+def test_expand_no_match_raises(logs_dir: Path):
+    with pytest.raises(FileNotFoundError):
+        expand_inputs([str(logs_dir / "*.nope")])
+
+
+def test_results_in_input_order(logs_dir: Path):
+    paths = expand_inputs([str(logs_dir / "access.log*")])
+    results = list(process_files(paths, max_open_files=2))
+    assert [r.lines for r in results] == [13, 5, 5512]
+    assert [r.bad for r in results] == [0, 5, 1]
+
+
+def test_global_limit(logs_dir: Path):
+    paths = expand_inputs([str(logs_dir / "access.log*")])
+    results = list(process_files(paths, max_open_files=3, limit=15))
+    assert [r.lines for r in results] == [13, 2]
+
+
+def test_cli_glob_merges_counters(tmp_path, logs_dir: Path):
+    result = runner.invoke(app, ["main", "--input", str(logs_dir / "access.log*"), "--outdir", str(tmp_path), "--quiet"])
+    assert result.exit_code == 0
+    assert "Wczytano 5530 linii z: 3 plików" in result.stdout
+    assert "Poprawnie sparsowane: 5524" in result.stdout
+    assert "Błędnie sparsowane: 6" in result.stdout
+
+
+def test_cli_glob_with_workers_same_summary(tmp_path, logs_dir: Path):
+    args = ["main", "--input", str(logs_dir / "access.log*"), "--outdir", str(tmp_path), "--quiet"]
+    threads = runner.invoke(app, args)
+    procs = runner.invoke(app, args + ["--workers", "2"])
+    assert procs.exit_code == 0
+    assert procs.stdout == threads.stdout
+
+
+def test_cli_repeated_input_and_limit(tmp_path, logs_dir: Path):
+    result = runner.invoke(
+        app,
+        ["main", "--input", str(logs_dir / "access.log"), "--outdir", str(tmp_path), "--input", str(logs_dir / "access.log.1"),
+         "--limit", "15", "--quiet"],
+    )
+    assert result.exit_code == 0
+    assert "Wczytano 15 linii z: 2 plików" in result.stdout
+
+
+def test_cli_glob_without_match_is_usage_error(tmp_path, logs_dir: Path):
+    result = runner.invoke(app, ["main", "--input", str(logs_dir / "*.nope"), "--outdir", str(tmp_path)])
+    assert result.exit_code == 2
@@ -0,0 +1,306 @@
+# === TESTY SZKICÓW STRUMIENIOWYCH ===
+# Cel: Space-Saving (top-K o stałej pamięci) i jego gwarancje błędu.
+#
+# WYMAGANIA:
+# - true <= szacunek <= true + błąd, błąd <= N / k; klucze > N / k zawsze w szkicu.
+# - merge: gwarancje zachowane po scaleniu szkiców fragmentów.
+# - Aggregator(top_mode="approx") == exact, gdy kluczy jest mniej niż liczników.
+
+import os
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from src.analyzer.aggregator import SIZE_PATH_GROUPS, Aggregator
+from src.analyzer.cli import app
+from src.analyzer.parser import parse_batch, parse_line
+from src.analyzer.sketches import MIN_CAPACITY, DDSketch, HyperLogLog, SpaceSaving, capacity_for_memory
+
+runner = CliRunner()
+
+BIG = Path("data/access_big.log")
+
+
+def _zipf_stream(n: int, keys: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, keys + 1)]
+    return [f"/k{i}" for i in rng.choices(range(keys), weights=weights, k=n)]
+
+
+def _check_guarantees(sketch: SpaceSaving, exact: Counter) -> None:
+    n, k = sum(exact.values()), sketch.capacity
+    assert sketch.total == n
+    assert len(sketch) <= k
+    bound = sketch.max_error()
+    assert bound <= n / k
+    for key, count, error in sketch.top(k):
+        assert exact[key] <= count <= exact[key] + error
+        assert error <= bound
+    for key, true in exact.items():
+        if key not in sketch.counts:
+            assert true <= bound
+
+
+def test_space_saving_error_bounds():
+    stream = _zipf_stream(20_000, keys=3_000, seed=7)
+    sketch = SpaceSaving(100)
+    for key in stream:
+        sketch.add(key)
+    exact = Counter(stream)
+    _check_guarantees(sketch, exact)
+    for key, true in exact.items():
+        if true > len(stream) / sketch.capacity:
+            assert key in sketch.counts
+    # najczęstsze klucze rozkładu Zipfa są wykrywane
+    assert [key for key, _, _ in sketch.top(3)] == [key for key, _ in exact.most_common(3)]
+
+
+def test_space_saving_weighted_and_exact_when_small():
+    sketch = SpaceSaving(10)
+    for key, weight in (("a", 5), ("b", 2), ("a", 1), ("c", 7)):
+        sketch.add(key, weight)
+    assert sketch.top(2) == [("c", 7, 0), ("a", 6, 0)]
+    assert sketch.max_error() == 0
+
+
+def test_space_saving_merge_keeps_guarantees():
+    streams = [_zipf_stream(5_000, keys=2_000, seed=seed) for seed in range(4)]
+    merged = SpaceSaving(80)
+    for stream in streams:
+        part = SpaceSaving(80)
+        for key in stream:
+            part.add(key)
+        merged.merge(part)
+    _check_guarantees(merged, Counter(key for stream in streams for key in stream))
+
+
+def test_capacity_for_memory():
+    assert capacity_for_memory(64 * 1024 * 1024, 4) > 10_000
+    assert capacity_for_memory(1, 4) == MIN_CAPACITY
+    with pytest.raises(ValueError):
+        capacity_for_memory(0, 4)
+
+
+def test_aggregator_approx_matches_exact_on_sample():
+    lines = BIG.read_text(encoding="utf-8").splitlines()
+    exact, approx = Aggregator(), Aggregator(top_mode="approx", sketch_capacity=64)
+    for line in lines:
+        rec = parse_line(line, as_record=True)
+        if rec is not None:
+            exact.add(rec)
+            approx.add(rec)
+    for field in ("remote_host", "path", "referrer", "user_agent"):
+        assert approx.top(field, 5) == exact.top(field, 5)
+        assert approx.top_error(field) == 0
+    assert approx.summary(5)["top_max_error"]["path"] == 0
+    with pytest.raises(ValueError):
+        approx.merge(exact)
+
+
+def test_cli_approx_top_and_bad_memory(tmp_path):
+    base = ["main", "--input", str(BIG), "--outdir", str(tmp_path), "--quiet", "--top", "2"]
+    exact = runner.invoke(app, base)
+    approx = runner.invoke(app, base + ["--top-mode", "approx", "--sketch-memory", "1MB", "--workers", "2"])
+    assert approx.exit_code == 0, approx.output
+    assert "Top 2 ścieżek (przybliżone, zawyżenie <= 0):" in approx.stdout
+    assert approx.stdout.replace(" (przybliżone, zawyżenie <= 0)", "") == exact.stdout
+
+    bad = runner.invoke(app, base + ["--top-mode", "approx", "--sketch-memory", "lots"])
+    assert bad.exit_code == 2
+
+
+# === HYPERLOGLOG =============================================================
+
+@pytest.mark.parametrize("precision", [8, 12, 14])
+def test_hll_estimate_within_error(precision: int):
+    hll = HyperLogLog(precision)
+    for i in range(30_000):
+        hll.add(f"10.{i % 7}.{i // 256 % 256}.{i % 256}-{i}")
+        hll.add(f"10.{i % 7}.{i // 256 % 256}.{i % 256}-{i}")  # duplikaty nie zmieniają wyniku
+    assert abs(hll.estimate() - 30_000) / 30_000 <= 4 * hll.relative_error()
+    assert len(hll.registers) == 2 ** precision
+
+
+def test_hll_small_cardinalities_exact_and_merge_is_union():
+    a, b = HyperLogLog(), HyperLogLog()
+    assert a.estimate() == 0
+    for value in ("x", "y", "z"):
+        a.add(value)
+    for value in ("z", "w"):
+        b.add(value)
+    assert a.estimate() == 3
+    assert a.merge(b).estimate() == 4
+    with pytest.raises(ValueError):
+        a.merge(HyperLogLog(10))
+    with pytest.raises(ValueError):
+        HyperLogLog(3)
+
+
+def test_hll_hash_is_stable_across_processes():
+    """Rejestry nie zależą od PYTHONHASHSEED (scalanie wyników z procesów roboczych)."""
+    import subprocess
+    code = "from src.analyzer.sketches import HyperLogLog as H; h=H(4); h.add('a'); h.add('b'); print(bytes(h.registers).hex())"
+    outputs = {
+        subprocess.run([sys.executable, "-c", code], env={**os.environ, "PYTHONHASHSEED": seed},
+                       capture_output=True, text=True, check=True).stdout
+        for seed in ("1", "2")
+    }
+    assert len(outputs) == 1
+
+
+def test_aggregator_unique_per_bucket():
+    lines = BIG.read_text(encoding="utf-8").splitlines()
+    agg = Aggregator("minute", unique_fields=("remote_host", "path"))
+    batched = Aggregator("minute", unique_fields=("remote_host", "path"))
+    exact: dict[str, set] = {}
+    for line in lines:
+        rec = parse_line(line, as_record=True)
+        if rec is not None:
+            agg.add(rec)
+            exact.setdefault(agg.bucket_label(rec.epoch - rec.epoch % 60), set()).add(rec.remote_host)
+    batched.add_batch(parse_batch(lines))
+
+    assert agg.unique_per_bucket("remote_host") == [(label, len(ips)) for label, ips in sorted(exact.items())]
+    assert agg.unique_total("remote_host") == 3
+    assert agg.unique_total("path") == len({r["path"] for r in map(parse_line, lines) if r})
+    assert batched.summary(3) == agg.summary(3)
+
+    with pytest.raises(ValueError):
+        Aggregator(unique_fields=("status",))
+    with pytest.raises(ValueError):
+        agg.merge(Aggregator("minute"))
+    with pytest.raises(ValueError, match="Nie można scalić agregatorów"):  # inna precyzja, puste HLL też
+        agg.merge(Aggregator("minute", unique_fields=("remote_host", "path"), hll_precision=10))
+
+
+def test_cli_unique_fields(tmp_path):
+    base = ["main", "--input", str(BIG), "--outdir", str(tmp_path), "--quiet", "--time-bucket", "day"]
+    result = runner.invoke(app, base + ["--unique", "remote_host,user_agent", "--workers", "2"])
+    assert result.exit_code == 0, result.output
+    assert "Unikalne remote_host (HyperLogLog, błąd ~1.6%):\n  łącznie  3\n  2023-10-10  3\n" in result.stdout
+    assert "Unikalne user_agent" in result.stdout
+
+    bad = runner.invoke(app, base + ["--unique", "status"])
+    assert bad.exit_code == 2
+
+
+# === DDSKETCH (KWANTYLE ROZMIARU) ============================================
+
+def _exact_quantile(values: list[int], q: float) -> int:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def test_ddsketch_relative_error_and_merge():
+    rng = random.Random(3)
+    values = [int(rng.lognormvariate(8, 2)) for _ in range(20_000)] + [0] * 500
+    whole, parts = DDSketch(), [DDSketch() for _ in range(4)]
+    for i, value in enumerate(values):
+        whole.add(value)
+        parts[i % 4].add(value)
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+
+    assert merged.count == whole.count == len(values) and merged.zero_count == values.count(0)
+    for q in (0.0, 0.01, 0.5, 0.95, 0.99, 1.0):
+        true = _exact_quantile(values, q)
+        assert abs(whole.quantile(q) - true) <= 0.01 * true
+        assert merged.quantile(q) == whole.quantile(q)
+
+
+def test_ddsketch_bounded_bins_and_validation():
+    sketch = DDSketch(max_bins=50)
+    for exponent in range(200):
+        sketch.add(1.1 ** exponent)
+    assert len(sketch.bins) <= 50
+    assert abs(sketch.quantile(1.0) - 1.1 ** 199) <= 0.01 * 1.1 ** 199  # wysokie kwantyle zachowane
+    assert DDSketch().quantile(0.5) is None
+    with pytest.raises(ValueError):
+        sketch.add(-1)
+    with pytest.raises(ValueError):
+        sketch.merge(DDSketch(relative_accuracy=0.02))
+
+
+def test_aggregator_size_quantiles_per_group():
+    lines = BIG.read_text(encoding="utf-8").splitlines() + [
+        '10.0.0.1 - - [10/Oct/2023:13:55:36 +0200] "GET /nosize HTTP/1.1" 204 - "-" "ua"',
+    ]
+    agg = Aggregator("hour", size_quantiles=(0.5, 0.99))
+    by_class: dict[str, list[int]] = {}
+    for line in lines:
+        rec = parse_line(line, as_record=True)
+        if rec is not None:
+            agg.add(rec)
+            if rec.size is not None:
+                by_class.setdefault(f"{rec.status // 100}xx", []).append(rec.size)
+
+    for group, sizes in by_class.items():
+        stats = agg.size_stats("status", group)
+        assert stats["count"] == len(sizes)
+        for q, label in ((0.5, "p50"), (0.99, "p99")):
+            assert abs(stats[label] - _exact_quantile(sizes, q)) <= 0.01 * _exact_quantile(sizes, q) + 1
+    assert agg.size_stats("path", "/nosize") == {"count": 0, "missing": 1, "p50": None, "p99": None}
+    assert agg.size_stats("all")["missing"] == 1
+
+    batched = Aggregator("hour", size_quantiles=(0.5, 0.99))
+    batched.add_batch(parse_batch(lines))
+    assert batched.summary(5) == agg.summary(5)
+    assert agg.summary(2)["size_quantiles"]["per_bucket"][0]["bucket"] == "2023-10-10 11:00"
+
+
+def test_size_path_sketches_bounded_by_tracked_paths():
+    """Szkice rozmiarów per ścieżka tylko dla SIZE_PATH_GROUPS śledzonych ścieżek, także po merge."""
+    ts = "10/Oct/2023:13:55:36 +0200"
+    hot = [f'10.0.0.1 - - [{ts}] "GET /hot HTTP/1.1" 200 {100 + i % 50} "-" "ua"' for i in range(20_000)]
+    cold = [f'10.0.0.2 - - [{ts}] "GET /cold/{i} HTTP/1.1" 200 {i % 7 or "-"} "-" "ua"'
+            for i in range(5 * SIZE_PATH_GROUPS)]
+    halves = []
+    for part in (hot[::2] + cold[::2], hot[1::2] + cold[1::2]):
+        agg = Aggregator("none", size_quantiles=(0.5,))
+        for line in part:
+            agg.add(parse_line(line, as_record=True))
+        halves.append(agg)
+    merged = halves[0].merge(halves[1])
+
+    for agg in halves:
+        assert len(agg.size_groups("path")) <= SIZE_PATH_GROUPS
+        assert set(agg.size_groups("path")) <= set(agg.size_paths.counts)
+    hot_stats = merged.size_stats("path", "/hot")
+    assert hot_stats["count"] == len(hot) and abs(hot_stats["p50"] - 124) <= 2
+    assert merged.size_stats("all")["count"] + merged.size_stats("all")["missing"] == len(hot) + len(cold)
+
+
+
+def test_merge_copies_sketches_missing_in_self():
+    """Szkice HLL i DDSketch z `other` trafiają do self jako kopie - dalsze zmiany `other` nie przeciekają."""
+    lines = BIG.read_text(encoding="utf-8").splitlines()
+    options = dict(unique_fields=("remote_host",), size_quantiles=(0.5,))
+    source = Aggregator("hour", **options)
+    for line in lines:
+        rec = parse_line(line, as_record=True)
+        if rec is not None:
+            source.add(rec)
+    merged = Aggregator("hour", **options).merge(source)
+    before = merged.summary(3)
+
+    source.add(parse_line('10.9.9.9 - - [10/Oct/2023:13:55:36 +0200] "GET /new HTTP/1.1" 200 99999 "-" "ua"',
+                          as_record=True))
+    assert merged.summary(3) == before
+    assert source.unique_total("remote_host") == merged.unique_total("remote_host") + 1
+
+    with pytest.raises(ValueError, match=r"q=\[0\.5\] vs .*q=\[0\.9\]"):
+        merged.merge(Aggregator("hour", unique_fields=("remote_host",), size_quantiles=(0.9,)))
+
+def test_cli_quantiles(tmp_path):
+    base = ["main", "--input", str(BIG), "--outdir", str(tmp_path), "--quiet", "--top", "1"]
+    result = runner.invoke(app, base + ["--quantiles", "0.5,0.99", "--workers", "2", "--reader", "mmap"])
+    assert result.exit_code == 0, result.output
+    assert "  /admin  n=424 brak=0 p50=321 p99=321\n" in result.stdout
+    assert "Rozmiar odpowiedzi wg czasu (hour, UTC):" in result.stdout
+    assert runner.invoke(app, base + ["--quantiles", "0.5,2"]).exit_code == 2
+    assert runner.invoke(app, base + ["--quantiles", "p99"]).exit_code == 2
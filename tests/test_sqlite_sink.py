@@ -0,0 +1,98 @@
+# === TESTY ZAPISU DO SQLITE (--sqlite) ===
+# Cel: rekordy z parse_line trafiają do bazy partiami; wymiary deduplikują napisy.
+#
+# WYMAGANIA:
+# - Liczba wierszy == liczba poprawnych rekordów; agregaty SQL == Aggregator.
+# - paths / user_agents: każdy napis raz, także po ponownym zapisie do tej samej bazy.
+# - Po zamknięciu: indeksy istnieją, tryb WAL.
+# - Nieudana partia (ROLLBACK) nie zostawia id wymiarów bez wierszy w paths / user_agents.
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from src.analyzer.cli import app
+from src.analyzer.parser import parse_line
+from src.analyzer.sqlite_sink import SqliteSink
+
+runner = CliRunner()
+
+BIG = Path("data/access_big.log")
+
+
+def _records(as_record: bool):
+    return [r for r in (parse_line(line, as_record=as_record) for line in BIG.read_text(encoding="utf-8").splitlines()) if r]
+
+
+def test_sink_batches_and_dimensions(tmp_path):
+    db = tmp_path / "out.db"
+    records = _records(as_record=True)
+    with SqliteSink(db, batch_rows=1000) as sink:
+        for rec in records:
+            sink.add(rec)
+    assert sink.rows == len(records)
+
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT count(*) FROM requests").fetchone()[0] == len(records)
+    assert conn.execute("SELECT count(*) FROM paths").fetchone()[0] == len({r.path for r in records})
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"requests_ts", "requests_status", "requests_remote_host", "requests_path_id"} <= indexes
+
+    first = records[0]
+    row = conn.execute("SELECT remote_host, ts, path, status, size, user_agent FROM requests_v ORDER BY id LIMIT 1").fetchone()
+    assert row == (first.remote_host, first.epoch, first.path, first.status, first.size, first.user_agent)
+    top = conn.execute("SELECT path, count(*) c FROM requests_v GROUP BY path ORDER BY c DESC, path LIMIT 1").fetchone()
+    counts = {}
+    for r in records:
+        counts[r.path] = counts.get(r.path, 0) + 1
+    assert top == min(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    conn.close()
+
+
+def test_sink_appends_with_shared_dimensions(tmp_path):
+    db = tmp_path / "twice.db"
+    dicts = _records(as_record=False)[:50]
+    for _ in range(2):
+        with SqliteSink(db) as sink:
+            for rec in dicts:
+                sink.add(rec)
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT count(*) FROM requests").fetchone()[0] == 100
+    assert conn.execute("SELECT count(*) FROM user_agents").fetchone()[0] == len({r["user_agent"] for r in dicts})
+    assert conn.execute("SELECT count(*) FROM requests_v").fetchone()[0] == 100
+    conn.close()
+
+
+def test_failed_batch_discards_dimension_ids(tmp_path):
+    db = tmp_path / "rollback.db"
+    dicts = _records(as_record=False)
+    good, broken = dicts[:20], dict(dicts[20], path="/only-in-failed-batch", user_agent="ua-failed", status=None)
+    with SqliteSink(db, batch_rows=10_000) as sink:
+        sink.add(broken)  # status NOT NULL -> IntegrityError przy zapisie partii
+        with pytest.raises(sqlite3.IntegrityError):
+            sink.flush()
+        for rec in good:
+            sink.add(rec)
+    assert sink.rows == len(good)
+
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT count(*) FROM requests_v").fetchone()[0] == len(good)
+    assert conn.execute("SELECT count(*) FROM requests r LEFT JOIN paths p ON p.id = r.path_id"
+                        " WHERE p.id IS NULL").fetchone()[0] == 0
+    assert conn.execute("SELECT count(*) FROM paths WHERE path = '/only-in-failed-batch'").fetchone()[0] == 0
+    assert conn.execute("SELECT min(id) FROM paths").fetchone()[0] == 1
+    conn.close()
+
+
+def test_cli_sqlite(tmp_path):
+    db = tmp_path / "cli.db"
+    result = runner.invoke(app, ["main", "--input", str(BIG), "--outdir", str(tmp_path), "--quiet", "--sqlite", str(db), "--workers", "2"])
+    assert result.exit_code == 0, result.output
+    assert f"Zapisano do SQLite: 5511 wierszy -> {db}" in result.stdout
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT count(*) FROM requests WHERE status >= 500").fetchone()[0] == 424
+    conn.close()
+    assert runner.invoke(app, ["main", "--input", str(BIG), "--outdir", str(tmp_path), "--sqlite", str(tmp_path)]).exit_code == 2
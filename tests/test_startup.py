@@ -0,0 +1,80 @@
+# === TESTY CZASU STARTU (src/main.py, _version, leniwe importy) ===
+# Cel: zimny start CLI nie płaci za moduły, których dany przebieg nie używa.
+#
+# WYMAGANIA:
+# - _version.__version__ == tool.poetry.version z pyproject.toml (wersja wpisana na stałe).
+# - `python -m src.main --version`: bez Typera i modułów analizy.
+# - `--help` (aplikacji i komend): bez modułów analizy (aggregator, sketches, pipeline, reporter, timeindex);
+#   kopie ich stałych w cli.py (domyślne wartości i pomoc opcji) zgodne z oryginałami.
+# - Zwykły przebieg (mały plik, bez opcji) nie importuje modułów opcjonalnych
+#   (--workers, --cache-dir, --sqlite, --stats-json/--profile, --state-file, filtry, zstd).
+
+import subprocess
+import sys
+import tomllib
+from pathlib import Path
+
+from src.analyzer import aggregator, cli, sketches, timeindex
+from src.analyzer._version import __version__
+from src.analyzer.cli import get_version
+
+ROOT = Path(__file__).resolve().parents[1]
+
+ANALYSIS_MODULES = (
+    "src.analyzer.aggregator", "src.analyzer.sketches", "src.analyzer.pipeline",
+    "src.analyzer.reporter", "src.analyzer.timeindex",
+)
+
+OPTIONAL_MODULES = (
+    "src.analyzer.checkpoint", "src.analyzer.filters", "src.analyzer.live", "src.analyzer.parallel",
+    "src.analyzer.parse_cache", "src.analyzer.profiling", "src.analyzer.scheduler", "src.analyzer.sqlite_sink",
+    "concurrent.futures.process", "cProfile", "sqlite3", "tomllib", "tracemalloc", "zstandard",
+)
+
+
+def _importtime(*args: str, cwd: Path = ROOT) -> tuple[str, dict[str, int]]:
+    """Uruchamia `python -X importtime ...`; zwraca stdout i {moduł: czas własny [us]}."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=cwd,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    modules = {}
+    for row in result.stderr.splitlines():
+        if row.startswith("import time:") and "|" in row and "self [us]" not in row:
+            self_us, _, name = row[len("import time:"):].split("|")
+            modules[name.strip()] = int(self_us)
+    return result.stdout, modules
+
+
+def test_version_baked_in_matches_pyproject():
+    with open(ROOT / "pyproject.toml", "rb") as f:
+        assert tomllib.load(f)["tool"]["poetry"]["version"] == __version__ == get_version()
+
+
+def test_version_fast_path_skips_typer_and_analysis():
+    stdout, modules = _importtime("-m", "src.main", "--version")
+    assert stdout == f"python-log-analyzer {__version__}\n"
+    assert "typer" not in modules and "src.analyzer.cli" not in modules
+    assert sorted(name for name in ANALYSIS_MODULES if name in modules) == []
+
+
+def test_help_skips_analysis_modules():
+    for args in (("--help",), ("main", "--help"), ("index", "build", "--help")):
+        stdout, modules = _importtime("-m", "src.main", *args)
+        assert "Usage" in stdout
+        assert "src.analyzer.cli" in modules
+        assert sorted(name for name in ANALYSIS_MODULES if name in modules) == [], args
+
+
+def test_cli_constant_copies_match_modules():
+    assert cli._UNIQUE_FIELDS == aggregator.UNIQUE_FIELDS
+    assert (cli._HLL_MIN_PRECISION, cli._HLL_MAX_PRECISION, cli._HLL_DEFAULT_PRECISION) == (
+        sketches.HLL_MIN_PRECISION, sketches.HLL_MAX_PRECISION, sketches.HLL_DEFAULT_PRECISION)
+    assert cli._INDEX_EVERY_BYTES == timeindex.DEFAULT_EVERY_BYTES
+
+
+def test_plain_run_skips_optional_modules(tmp_path):
+    stdout, modules = _importtime("-m", "src.main", "main", "--input", "data/access_small.log",
+                                  "--quiet", "--outdir", str(tmp_path))
+    assert "Wczytano" in stdout
+    assert "src.analyzer.cli" in modules
+    assert sorted(name for name in OPTIONAL_MODULES if name in modules) == []
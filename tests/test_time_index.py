@@ -0,0 +1,172 @@
+# === TESTY INDEKSU CZASU ===
+# Cel: --since/--until czytają tylko potrzebny zakres bajtów (indeks .idx albo bisekcja).
+#
+# WYMAGANIA:
+# - Zakres z indeksu / bisekcji zawiera WSZYSTKIE linie z [since, until) i jest mniejszy niż plik.
+# - Wynik CLI z indeksem == bez indeksu == pełny przebieg z filtrem (także --workers / mmap).
+# - Indeks nieaktualny (plik podmieniony, rotowany albo nadpisany w miejscu i dłuższy) jest ignorowany; pliki skompresowane nie są indeksowane.
+
+import gzip
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from src.analyzer.cli import app
+from src.analyzer.io_reader import read_log_lines
+from src.analyzer.parser import parse_line
+from src.analyzer.pipeline import process_file
+from src.analyzer.timeindex import (
+    BISECT_SLACK_SECONDS, TimeIndex, bisect_offset, build_index, byte_range_for, index_path,
+)
+
+runner = CliRunner()
+
+T0 = int(datetime(2023, 10, 10, tzinfo=timezone.utc).timestamp())
+
+
+def _ts(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%d/%b/%Y:%H:%M:%S +0000")
+
+
+@pytest.fixture(scope="module")
+def log(tmp_path_factory) -> Path:
+    """~40k linii co 2 s (ok. 22 h), lekko nieposortowane, z uszkodzonymi liniami."""
+    path = tmp_path_factory.mktemp("idx") / "access.log"
+    lines = []
+    for i in range(40_000):
+        epoch = T0 + 2 * i - (30 if i % 97 == 0 else 0)
+        if i % 1000 == 500:
+            lines.append("garbage without timestamp")
+        lines.append(f'10.0.{i % 7}.{i % 250} - - [{_ts(epoch)}] "GET /p{i % 13} HTTP/1.1" 200 {i} "-" "ua"')
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def _epochs_in(path: Path, start: int = 0, end=None) -> list[int]:
+    recs = (parse_line(line, as_record=True) for line in read_log_lines(path, start=start, end=end))
+    return [rec.epoch for rec in recs if rec is not None]
+
+
+def _expected(path: Path, since: int, until: int) -> list[int]:
+    return [e for e in _epochs_in(path) if since <= e < until]
+
+
+@pytest.mark.parametrize("every_bytes,every_lines", [(64 * 1024, 0), (10**9, 500)])
+def test_index_range_covers_window(log, every_bytes, every_lines):
+    index = build_index(log, every_bytes=every_bytes, every_lines=every_lines)
+    index.save(index_path(log))
+    loaded = TimeIndex.load(index_path(log))
+    assert list(loaded.offsets) == list(index.offsets) and loaded.is_fresh(log)
+
+    since, until = T0 + 30_000, T0 + 33_600
+    start, end = loaded.byte_range(since, until)
+    got = [e for e in _epochs_in(log, start, end) if since <= e < until]
+    assert got == _expected(log, since, until)
+    assert end - start < log.stat().st_size / 10
+    assert loaded.byte_range(None, None) == (0, None)
+    assert loaded.byte_range(T0 + 10**6, None)[0] == log.stat().st_size
+    index_path(log).unlink()
+
+
+def test_bisection_without_index(log):
+    size = log.stat().st_size
+    lo, hi = bisect_offset(log, T0 + 40_000)
+    assert 0 < lo < hi < size
+    with open(log, "rb") as file:
+        assert lo == 0 or file.seek(lo - 1) is not None and file.read(1) == b"\n"
+    assert all(e < T0 + 40_000 - BISECT_SLACK_SECONDS + 60 for e in _epochs_in(log, 0, lo))
+
+    since, until = T0 + 12_345, T0 + 20_000
+    start, end = byte_range_for(log, since, until)
+    assert [e for e in _epochs_in(log, start, end) if since <= e < until] == _expected(log, since, until)
+    assert end - start < size / 3
+
+
+def test_read_log_lines_offsets(log):
+    first = next(read_log_lines(log))
+    with open(log, "rb") as file:
+        second_start = len(file.readline())
+    assert next(read_log_lines(log, start=second_start)) != first
+    assert list(read_log_lines(log, start=0, end=1)) == [first]
+    gz = log.with_name("x.log.gz")
+    gz.write_bytes(gzip.compress(log.read_bytes()[:1000]))
+    with pytest.raises(ValueError):
+        list(read_log_lines(gz, start=10))
+
+
+def test_stale_index_is_ignored(tmp_path, log):
+    path = tmp_path / "a.log"
+    path.write_bytes(log.read_bytes())
+    build_index(path, every_bytes=4096).save(index_path(path))
+    path.write_bytes(log.read_bytes()[: log.stat().st_size // 2])  # podmieniony, krótszy plik
+    since, until = T0 + 1000, T0 + 2000
+    result = process_file(path, quiet=True, time_range=(since, until))
+    assert result.ok == len(_expected(path, since, until))
+
+
+@pytest.mark.parametrize("replace", ["in_place", "rotated"])
+def test_rewritten_larger_file_is_not_fresh(tmp_path, log, replace):
+    """Plik większy niż w indeksie, ale nadpisany w miejscu / podmieniony (rotacja) -> bisekcja, bez gubienia linii."""
+    path = tmp_path / "r.log"
+    path.write_bytes(log.read_bytes())
+    index = build_index(path, every_bytes=4096)
+    index.save(index_path(path))
+    prefix = "".join(
+        f'10.1.0.1 - - [{_ts(T0 - 5000 + 2 * i)}] "GET /old HTTP/1.1" 200 1 "-" "ua"\n' for i in range(2000)
+    )
+    data = prefix.encode() + log.read_bytes()
+    if replace == "in_place":
+        with open(path, "r+b") as file:  # ten sam inode
+            file.write(data)
+    else:
+        rotated = tmp_path / "r.log.new"
+        rotated.write_bytes(data)
+        rotated.replace(path)
+
+    assert path.stat().st_size > index.file_size and not index.is_fresh(path)
+    since, until = T0 + 30_000, T0 + 33_600
+    result = process_file(path, quiet=True, time_range=(since, until))
+    assert result.ok == len(_expected(path, since, until))
+
+
+def test_appended_file_keeps_index_fresh(tmp_path, log):
+    path = tmp_path / "g.log"
+    path.write_bytes(log.read_bytes())
+    index = build_index(path, every_bytes=4096)
+    with open(path, "ab") as file:
+        file.write(f'10.2.0.1 - - [{_ts(T0 + 90_000)}] "GET /new HTTP/1.1" 200 1 "-" "ua"\n'.encode())
+    assert index.is_fresh(path)
+
+
+def test_cli_since_until_same_with_and_without_index(tmp_path, log):
+    path = tmp_path / "b.log"
+    path.write_bytes(log.read_bytes())
+    since, until = "2023-10-10T08:00:00", "2023-10-10 09:30+00:00"
+    base = ["main", "--input", str(path), "--outdir", str(tmp_path), "--quiet", "--since", since, "--until", until, "--time-bucket", "minute"]
+    plain = runner.invoke(app, base)
+    assert plain.exit_code == 0, plain.output
+    assert f"Poprawnie sparsowane: {len(_expected(path, T0 + 8 * 3600, T0 + 9 * 3600 + 1800))}\n" in plain.stdout
+
+    built = runner.invoke(app, ["index", "build", "--input", str(path), "--every-bytes", "16KB"])
+    assert built.exit_code == 0, built.output
+    assert index_path(path).is_file()
+    indexed = runner.invoke(app, base)
+    parallel = runner.invoke(app, base + ["--workers", "2", "--reader", "mmap"])
+    # inny zakres bajtów => inna liczba linii wczytanych/odfiltrowanych, ale ten sam raport
+    tail = plain.stdout.split("Błędnie sparsowane")[1].split("\n", 2)[2]
+    for result in (indexed, parallel):
+        assert result.exit_code == 0, result.output
+        assert result.stdout.split("Błędnie sparsowane")[1].split("\n", 2)[2] == tail
+        assert "Poprawnie sparsowane: 2700\n" in result.stdout
+
+
+def test_cli_bad_bounds_and_compressed_index(tmp_path):
+    assert runner.invoke(app, ["main", "--input", "data/access_small.log", "--outdir", str(tmp_path), "--since", "yesterday"]).exit_code == 2
+    gz = tmp_path / "c.log.gz"
+    gz.write_bytes(gzip.compress(b"x\n"))
+    assert runner.invoke(app, ["index", "build", "--input", str(gz)]).exit_code == 2
+    small = runner.invoke(app, ["main", "--input", "data/access_small.log", "--outdir", str(tmp_path), "--quiet",
+                                "--since", "10/Oct/2023:13:56:00 +0200"])
+    assert small.exit_code == 0 and "Odfiltrowane (--since/--until): " in small.stdout